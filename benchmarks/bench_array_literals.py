@@ -0,0 +1,72 @@
+"""Micro-benchmark: array literal encoding, old per-value functions vs crdb_dump.utils.arrays.
+
+Run with ``python benchmarks/bench_array_literals.py [rows]``. The "old"
+encoders are the array branches of ``to_csv_literal``/``to_sql_literal`` as
+they were before the dedicated module (uncompiled regex and a closure
+rebuilt per value), kept here only as the baseline.
+"""
+import random
+import re
+import string
+import sys
+import timeit
+
+from crdb_dump.utils.arrays import array_literal, sql_array_literal
+
+
+def old_csv_array(val):
+    def escape_csv_array_item(item):
+        if item is None:
+            return ''
+        if isinstance(item, str):
+            escaped = item.replace('"', '""')
+            if re.search(r'[\s,{}"]', escaped):
+                return f'"{escaped}"'
+            return escaped
+        return str(item)
+
+    return '{' + ','.join(escape_csv_array_item(v) for v in val) + '}'
+
+
+def old_sql_array(val):
+    def serialize_item(v):
+        if v is None:
+            return 'NULL'
+        if isinstance(v, str):
+            escaped = v.replace("'", "''")
+            if re.search(r'[,\s{}"]', escaped):
+                return f'"{escaped}"'
+            return escaped
+        return str(v)
+
+    items = [serialize_item(item) for item in val]
+    return f"'{{{','.join(items)}}}'"
+
+
+def _word(rng):
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 12)))
+
+
+def datasets(rows, rng):
+    return {
+        "STRING[] plain": [[_word(rng) for _ in range(20)] for _ in range(rows)],
+        "STRING[] mixed": [[_word(rng) + (" x" if rng.random() < 0.2 else "") for _ in range(20)]
+                           for _ in range(rows)],
+        "INT8[]": [[rng.randint(-10 ** 9, 10 ** 9) for _ in range(20)] for _ in range(rows)],
+    }
+
+
+def main(rows=20000, repeat=5):
+    rng = random.Random(42)
+    print(f"{'dataset':<16} {'encoder':<5} {'old rows/s':>14} {'new rows/s':>14} {'speedup':>8}")
+    for name, data in datasets(rows, rng).items():
+        for label, old, new in (("csv", old_csv_array, array_literal),
+                                ("sql", old_sql_array, sql_array_literal)):
+            t_old = min(timeit.repeat(lambda: [old(v) for v in data], number=1, repeat=repeat))
+            t_new = min(timeit.repeat(lambda: [new(v) for v in data], number=1, repeat=repeat))
+            print(f"{name:<16} {label:<5} {rows / t_old:>14,.0f} {rows / t_new:>14,.0f} "
+                  f"{t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
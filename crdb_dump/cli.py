@@ -7,12 +7,13 @@ from subprocess import check_output
 
 from crdb_dump.export.data import export_data
 from crdb_dump.export.schema import export_schema
-from crdb_dump.loader.loader import load_schema, load_chunks_from_manifest
-from crdb_dump.utils.db_connection import get_sqlalchemy_engine
+from crdb_dump.loader.loader import load_schema, plan_manifest, load_plans
+from crdb_dump.utils.catalog import catalog_cache_path
+from crdb_dump.utils.common import default_workers
+from crdb_dump.utils.db_connection import run_engine, PsycopgPool
 from crdb_dump.utils.io import archive_output
-from crdb_dump.verify.checksum import verify_checksums
+from crdb_dump.verify.checksum import verify_checksums, verify_manifests, find_manifests
 from crdb_dump.utils.logging import init_logger
-from crdb_dump.utils.s3 import get_s3_client, download_file_from_s3
 
 
 @click.group()
@@ -41,22 +42,61 @@ def main(ctx, verbose):
 @click.option('--parallel', is_flag=True, help='Enable parallel exports')
 @click.option('--data', is_flag=True, help='Export table data')
 @click.option('--data-format', type=click.Choice(['sql', 'csv']), default='sql', help='Data export format')
+@click.option('--sql-batch-size', type=int, default=1,
+              help='Rows per INSERT statement for --data-format=sql (multi-row VALUES lists)')
+@click.option('--sql-upsert', is_flag=True, help='Write UPSERT instead of INSERT statements for --data-format=sql')
 @click.option('--data-split', is_flag=True, help='Split each table into a separate file')
 @click.option('--data-limit', type=int, default=None, help='Limit rows per table')
-@click.option('--data-compress', is_flag=True, help='Compress CSV output')
+@click.option('--data-compress', is_flag=True, help='Compress CSV output with gzip (same as --compression=gzip)')
+@click.option('--compression', type=click.Choice(['none', 'gzip', 'zstd', 'lz4']), default=None,
+              help="CSV chunk compression codec (zstd/lz4 need the 'compression' extra)")
+@click.option('--compression-level', type=int, default=None,
+              help='Codec compression level (default: gzip 9, zstd 3, lz4 0)')
+@click.option('--compression-threads', type=int, default=0,
+              help='zstd compression threads per chunk writer (0 = single-threaded, -1 = all CPUs)')
 @click.option('--data-order', default=None, help='Order data by column(s)')
 @click.option('--data-order-desc', is_flag=True, help='Order data descending')
 @click.option('--data-parallel', is_flag=True, help='Parallel data export')
+@click.option('--data-ranges', type=int, default=None,
+              help='Split each table into N primary-key ranges exported concurrently '
+                   '(one connection per range; implies keyset pagination)')
+@click.option('--data-ranges-min-rows', type=int, default=100000,
+              help='Export tables with fewer rows than this, per table statistics, '
+                   'as one range despite --data-ranges (default: 100000)')
+@click.option('--max-workers', type=int, default=None,
+              help='Most concurrent chunk reads with --data-parallel or --data-ranges, '
+                   'and tables exported at once with --data-parallel (default: CPU-based)')
+@click.option('--min-workers', type=int, default=None,
+              help='Enable adaptive concurrency: concurrent chunk reads vary between this '
+                   'and --max-workers (default: fixed at --max-workers). Stream and COPY '
+                   'reads are paced per --fetch-size batch; their queries stay open on the server')
 @click.option('--data-order-strict', is_flag=True, help='Fail if ordered column(s) not found')
 @click.option('--chunk-size', type=int, default=None, help='Rows per CSV chunk')
+@click.option('--data-pagination', type=click.Choice(['offset', 'keyset', 'stream']), default='offset',
+              help="Chunk paging: 'offset' (OFFSET/LIMIT), 'keyset' (seek past the last "
+                   "primary key; linear in table size), or 'stream' (one server-side cursor per table)")
+@click.option('--data-engine', type=click.Choice(['python', 'copy']), default='python',
+              help="CSV encoder: 'python' (per-value encoding) or 'copy' (server-side "
+                   "COPY ... TO STDOUT streamed into chunk files)")
+@click.option('--fetch-size', type=int, default=1000,
+              help='Rows fetched per server-side cursor round trip (bounds memory with --data-pagination=stream)')
+@click.option('--chunk-bytes', type=int, default=None, help='Start a new chunk once the current one reaches N bytes')
 @click.option('--as-of-system-time', 'aost', is_flag=False, flag_value='auto', default=None,
               help="Read data at a consistent snapshot. Use 'auto' (or the bare flag) "
                    "to pin cluster_logical_timestamp(), 'follower' to pin "
                    "follower_read_timestamp() for follower reads, or pass a value like "
                    "'-30s', a timestamp, or a decimal.")
+@click.option('--resume', is_flag=True,
+              help='Continue an interrupted data export from its checkpoints, at the same AS OF SYSTEM TIME')
 @click.option('--verify', is_flag=True, help='Verify exported chunk checksums')
+@click.option('--checksum-algo', type=click.Choice(['sha256', 'blake2b', 'blake3', 'xxh3_128']), default='sha256',
+              help="Chunk checksum algorithm recorded in manifests (blake3/xxh3_128 need the 'fast-hash' extra)")
 @click.option('--verify-strict', is_flag=True, help='Stop if any checksum fails')
+@click.option('--verify-workers', type=int, default=None, help='Processes used to hash chunks during --verify (default: CPU count)')
 @click.option('--out-dir', default='crdb_dump_output', help='Output directory for all exports')
+@click.option('--catalog-cache', is_flag=True,
+              help='Reuse catalog introspection across runs while the schema is unchanged '
+                   '(cached in <out-dir>/.<db>.catalog.json)')
 @click.option('--print-connection', is_flag=True, help='Print resolved database connection URL and exit')
 @click.option('--retry-count', type=int, default=3, help='Number of retry attempts')
 @click.option('--retry-delay', type=int, default=1000, help='Initial retry delay in milliseconds')
@@ -66,6 +106,12 @@ def main(ctx, verbose):
 @click.option('--s3-endpoint', default=None, help='Custom S3 endpoint (e.g. for Cohesity, MinIO)')
 @click.option('--s3-access-key', envvar='AWS_ACCESS_KEY_ID', help='S3 access key')
 @click.option('--s3-secret-key', envvar='AWS_SECRET_ACCESS_KEY', help='S3 secret key')
+@click.option('--s3-upload-workers', type=int, default=4, help='Concurrent background chunk uploads to S3')
+@click.option('--s3-upload-queue', type=int, default=8,
+              help='Finished chunks allowed to wait for upload before the export pauses')
+@click.option('--s3-stream', is_flag=True,
+              help='Write chunks straight into S3 multipart uploads without creating local files')
+@click.option('--s3-delete-local', is_flag=True, help='Delete each local chunk file once it is uploaded to S3')
 def export(ctx, **kwargs):
     logger = ctx.obj["logger"]
     kwargs["verbose"] = ctx.obj["verbose"]
@@ -73,21 +119,24 @@ def export(ctx, **kwargs):
     kwargs["retry_count"] = kwargs.get("retry_count", 3)
     kwargs["retry_delay"] = kwargs.get("retry_delay", 1000)
 
-    engine = get_sqlalchemy_engine(kwargs)
-
-    if kwargs.get("print_connection"):
-        redacted_url = engine.url.set(username=None, password=None)
-        logger.info(f"🔗 Using CockroachDB URL: {redacted_url}")
-        return
+    # One engine, sized for the requested parallelism, serves schema, data and verify.
+    with run_engine(kwargs) as engine:
+        if kwargs.get("print_connection"):
+            redacted_url = engine.url.set(username=None, password=None)
+            logger.info(f"🔗 Using CockroachDB URL: {redacted_url}")
+            return
 
-    out_dir = os.path.join(kwargs['out_dir'], kwargs['db'])
-    export_schema(kwargs, out_dir, logger)
+        out_dir = os.path.join(kwargs['out_dir'], kwargs['db'])
+        if kwargs.get("catalog_cache"):
+            # Kept beside the database's output directory so --archive leaves it out.
+            kwargs["catalog_cache_path"] = catalog_cache_path(kwargs['out_dir'], kwargs['db'])
+        export_schema(kwargs, out_dir, logger)
 
-    if kwargs['data']:
-        export_data(kwargs, out_dir, logger)
+        if kwargs['data']:
+            export_data(kwargs, out_dir, logger)
 
-    if kwargs['verify']:
-        verify_checksums(kwargs, out_dir, logger)
+        if kwargs['verify']:
+            verify_checksums(kwargs, out_dir, logger)
 
     if kwargs['archive']:
         archive_output(out_dir)
@@ -105,7 +154,17 @@ def export(ctx, **kwargs):
 @click.option('--exclude-tables', default=None, help='Comma-separated list of fully-qualified tables to exclude')
 @click.option('--print-connection', is_flag=True, help='Print resolved database connection URL and exit')
 @click.option('--parallel-load', is_flag=True, help='Use parallel loading of chunks')
+@click.option('--max-workers', type=int, default=None,
+              help='Chunks loaded concurrently across all tables (default: CPU-based with --parallel-load, else 1)')
+@click.option('--min-workers', type=int, default=None,
+              help='Enable adaptive concurrency: concurrent chunk loads vary between this '
+                   'and --max-workers (default: fixed at --max-workers)')
+@click.option('--table-workers', type=int, default=None,
+              help='Maximum chunks of any one table loaded concurrently (default: no per-table cap)')
 @click.option('--validate-csv', is_flag=True, help='Validate row/column match before COPY')
+@click.option('--verify-chunks', is_flag=True, help='Verify each chunk against its manifest checksum before COPY')
+@click.option('--sql-batch-statements', type=int, default=100,
+              help='Statements sent per round trip when loading SQL-format chunks')
 @click.option('--retry-count', type=int, default=3, help='Number of retry attempts')
 @click.option('--retry-delay', type=int, default=1000, help='Initial retry delay in milliseconds')
 @click.option('--use-s3', is_flag=True, help='Enable S3 upload/download for data chunks')
@@ -114,12 +173,43 @@ def export(ctx, **kwargs):
 @click.option('--s3-endpoint', default=None, help='Custom S3 endpoint (e.g. for Cohesity, MinIO)')
 @click.option('--s3-access-key', envvar='AWS_ACCESS_KEY_ID', help='S3 access key')
 @click.option('--s3-secret-key', envvar='AWS_SECRET_ACCESS_KEY', help='S3 secret key')
+@click.option('--s3-prefetch', type=int, default=4, help='Chunks downloaded from S3 ahead of the load workers')
+@click.option('--s3-prefetch-mb', type=int, default=1024,
+              help='Disk budget (MB) for prefetched chunks waiting to be loaded')
+@click.option('--s3-direct', is_flag=True,
+              help='Stream CSV chunks from S3 straight into COPY without downloading them')
 @click.pass_context
 def load(ctx, db, schema, data_dir, resume_log, resume_log_dir, dry_run,
          include_tables, exclude_tables, print_connection,
-         parallel_load, validate_csv, retry_count, retry_delay, resume_strict, region,
-         use_s3, s3_bucket, s3_prefix, s3_endpoint, s3_access_key, s3_secret_key):
+         parallel_load, max_workers, min_workers, table_workers, validate_csv, verify_chunks, sql_batch_statements,
+         retry_count, retry_delay, resume_strict, region,
+         use_s3, s3_bucket, s3_prefix, s3_endpoint, s3_access_key, s3_secret_key,
+         s3_prefetch, s3_prefetch_mb, s3_direct):
     logger = ctx.obj.get("logger")
+
+    # Validate every option before touching the database (e.g. loading the schema).
+    if s3_direct and not use_s3:
+        raise click.UsageError("--s3-direct requires --use-s3")
+    if s3_prefetch < 0:
+        raise click.UsageError("--s3-prefetch must be 0 or more")
+    if s3_prefetch_mb < 1:
+        raise click.UsageError("--s3-prefetch-mb must be at least 1")
+
+    if sql_batch_statements < 1:
+        raise click.UsageError("--sql-batch-statements must be at least 1")
+    if max_workers is not None and max_workers < 1:
+        raise click.UsageError("--max-workers must be at least 1")
+    if table_workers is not None and table_workers < 1:
+        raise click.UsageError("--table-workers must be at least 1")
+    if max_workers is None:
+        max_workers = default_workers() if parallel_load else 1
+    if min_workers is None:
+        min_workers = max_workers
+    if min_workers < 1:
+        raise click.UsageError("--min-workers must be at least 1")
+    if min_workers > max_workers:
+        raise click.UsageError("--min-workers cannot exceed --max-workers")
+
     opts = {
         "db": db,
         "use_s3": use_s3,
@@ -127,66 +217,124 @@ def load(ctx, db, schema, data_dir, resume_log, resume_log_dir, dry_run,
         "s3_prefix": s3_prefix,
         "s3_endpoint": s3_endpoint,
         "s3_access_key": s3_access_key,
-        "s3_secret_key": s3_secret_key
+        "s3_secret_key": s3_secret_key,
+        "s3_prefetch": s3_prefetch,
+        "s3_prefetch_mb": s3_prefetch_mb,
+        "s3_direct": s3_direct,
+        "sql_batch_statements": sql_batch_statements
     }
-    engine = get_sqlalchemy_engine(opts)
+    # The run's engine (see ``run_engine``) only loads the schema; chunks are
+    # copied over ``PsycopgPool``. Both are closed when the command ends.
+    with run_engine(opts) as engine:
+        if print_connection:
+            redacted_url = engine.url.set(username=None, password=None)
+            logger.info(f"🔗 Using CockroachDB URL: {redacted_url}")
+            click.echo(f"🔗 Using CockroachDB URL: {redacted_url}")
+            if not dry_run:
+                return
+
+        if schema and not dry_run:
+            load_schema(schema, engine, logger)
+
+        include = set(include_tables.split(',')) if include_tables else None
+        exclude = set(exclude_tables.split(',')) if exclude_tables else None
+
+        plans = []
+        journals = {}
+        for fname in sorted(os.listdir(data_dir)):
+            if fname.endswith(".manifest.json"):
+                manifest_path = os.path.join(data_dir, fname)
+
+                try:
+                    with open(manifest_path) as f:
+                        table_fullname = json.load(f)["table"]
+                except Exception as e:
+                    logger.warning(f"⚠️ Skipping malformed manifest {fname}: {e}")
+                    continue
+
+                if include and table_fullname not in include:
+                    logger.info(f"⏩ Skipping {table_fullname} (not in include list)")
+                    continue
+                if exclude and table_fullname in exclude:
+                    logger.info(f"⏩ Skipping {table_fullname} (in exclude list)")
+                    continue
 
-    if print_connection:
-        redacted_url = engine.url.set(username=None, password=None)
-        logger.info(f"🔗 Using CockroachDB URL: {redacted_url}")
-        click.echo(f"🔗 Using CockroachDB URL: {redacted_url}")
-        if not dry_run:
+                if dry_run:
+                    logger.info(f"[Dry Run] Would load: {manifest_path}")
+                    continue
+                plan = plan_manifest(manifest_path, data_dir, logger,
+                                     resume_file=resume_log,
+                                     resume_log_dir=resume_log_dir,
+                                     region_filter=region,
+                                     verify_chunks=verify_chunks,
+                                     journals=journals)
+                if plan is not None:
+                    plans.append(plan)
+
+        if not plans:
             return
 
-    if schema and not dry_run:
-        load_schema(schema, engine, logger)
+        # All tables' chunks share one worker pool and one bounded connection pool.
+        workers = f"{min_workers}-{max_workers} adaptive" if min_workers < max_workers else str(max_workers)
+        logger.info(f"🚚 Loading {len(plans)} tables with {workers} workers"
+                    + (f" (at most {table_workers} per table)" if table_workers else ""))
+        pool = PsycopgPool(opts, size=max_workers)
+        try:
+            load_plans(plans, engine, logger,
+                       max_workers=max_workers,
+                       table_workers=table_workers,
+                       validate=validate_csv,
+                       retry_count=retry_count,
+                       retry_delay=retry_delay,
+                       resume_strict=resume_strict,
+                       opts=opts,
+                       pool=pool,
+                       min_workers=min_workers)
+        finally:
+            pool.close()
+
 
+@main.command()
+@click.option('--data-dir', type=click.Path(exists=True, file_okay=False), required=True,
+              help='Directory containing manifest and data files')
+@click.option('--include-tables', default=None, help='Comma-separated list of fully-qualified tables to include')
+@click.option('--exclude-tables', default=None, help='Comma-separated list of fully-qualified tables to exclude')
+@click.option('--workers', type=int, default=None, help='Hashing processes (default: CPU count)')
+@click.option('--strict', is_flag=True, help='Stop at the first checksum failure')
+@click.option('--report', 'report_path', type=click.Path(dir_okay=False), default=None,
+              help='Write the verification report as JSON to this file')
+@click.pass_context
+def verify(ctx, data_dir, include_tables, exclude_tables, workers, strict, report_path):
+    """Verify chunk checksums against the manifests in a dump directory (no cluster needed)."""
+    logger = ctx.obj["logger"]
     include = set(include_tables.split(',')) if include_tables else None
     exclude = set(exclude_tables.split(',')) if exclude_tables else None
 
-    if opts.get("use_s3"):
-        s3 = get_s3_client(
-            endpoint_url=opts.get("s3_endpoint"),
-            access_key=opts.get("s3_access_key"),
-            secret_key=opts.get("s3_secret_key")
-        )
-
-    for fname in os.listdir(data_dir):
-        if fname.endswith(".manifest.json"):
-            manifest_path = os.path.join(data_dir, fname)
-
-            try:
-                with open(manifest_path) as f:
-                    table_fullname = json.load(f)["table"]
-            except Exception as e:
-                logger.warning(f"⚠️ Skipping malformed manifest {fname}: {e}")
-                continue
-
-            if include and table_fullname not in include:
-                logger.info(f"⏩ Skipping {table_fullname} (not in include list)")
-                continue
-            if exclude and table_fullname in exclude:
-                logger.info(f"⏩ Skipping {table_fullname} (in exclude list)")
-                continue
-
-            if dry_run:
-                logger.info(f"[Dry Run] Would load: {manifest_path}")
-            else:
-                load_chunks_from_manifest(
-                    manifest_path,
-                    data_dir,
-                    engine,
-                    logger,
-                    resume_file=resume_log,
-                    resume_log_dir=resume_log_dir,
-                    parallel=parallel_load,
-                    validate=validate_csv,
-                    retry_count=retry_count,
-                    retry_delay=retry_delay,
-                    resume_strict=resume_strict,
-                    region_filter=region,
-                    opts=opts
-                )
+    manifest_paths = []
+    for manifest_path in find_manifests(data_dir):
+        try:
+            with open(manifest_path) as f:
+                table_fullname = json.load(f)["table"]
+        except Exception as e:
+            logger.warning(f"⚠️ Skipping malformed manifest {os.path.basename(manifest_path)}: {e}")
+            continue
+        if include and table_fullname not in include:
+            continue
+        if exclude and table_fullname in exclude:
+            continue
+        manifest_paths.append(manifest_path)
+
+    try:
+        report = verify_manifests(manifest_paths, data_dir, logger, workers=workers, strict=strict)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    if report["failed"] or report["missing"]:
+        ctx.exit(1)
+
 
 @main.command()
 @click.pass_context
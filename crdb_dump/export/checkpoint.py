@@ -0,0 +1,155 @@
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from crdb_dump.utils.common import default_workers
+from crdb_dump.utils.hashing import file_checksum, manifest_checksum_algo, chunk_checksum
+
+CHECKPOINT_SUFFIX = ".checkpoint.jsonl"
+
+# <prefix>_NNN.<csv|sql>[.<codec>]; range chunks have a <base>_rRRR prefix.
+_CHUNK_NAME = re.compile(r"^(?P<prefix>.+)_(?P<index>\d{3,})\.(csv|sql)(\.[a-z0-9]+)?$")
+
+
+def checkpoint_path(out_dir, base_name):
+    return os.path.join(out_dir, f"{base_name}{CHECKPOINT_SUFFIX}")
+
+
+def chunk_prefix(file_name):
+    """File prefix of a chunk name (``<base>`` or ``<base>_rRRR``), or ``None``."""
+    m = _CHUNK_NAME.match(file_name)
+    return m.group("prefix") if m else None
+
+
+class ExportCheckpoint:
+    """Append-only record of one table's finished chunks while it is exported.
+
+    The first line is a header (table, pinned AOST, format, checksum
+    algorithm, range split points); each later line is one manifest chunk
+    entry, appended and fsynced as the chunk closes. The file is removed once
+    the table's manifest is written.
+    """
+
+    def __init__(self, path, header, chunks=()):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write(json.dumps(header, default=str) + "\n")
+        for entry in chunks:
+            self._file.write(json.dumps(entry, default=str) + "\n")
+        self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record(self, entry):
+        with self._lock:
+            self._file.write(json.dumps(entry, default=str) + "\n")
+            self._sync()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _read_checkpoint(path):
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    header, chunks = None, []
+    for line in lines:
+        try:
+            doc = json.loads(line)
+        except ValueError:
+            break  # torn final line from a crash mid-append
+        if header is None:
+            header = doc
+        else:
+            chunks.append(doc)
+    return header, chunks
+
+
+def load_progress(out_dir, base_name, logger):
+    """Return the resumable state of a table's export, or ``None`` if there is none.
+
+    Reads the table's checkpoint, or its finished manifest when no checkpoint
+    exists, and keeps, per file prefix, the leading chunks whose files still
+    match their recorded size and checksum. Returns ``{"header", "chunks",
+    "complete"}`` where ``chunks`` maps prefix -> valid entries and
+    ``complete`` is true only for a manifest whose chunks are all valid.
+    """
+    path = checkpoint_path(out_dir, base_name)
+    manifest_path = os.path.join(out_dir, f"{base_name}.manifest.json")
+    if os.path.exists(path):
+        header, chunks = _read_checkpoint(path)
+        finished = False
+    elif os.path.exists(manifest_path):
+        with open(manifest_path) as mf:
+            header = json.load(mf)
+        chunks = header.pop("chunks", [])
+        finished = True
+    else:
+        return None
+    if header is None:
+        return None
+
+    algo = manifest_checksum_algo(header)
+
+    def valid(entry):
+        file_path = os.path.join(out_dir, entry["file"])
+        if not os.path.exists(file_path):
+            return False
+        if "bytes" in entry and os.path.getsize(file_path) != entry["bytes"]:
+            return False
+        return file_checksum(file_path, algo) == chunk_checksum(header, entry)
+
+    with ThreadPoolExecutor(max_workers=default_workers()) as executor:
+        results = list(executor.map(valid, chunks))
+
+    by_prefix = {}
+    broken = set()
+    for entry, ok in zip(chunks, results):
+        prefix = chunk_prefix(entry["file"])
+        if prefix is None or prefix in broken:
+            continue
+        if not ok:
+            logger.warning(f"⚠️ Chunk {entry['file']} is missing or corrupt; re-exporting from there")
+            broken.add(prefix)
+            continue
+        by_prefix.setdefault(prefix, []).append(entry)
+    return {
+        "header": header,
+        "chunks": by_prefix,
+        "complete": finished and not broken and sum(map(len, by_prefix.values())) == len(chunks),
+    }
+
+
+def find_pinned_aost(out_dir):
+    """``(True, value)`` for the AOST recorded by an earlier run in ``out_dir``.
+
+    Checkpoints are preferred over finished manifests; returns ``(False,
+    None)`` when neither exists.
+    """
+    if not os.path.isdir(out_dir):
+        return False, None
+    names = sorted(os.listdir(out_dir))
+    for suffix in (CHECKPOINT_SUFFIX, ".manifest.json"):
+        for name in names:
+            if not name.endswith(suffix):
+                continue
+            path = os.path.join(out_dir, name)
+            if suffix == CHECKPOINT_SUFFIX:
+                header, _ = _read_checkpoint(path)
+            else:
+                with open(path) as f:
+                    header = json.load(f)
+            if header and "as_of_system_time" in header:
+                return True, header["as_of_system_time"]
+    return False, None
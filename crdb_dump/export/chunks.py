@@ -0,0 +1,221 @@
+import csv
+import io
+import os
+from crdb_dump.utils.encoders import csv_encoder, sql_encoder, encode_csv_rows, encode_sql_rows
+from crdb_dump.utils.compression import compress_stream, CODEC_SUFFIXES
+from crdb_dump.utils.hashing import HashingWriter, DEFAULT_CHECKSUM_ALGO
+
+
+class ChunkWriter:
+    """Write one table's rows into numbered chunk files.
+
+    Rows are appended to the current ``<prefix>_NNN`` file until it holds
+    ``max_rows`` rows or ``max_bytes`` bytes; the chunk is then closed,
+    recorded in ``chunks``, and the next write opens a new file. Each chunk's
+    checksum and size are computed from the bytes as they are written, so the
+    file is never read back.
+    Rows may carry trailing hidden key columns beyond ``columns``; they are used
+    for ``last_key`` and stripped before encoding.
+    """
+
+    def __init__(self, out_dir, file_prefix, export_format, compress, columns, col_types,
+                 insert_prefix=None, key_idx=None, max_rows=None, max_bytes=None, on_chunk=None,
+                 header=None, checksum_algo=DEFAULT_CHECKSUM_ALGO, compression_level=None,
+                 compression_threads=0, sql_batch_size=1, done_chunks=None, opener=None):
+        self.out_dir = out_dir
+        self.file_prefix = file_prefix
+        self.export_format = export_format
+        # ``compress`` is a codec name; ``True`` (the original flag) means gzip.
+        codec = "gzip" if compress is True else (compress or None)
+        self.compression = codec if export_format == 'csv' else None
+        self.compression_level = compression_level
+        self.compression_threads = compression_threads
+        self.columns = columns
+        self.col_types = col_types
+        # Encoders are chosen once per column from its type, not per value.
+        make_encoder = csv_encoder if export_format == 'csv' else sql_encoder
+        self._encoders = [make_encoder(t) for t in col_types[:len(columns)]]
+        self.insert_prefix = insert_prefix
+        self.key_idx = key_idx or []
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.on_chunk = on_chunk
+        # Pre-encoded CSV header line (bytes) used by write_raw(); when unset
+        # the header is written from ``columns``.
+        self.header = header
+        self.checksum_algo = checksum_algo
+        # Opens a chunk's binary destination; defaults to a local file. An S3
+        # stream lets chunks be written without touching the local disk.
+        self.opener = opener or (lambda path: open(path, 'wb'))
+        # SQL rows per INSERT/UPSERT statement; rows are buffered until a
+        # statement is full or the chunk closes, so statements never span chunks.
+        self.sql_batch_size = max(1, sql_batch_size or 1)
+        self._sql_rows = []
+        # A resumed export continues numbering after its already-valid chunks.
+        self.chunks = list(done_chunks or [])
+        self.total_rows = sum(c["rows"] for c in self.chunks)
+        self._index = len(self.chunks) + 1
+        self._file = None
+
+    def _open(self):
+        if self.export_format == 'csv':
+            ext = f"csv.{CODEC_SUFFIXES[self.compression]}" if self.compression else "csv"
+        else:
+            ext = "sql"
+        self._path = os.path.join(self.out_dir, f"{self.file_prefix}_{self._index:03d}.{ext}")
+        self._raw = HashingWriter(self.opener(self._path), self.checksum_algo)
+        if self.compression:
+            stream = compress_stream(self._raw, self.compression, self.compression_level,
+                                     self.compression_threads)
+        else:
+            stream = io.BufferedWriter(self._raw)
+        self._file = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+        self._rows = 0
+        self._last_key = None
+        if self.export_format == 'csv':
+            self._csv = csv.writer(self._file, lineterminator='\n')
+            if self.header is not None:
+                self._file.buffer.write(self.header)
+            else:
+                self._csv.writerow(self.columns)
+
+    def _encode(self, rows):
+        if self.export_format == 'csv':
+            self._csv.writerows(encode_csv_rows(rows, self._encoders))
+        else:
+            for values in encode_sql_rows(rows, self._encoders):
+                self._sql_rows.append(values)
+                if len(self._sql_rows) >= self.sql_batch_size:
+                    self._flush_sql()
+
+    def _flush_sql(self):
+        if self._sql_rows:
+            self._file.write(f"{self.insert_prefix} {', '.join(self._sql_rows)};\n")
+            self._sql_rows = []
+
+    def _size(self):
+        # Bytes that already reached the chunk file. Flushing here would write
+        # every row separately and force a compressor sync flush (which ruins
+        # the compression ratio), so data still in the text, write or
+        # compressor buffers is counted on a later write.
+        return self._raw.bytes_written
+
+    def write(self, rows):
+        """Append ``rows``, rolling over to a new chunk whenever a limit is reached."""
+        self._write(rows, self._encode)
+
+    def write_raw(self, lines):
+        """Append already-encoded CSV rows (newline-terminated bytes), e.g. COPY output."""
+        self._write(lines, lambda part: self._file.buffer.write(b"".join(part)))
+
+    def _write(self, rows, encode):
+        while rows:
+            if self._file is None:
+                self._open()
+            take = len(rows)
+            if self.max_rows:
+                take = min(take, self.max_rows - self._rows)
+            part, rows = rows[:take], rows[take:]
+            encode(part)
+            self._rows += len(part)
+            if self.key_idx:
+                last = part[-1]
+                if isinstance(last, bytes):
+                    # Raw COPY output: decode just the final row to find its key.
+                    last = next(csv.reader([last.decode("utf-8")]))
+                self._last_key = tuple(last[i] for i in self.key_idx)
+            if (self.max_rows and self._rows >= self.max_rows) or \
+                    (self.max_bytes and self._size() >= self.max_bytes):
+                self.close_chunk()
+
+    def close_chunk(self):
+        if self._file is None:
+            return
+        self._flush_sql()
+        self._file.close()
+        if self.compression:
+            # Compressor streams do not close the underlying chunk file.
+            self._raw.close()
+        self._file = None
+        entry = {
+            "file": os.path.basename(self._path),
+            "rows": self._rows,
+            self.checksum_algo: self._raw.hexdigest(),
+            "bytes": self._raw.bytes_written
+        }
+        if self.compression:
+            entry["compression"] = self.compression
+        self.chunks.append(entry)
+        self.total_rows += self._rows
+        if self.on_chunk:
+            self.on_chunk(self._index, self._path, entry, self._last_key)
+        self._index += 1
+
+    def finish(self):
+        """Close the open chunk (if any) and return ``(chunks, total_rows)``."""
+        self.close_chunk()
+        return self.chunks, self.total_rows
+
+
+class CopyChunkSink:
+    """File-like target for ``cursor.copy_expert("COPY ... TO STDOUT WITH CSV HEADER")``.
+
+    Splits the CSV byte stream on row boundaries (newlines outside quoted
+    fields) and hands whole rows to a :class:`ChunkWriter`, repeating the COPY
+    header line at the top of every chunk.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self._pending = b""
+        self._in_quotes = False
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        rows = []
+        start = i = 0
+        in_quotes = self._in_quotes
+        if not in_quotes and b'"' not in data:
+            # Fast path: no quoting, so every newline ends a row.
+            end = data.rfind(b"\n")
+            if end >= 0:
+                rows = [line + b"\n" for line in data[:end].split(b"\n")]
+                start = end + 1
+        else:
+            while True:
+                if in_quotes:
+                    # A doubled quote ("") simply closes and reopens the field.
+                    j = data.find(b'"', i)
+                    if j < 0:
+                        break
+                    in_quotes, i = False, j + 1
+                    continue
+                nl = data.find(b"\n", i)
+                q = data.find(b'"', i)
+                if 0 <= q and (nl < 0 or q < nl):
+                    in_quotes, i = True, q + 1
+                elif nl >= 0:
+                    rows.append(data[start:nl + 1])
+                    start = i = nl + 1
+                else:
+                    break
+        self._in_quotes = in_quotes
+        if rows:
+            rows[0] = self._pending + rows[0]
+            self._pending = b""
+        self._pending += data[start:]
+        self._emit(rows)
+        return len(data)
+
+    def _emit(self, rows):
+        if rows and self.writer.header is None:
+            self.writer.header = rows.pop(0)
+        if rows:
+            self.writer.write_raw(rows)
+
+    def close(self):
+        """Flush a final row that lacks a trailing newline."""
+        if self._pending:
+            self._emit([self._pending + b"\n"])
+            self._pending = b""
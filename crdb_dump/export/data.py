@@ -1,26 +1,190 @@
-import csv
-import gzip
-import hashlib
 import json
 import os
+import re
+from contextlib import nullcontext
 import click
-from crdb_dump.utils.common import retry, get_table_locality
-from crdb_dump.utils.s3 import get_s3_client, upload_file_to_s3
+from crdb_dump.utils.common import retry, get_table_locality, default_workers
+from crdb_dump.utils.s3 import S3Uploader
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from sqlalchemy import text
 from crdb_dump.export.schema import collect_objects
+from crdb_dump.utils.catalog import CatalogSnapshot
+from crdb_dump.utils.concurrency import AdaptiveLimiter
 from crdb_dump.utils.db_connection import get_sqlalchemy_engine
+from crdb_dump.export.checkpoint import ExportCheckpoint, checkpoint_path, load_progress, find_pinned_aost
+from crdb_dump.export.chunks import ChunkWriter, CopyChunkSink
 from crdb_dump.utils.common import to_sql_literal, to_csv_literal, aost_clause
+from crdb_dump.utils.compression import check_codec
+from crdb_dump.utils.hashing import new_hasher, manifest_checksum_algo, DEFAULT_CHECKSUM_ALGO
 from crdb_dump.utils.identifiers import parse_object_name, quote_ident
 from crdb_dump.utils.io import validate_fq_table_names
 
 
+def get_primary_key(conn, obj, clause=""):
+    """Return the primary-key column names of ``obj`` in key order.
+
+    Tables created without an explicit primary key report CockroachDB's hidden
+    ``rowid`` column. Returns an empty list if no key could be found.
+    """
+    res = conn.execute(text(
+        "SELECT kcu.column_name FROM information_schema.table_constraints AS tc "
+        "JOIN information_schema.key_column_usage AS kcu "
+        "ON kcu.constraint_name = tc.constraint_name "
+        "AND kcu.table_schema = tc.table_schema AND kcu.table_name = tc.table_name" + clause +
+        " WHERE tc.constraint_type = 'PRIMARY KEY' AND tc.table_schema = :s AND tc.table_name = :t"
+        " ORDER BY kcu.ordinal_position"
+    ), {"t": obj.table, "s": obj.schema})
+    return [row[0] for row in res]
+
+
+def keyset_predicate(key_cols, last_key):
+    """Return ``(sql, params)`` selecting rows strictly after ``last_key``.
+
+    Uses a row-value comparison ``(a, b) > (:k0, :k1)`` so CockroachDB can seek
+    directly into the primary index instead of rescanning skipped rows.
+    """
+    if last_key is None:
+        return "", {}
+    cols = ", ".join(quote_ident(c) for c in key_cols)
+    binds = ", ".join(f":k{i}" for i in range(len(key_cols)))
+    return f" WHERE ({cols}) > ({binds})", {f"k{i}": v for i, v in enumerate(last_key)}
+
+
+# Rows sampled for split-point quantiles; far more than needed for even ranges.
+SPLIT_SAMPLE_ROWS = 100000
+
+
+def estimate_row_count(conn, obj):
+    """Return the row count from the table's latest optimizer statistics, or ``None``.
+
+    Statistics are catalog metadata, so this reads no table data.
+    """
+    try:
+        count = conn.execute(text(
+            f"SELECT row_count FROM [SHOW STATISTICS FOR TABLE {obj.fq_quoted()}] "
+            f"ORDER BY created DESC LIMIT 1"
+        )).scalar()
+    except Exception:
+        conn.rollback()  # don't leave the connection's transaction aborted
+        return None
+    return count if isinstance(count, int) else None
+
+
+def get_split_points(conn, obj, key_col, clause, ranges, logger, min_rows=0):
+    """Return up to ``ranges - 1`` ascending split values for the leading key column.
+
+    Split points are quantiles of the column, computed in one distributed
+    aggregate at the pinned AOST. Quantiles need a sort, so with table
+    statistics they come from a random sample of about ``SPLIT_SAMPLE_ROWS``
+    keys, and tables estimated below ``min_rows`` are not split at all.
+    Without statistics every key is sorted. Split points only balance the
+    ranges; any values give complete, non-overlapping ranges. Returns []
+    (export as a single range) if the quantiles cannot be computed or the
+    column has too few distinct values.
+    """
+    estimate = estimate_row_count(conn, obj)
+    if estimate is not None and estimate < min_rows:
+        logger.info(f"{obj.fq_plain()} has about {estimate} rows (under {min_rows}); "
+                    f"exporting it as one range")
+        return []
+    col = quote_ident(key_col)
+    source = obj.fq_quoted()
+    if estimate is None:
+        logger.info(f"No statistics for {obj.fq_plain()}; computing key ranges over every row")
+    elif estimate > SPLIT_SAMPLE_ROWS:
+        source = (f"(SELECT {col} FROM {obj.fq_quoted()} "
+                  f"WHERE random() < {SPLIT_SAMPLE_ROWS / estimate:.6g}) AS sample")
+    fractions = ", ".join(str(round(i / ranges, 6)) for i in range(1, ranges))
+    try:
+        values = conn.execute(text(
+            f"SELECT percentile_disc(ARRAY[{fractions}]) WITHIN GROUP (ORDER BY {col}) "
+            f"FROM {source}{clause}"
+        )).scalar()
+    except Exception as e:
+        logger.warning(f"Could not compute key ranges for {obj.fq_plain()}: {e}")
+        return []
+    if not isinstance(values, (list, tuple)):
+        logger.warning(f"Could not compute key ranges for {obj.fq_plain()}: unsupported key type")
+        return []
+    points = []
+    for v in values:
+        if v is not None and (not points or v != points[-1]):
+            points.append(v)
+    return points
+
+
+def range_bounds(key_col, split_points):
+    """Turn ascending split points into ``(sql, params)`` half-open key ranges."""
+    col = quote_ident(key_col)
+    bounds = []
+    for i in range(len(split_points) + 1):
+        conds, params = [], {}
+        if i > 0:
+            conds.append(f"{col} >= :lo")
+            params["lo"] = split_points[i - 1]
+        if i < len(split_points):
+            conds.append(f"{col} < :hi")
+            params["hi"] = split_points[i]
+        bounds.append((" AND ".join(conds), params))
+    return bounds
+
+
+def to_pyformat(query):
+    """Convert ``:name`` bind markers to psycopg2 ``%(name)s`` (escaping literal ``%``)."""
+    return re.sub(r":(\w+)", r"%(\1)s", query.replace("%", "%%"))
+
+
+def key_to_json(values, key_types):
+    """Encode a primary-key tuple for the manifest.
+
+    Values use their CSV text form (BYTES as ``\\x`` hex) so they can be bound
+    back as untyped literals; anything else non-JSON is stringified on dump.
+    """
+    return [to_csv_literal(v, t) for v, t in zip(values, key_types)]
+
+
 def export_table_data(engine, table, out_dir, export_format, split, limit, compress, order, order_desc,
                       chunk_size, order_strict, logger, locality_map, retry_count, retry_delay, opts):
     try:
         obj = parse_object_name(table, default_db=table.split('.')[0])
         base_name = obj.file_base()
         clause = aost_clause(opts.get("aost_resolved"))
+        written = opts.setdefault("written_chunks", {})
+        uploader = opts.get("s3_uploader")
+        uploads = []
+        # The run's adaptive limiter gates every chunk query, stream and COPY.
+        limiter = opts.get("limiter")
+        read_slot = limiter.slot if limiter else nullcontext
+        # --s3-stream writes chunks straight into S3 multipart uploads.
+        opener = (lambda path: uploader.open_stream(os.path.basename(path))) \
+            if uploader and opts.get("s3_stream") else None
+        checksum_algo = opts.get("checksum_algo") or DEFAULT_CHECKSUM_ALGO
+        manifest_path = os.path.join(out_dir, f"{base_name}.manifest.json")
+        # How chunk files are cut and encoded; resumed chunks must match it.
+        codec = ("gzip" if compress is True else (compress or None)) if export_format == "csv" else None
+        export_options = {
+            "compression": codec,
+            "compression_level": opts.get("compression_level") if codec else None,
+            "data_pagination": opts.get("data_pagination") or "offset",
+            "data_engine": opts.get("data_engine") or "python",
+        }
+
+        progress = load_progress(out_dir, base_name, logger) if opts.get("resume") else None
+        # A checkpoint, even of a finished table, only counts if it was taken
+        # with this run's format, chunk options, checksum algorithm and snapshot.
+        if progress:
+            header = progress["header"]
+            if header.get("format", export_format) != export_format \
+                    or header.get("export_options") != export_options \
+                    or manifest_checksum_algo(header) != checksum_algo \
+                    or header.get("as_of_system_time") != opts.get("aost_resolved"):
+                logger.warning(f"⚠️ {table} was checkpointed with a different format, compression, "
+                               f"pagination, checksum algorithm or AS OF SYSTEM TIME; exporting from scratch")
+                progress = None
+        if progress and progress["complete"]:
+            rows = sum(c["rows"] for chunks in progress["chunks"].values() for c in chunks)
+            logger.info(f"⏩ {table} already exported ({rows} rows); skipping")
+            return rows
         with retry(retries=retry_count, delay=retry_delay)(engine.connect)() as conn:
             if clause:
                 # Each AOST read runs in its own transaction at the SAME pinned
@@ -28,11 +192,17 @@ def export_table_data(engine, table, out_dir, export_format, split, limit, compr
                 # AUTOCOMMIT avoids "inconsistent AS OF SYSTEM TIME" across the
                 # column and chunk queries while still giving a consistent snapshot.
                 conn = conn.execution_options(isolation_level="AUTOCOMMIT")
-            cols_res = conn.execute(text(
-                "SELECT column_name, data_type FROM information_schema.columns" + clause +
-                " WHERE table_name = :t AND table_schema = :s ORDER BY ordinal_position"
-            ), {"t": obj.table, "s": obj.schema})
-            col_rows = list(cols_res)
+            # The run's catalog snapshot (read at the pinned AOST) answers
+            # column and key lookups; a table missing from it is queried.
+            catalog = opts.get("catalog")
+            col_rows = catalog.table_columns(obj.fq_plain()) if catalog else None
+            if col_rows is None:
+                catalog = None
+                cols_res = conn.execute(text(
+                    "SELECT column_name, data_type FROM information_schema.columns" + clause +
+                    " WHERE table_name = :t AND table_schema = :s ORDER BY ordinal_position"
+                ), {"t": obj.table, "s": obj.schema})
+                col_rows = list(cols_res)
             columns = [row[0] for row in col_rows]
             # Column types let the encoders distinguish e.g. a JSONB array
             # (JSON-encode) from a SQL ARRAY (array literal).
@@ -53,86 +223,266 @@ def export_table_data(engine, table, out_dir, export_format, split, limit, compr
             else:
                 order_clause = ""
 
-            offset = 0
+            # Keyset pagination seeks past the last exported primary key instead
+            # of OFFSET, which rescans every preceding row for each chunk.
+            # Range-split exports page by key too, so they imply keyset paging,
+            # and streamed exports order by key so chunks record their last key.
+            pagination = opts.get("data_pagination") or "offset"
+            data_engine = opts.get("data_engine") or "python"
+            ranges = opts.get("data_ranges") or 1
+            key_cols = []
+            if pagination in ("keyset", "stream") or ranges > 1:
+                if order:
+                    if pagination != "stream":
+                        logger.warning(f"Keyset pagination orders by primary key; using OFFSET pagination "
+                                       f"for {table} to honor --data-order.")
+                else:
+                    key_cols = catalog.primary_key(obj.fq_plain()) if catalog \
+                        else get_primary_key(conn, obj, clause)
+                    if not key_cols:
+                        logger.warning(f"No primary key found for {table}; "
+                                       f"exporting without key-ordered chunks.")
+            # A hidden key column (e.g. rowid) is not part of SELECT *; fetch it
+            # alongside the row and strip it before encoding.
+            extra_key_cols = [c for c in key_cols if c not in columns]
+            select_list = ", ".join(["*"] + [quote_ident(c) for c in extra_key_cols])
+            key_idx = [columns.index(c) if c in columns else len(columns) + extra_key_cols.index(c)
+                       for c in key_cols]
+            key_types = [col_types[i] if i < len(col_types) else None for i in key_idx]
+            key_order = ", ".join(quote_ident(c) for c in key_cols)
             batch_size = chunk_size if chunk_size else 1000
-            total_rows = 0
-            chunk_index = 1
-            manifest = []
-
-            def file_checksum(path):
-                h = hashlib.sha256()
-                with open(path, 'rb') as f:
-                    for chunk in iter(lambda: f.read(8192), b''):
-                        h.update(chunk)
-                return h.hexdigest()
-
-            while True:
-                query = f"SELECT * FROM {obj.fq_quoted()}{clause} {order_clause} OFFSET {offset} LIMIT {batch_size}"
-                if limit and offset >= limit:
-                    break
-                rows = conn.execute(text(query)).fetchall()
-                if not rows:
-                    break
-                total_rows += len(rows)
-                offset += batch_size
-
-                out_path = os.path.join(
-                    out_dir,
-                    f"{base_name}_{chunk_index:03d}.csv.gz" if compress
-                    else f"{base_name}_{chunk_index:03d}.csv"
-                ) if export_format == 'csv' else os.path.join(
-                    out_dir, f"{base_name}_{chunk_index:03d}.sql")
-
-                if export_format == 'csv':
-                    open_func = gzip.open if compress else open
-                    mode = 'wt' if compress else 'w'
-                    with open_func(out_path, mode, newline='') as f:
-                        writer = csv.writer(f, lineterminator='\n')
-                        writer.writerow(columns)
-                        writer.writerows(
-                            [[to_csv_literal(v, t) for v, t in zip(row, col_types)]
-                             for row in rows])
-                elif export_format == 'sql':
-                    col_list = ", ".join(quote_ident(c) for c in columns)
-                    with open(out_path, 'w') as f:
-                        for row in rows:
-                            vals = ", ".join(
-                                to_sql_literal(v, t) for v, t in zip(row, col_types))
-                            f.write(f"INSERT INTO {obj.fq_quoted()} ({col_list}) VALUES ({vals});\n")
-
-                checksum = file_checksum(out_path)
-                manifest.append({
-                    "file": os.path.basename(out_path),
-                    "rows": len(rows),
-                    "sha256": checksum
-                })
-
-                # ✅ S3 Upload
-                if opts.get("use_s3"):
-                    s3 = get_s3_client(
-                        endpoint_url=opts.get("s3_endpoint"),
-                        access_key=opts.get("s3_access_key"),
-                        secret_key=opts.get("s3_secret_key")
-                    )
-                    s3_key = f"{opts['s3_prefix']}{os.path.basename(out_path)}"
-                    upload_file_to_s3(s3, opts["s3_bucket"], s3_key, out_path)
-                    logger.info(f"☁️ Uploaded to S3: s3://{opts['s3_bucket']}/{s3_key}")
-
-                logger.info(f"Exported data for {table} chunk {chunk_index} to {out_path} ({len(rows)} rows)")
-                chunk_index += 1
-
-                if limit and total_rows >= limit:
-                    break
-
-            manifest_path = os.path.join(out_dir, f"{base_name}.manifest.json")
-            region = locality_map.get(table, "N/A")
-            with open(manifest_path, 'w') as mf:
-                json.dump({
+            # Streamed chunks roll over on size alone when only --chunk-bytes is set.
+            stream_chunk_rows = chunk_size or (None if opts.get("chunk_bytes") else 1000)
+            # The statement prefix (and its column list) is built once per table.
+            insert_verb = "UPSERT" if opts.get("sql_upsert") else "INSERT"
+            insert_prefix = (f"{insert_verb} INTO {obj.fq_quoted()} "
+                             f"({', '.join(quote_ident(c) for c in columns)}) VALUES")
+
+            def on_chunk(index, out_path, entry, last_key):
+                if key_cols and last_key is not None:
+                    entry["last_key"] = key_to_json(last_key, key_types)
+                checkpoint.record(entry)
+                # Digests computed while writing let --verify skip rereading these files.
+                written[os.path.abspath(out_path)] = entry
+
+                # ✅ S3 Upload, in the background while the next chunk is read
+                if opener:
+                    logger.info(f"☁️ Streamed to S3: s3://{uploader.bucket}/{uploader.key_for(entry['file'])}")
+                elif uploader:
+                    uploads.append(uploader.submit(out_path, os.path.basename(out_path),
+                                                   delete=opts.get("s3_delete_local")))
+
+                logger.info(f"Exported data for {table} chunk {index} to {out_path} ({entry['rows']} rows)")
+
+            def new_writer(file_prefix, max_rows, done=(), track_key=True):
+                return ChunkWriter(out_dir, file_prefix, export_format, compress, columns, col_types,
+                                   insert_prefix=insert_prefix, key_idx=key_idx if track_key else None,
+                                   max_rows=max_rows, done_chunks=done, opener=opener,
+                                   max_bytes=opts.get("chunk_bytes"), on_chunk=on_chunk,
+                                   checksum_algo=checksum_algo,
+                                   compression_level=opts.get("compression_level"),
+                                   compression_threads=opts.get("compression_threads") or 0,
+                                   sql_batch_size=opts.get("sql_batch_size") or 1)
+
+            def key_filter(bounds, last_key):
+                """WHERE clause and params for rows in ``bounds`` after ``last_key``."""
+                bounds_sql, bounds_params = bounds or ("", {})
+                where, params = keyset_predicate(key_cols, last_key)
+                if bounds_sql:
+                    where = f"{where} AND {bounds_sql}" if where else f" WHERE {bounds_sql}"
+                    params.update(bounds_params)
+                return where, params
+
+            def resume_key(done):
+                return done[-1]["last_key"] if done else None
+
+            def export_chunks(conn, file_prefix, bounds=None, done=()):
+                """Page through ``bounds`` (or the whole table) with one query per page."""
+                writer = new_writer(file_prefix, batch_size, done)
+                # A resumed export continues after the rows of its valid chunks.
+                offset = fetched = writer.total_rows
+                last_key = resume_key(done)
+                while True:
+                    if limit and offset >= limit:
+                        break
+                    if key_cols:
+                        where, params = key_filter(bounds, last_key)
+                        query = (f"SELECT {select_list} FROM {obj.fq_quoted()}{clause}{where} "
+                                 f"ORDER BY {key_order} LIMIT {batch_size}")
+                    else:
+                        query = f"SELECT * FROM {obj.fq_quoted()}{clause} {order_clause} OFFSET {offset} LIMIT {batch_size}"
+                        params = {}
+                    with read_slot():
+                        rows = conn.execute(text(query), params).fetchall()
+                    if not rows:
+                        break
+                    fetched += len(rows)
+                    offset += batch_size
+                    if key_cols:
+                        last_key = tuple(rows[-1][i] for i in key_idx)
+                    writer.write(rows)
+
+                    if limit and fetched >= limit:
+                        break
+                return writer.finish()
+
+            def export_stream(file_prefix, bounds=None, done=()):
+                """Read ``bounds`` (or the whole table) through one server-side cursor.
+
+                Only ``--fetch-size`` rows are held in memory at a time; chunk files
+                roll over on ``--chunk-size`` rows or ``--chunk-bytes`` bytes.
+                """
+                writer = new_writer(file_prefix, stream_chunk_rows, done)
+                where, params = key_filter(bounds, resume_key(done))
+                stream_order = f"ORDER BY {key_order}" if key_cols else order_clause
+                query = f"SELECT {select_list} FROM {obj.fq_quoted()}{where} {stream_order}"
+                if limit:
+                    query += f" LIMIT {int(limit) - writer.total_rows}"
+                fetch_size = opts.get("fetch_size") or 1000
+                with retry(retries=retry_count, delay=retry_delay)(engine.connect)() as stream_conn:
+                    # A server-side cursor lives inside one transaction, so the
+                    # pinned AOST is set on the transaction instead of the query.
+                    if clause:
+                        stream_conn.execute(text("SET TRANSACTION" + clause))
+                    with read_slot():
+                        result = stream_conn.execute(
+                            text(query).execution_options(yield_per=fetch_size), params)
+                    batches = result.partitions()
+                    while True:
+                        # Each fetch of --fetch-size rows takes its own slot.
+                        with read_slot():
+                            rows = next(batches, None)
+                        if rows is None:
+                            break
+                        writer.write(rows)
+                return writer.finish()
+
+            def export_copy(file_prefix, bounds=None, done=()):
+                """Stream ``COPY (SELECT ...) TO STDOUT WITH CSV`` bytes straight into chunks.
+
+                The server produces the same CSV that ``load`` feeds back to
+                ``COPY FROM``, so no value is decoded or re-encoded in Python.
+                """
+                # COPY output has no hidden key columns, so their last key is unknown.
+                writer = new_writer(file_prefix, stream_chunk_rows, done, track_key=not extra_key_cols)
+                where, params = key_filter(bounds, resume_key(done))
+                copy_order = f"ORDER BY {key_order}" if key_cols else order_clause
+                query = f"SELECT * FROM {obj.fq_quoted()}{where} {copy_order}"
+                if limit:
+                    query += f" LIMIT {int(limit) - writer.total_rows}"
+                raw_conn = retry(retries=retry_count, delay=retry_delay)(engine.raw_connection)()
+                try:
+                    with raw_conn.cursor() as cur:
+                        if clause:
+                            cur.execute("SET TRANSACTION" + clause)
+                        if params:
+                            # COPY takes no bind parameters; inline the range bounds.
+                            query = cur.mogrify(to_pyformat(query), params).decode("utf-8")
+                        sink = CopyChunkSink(writer)
+                        # COPY writes one row per call; every --fetch-size rows take a slot.
+                        gated = limiter.per_batch(sink, opts.get("fetch_size") or 1000) \
+                            if limiter else nullcontext(sink)
+                        with gated as target:
+                            cur.copy_expert(f"COPY ({query}) TO STDOUT WITH CSV HEADER", target)
+                        sink.close()
+                    raw_conn.commit()
+                finally:
+                    raw_conn.close()
+                return writer.finish()
+
+            split_points = []
+            if progress and progress["header"].get("split_points"):
+                # Keep the checkpointed range layout so every range resumes in place.
+                split_points = progress["header"]["split_points"]
+            elif ranges > 1 and key_cols:
+                if limit:
+                    logger.warning(f"--data-limit applies to the whole table; exporting {table} as one range.")
+                else:
+                    split_points = get_split_points(conn, obj, key_cols[0], clause, ranges, logger,
+                                                    opts.get("data_ranges_min_rows") or 0)
+
+            # Chunks that survived an interrupted run, per file prefix. Continuing
+            # needs each chunk's last key, or plain OFFSET paging to count rows.
+            done = progress["chunks"] if progress else {}
+            if key_cols:
+                resumable = not (data_engine == "copy" and extra_key_cols) and \
+                    all("last_key" in c for chunks in done.values() for c in chunks)
+            else:
+                resumable = not split_points and pagination == "offset" and data_engine == "python"
+            if done and not resumable:
+                logger.warning(f"⚠️ {table} cannot resume from its checkpoint in this mode; "
+                               f"exporting from scratch")
+                done = {}
+            if done:
+                logger.info(f"↩️ Resuming {table} after {sum(map(len, done.values()))} valid chunks")
+            if progress and os.path.exists(manifest_path):
+                # The checkpoint supersedes the stale manifest until the table finishes.
+                os.remove(manifest_path)
+            checkpoint = ExportCheckpoint(
+                checkpoint_path(out_dir, base_name),
+                {"table": obj.fq_plain(), "as_of_system_time": opts.get("aost_resolved"),
+                 "checksum_algo": checksum_algo, "format": export_format,
+                 "export_options": export_options, "split_points": split_points or None},
+                [entry for prefix in sorted(done) for entry in done[prefix]])
+
+            try:
+                if split_points:
+                    # Every range reads on its own connection at the same pinned AOST,
+                    # and is numbered by its position so the manifest is deterministic.
+                    key_ranges = range_bounds(key_cols[0], split_points)
+                    logger.info(f"🔀 Exporting {table} as {len(key_ranges)} key ranges")
+
+                    def export_range(index, bounds):
+                        file_prefix = f"{base_name}_r{index:03d}"
+                        range_done = done.get(file_prefix, [])
+                        if data_engine == "copy":
+                            return export_copy(file_prefix, bounds, range_done)
+                        if pagination == "stream":
+                            return export_stream(file_prefix, bounds, range_done)
+                        with retry(retries=retry_count, delay=retry_delay)(engine.connect)() as range_conn:
+                            if clause:
+                                range_conn = range_conn.execution_options(isolation_level="AUTOCOMMIT")
+                            return export_chunks(range_conn, file_prefix, bounds, range_done)
+
+                    with ThreadPoolExecutor(max_workers=len(key_ranges)) as executor:
+                        results = list(executor.map(export_range, range(1, len(key_ranges) + 1),
+                                                    key_ranges))
+                    manifest = [entry for chunks, _ in results for entry in chunks]
+                    total_rows = sum(rows for _, rows in results)
+                elif data_engine == "copy":
+                    manifest, total_rows = export_copy(base_name, done=done.get(base_name, []))
+                elif pagination == "stream":
+                    manifest, total_rows = export_stream(base_name, done=done.get(base_name, []))
+                else:
+                    manifest, total_rows = export_chunks(conn, base_name, done=done.get(base_name, []))
+
+                region = locality_map.get(table, "N/A")
+                manifest_doc = {
                     "table": obj.fq_plain(),
                     "as_of_system_time": opts.get("aost_resolved"),
                     "region": region,
+                    "checksum_algo": checksum_algo,
+                    "format": export_format,
+                    "export_options": export_options,
                     "chunks": manifest
-                }, mf, indent=2)
+                }
+                if key_cols:
+                    manifest_doc["pagination"] = "stream" if pagination == "stream" or data_engine == "copy" \
+                        else "keyset"
+                    manifest_doc["primary_key"] = key_cols
+                if split_points:
+                    manifest_doc["ranges"] = len(split_points) + 1
+                with open(manifest_path, 'w') as mf:
+                    json.dump(manifest_doc, mf, indent=2, default=str)
+                if uploader:
+                    # The manifest goes up only once every chunk it lists is in S3.
+                    for key in uploader.wait_all(uploads):
+                        logger.info(f"☁️ Uploaded to S3: s3://{uploader.bucket}/{key}")
+                    key = uploader.upload(manifest_path, os.path.basename(manifest_path))
+                    logger.info(f"☁️ Uploaded manifest to S3: s3://{uploader.bucket}/{key}")
+                checkpoint.remove()
+            finally:
+                checkpoint.close()
 
             logger.info(f"🌍 Exporting {table} (region: {region})")
             logger.info(f"Wrote manifest for {table} to {manifest_path}")
@@ -145,18 +495,69 @@ def export_table_data(engine, table, out_dir, export_format, split, limit, compr
 
 
 def export_data(opts, out_dir, logger):
-    engine = get_sqlalchemy_engine(opts)
+    if opts.get("data_engine") == "copy" and opts.get("data_format") != "csv":
+        raise click.UsageError("--data-engine=copy requires --data-format=csv.")
+    try:
+        new_hasher(opts.get("checksum_algo") or DEFAULT_CHECKSUM_ALGO)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    if (opts.get("sql_batch_size") or 1) < 1:
+        raise click.UsageError("--sql-batch-size must be at least 1.")
+
+    max_workers = default_workers() if opts.get("max_workers") is None else opts["max_workers"]
+    # Adaptive concurrency is opt-in: without --min-workers the limit is fixed.
+    min_workers = max_workers if opts.get("min_workers") is None else opts["min_workers"]
+    if max_workers < 1 or min_workers < 1:
+        raise click.UsageError("--max-workers and --min-workers must be at least 1.")
+    if min_workers > max_workers:
+        raise click.UsageError("--min-workers cannot exceed --max-workers.")
+
+    if opts.get("use_s3") and ((opts.get("s3_upload_workers") or 4) < 1
+                               or (opts.get("s3_upload_queue") or 0) < 0):
+        raise click.UsageError("--s3-upload-workers must be at least 1 and --s3-upload-queue at least 0.")
+    if (opts.get("s3_stream") or opts.get("s3_delete_local")) and not opts.get("use_s3"):
+        raise click.UsageError("--s3-stream and --s3-delete-local require --use-s3.")
+    if (opts.get("s3_stream") or opts.get("s3_delete_local")) and (opts.get("verify") or opts.get("resume")):
+        raise click.UsageError("--verify and --resume read local chunk files; "
+                               "they cannot be combined with --s3-stream or --s3-delete-local.")
+
+    # --data-compress is shorthand for --compression=gzip.
+    compression = opts.get("compression")
+    if compression == "none":
+        compression = None
+    if compression and opts.get("data_format") != "csv":
+        raise click.UsageError("--compression requires --data-format=csv.")
+    if opts.get("data_compress"):
+        if compression not in (None, "gzip"):
+            raise click.UsageError("--data-compress means gzip; use --compression alone to pick a codec.")
+        compression = "gzip"
+    if compression:
+        try:
+            check_codec(compression)
+        except ValueError as e:
+            raise click.UsageError(str(e))
+
+    engine = opts.get("engine") or get_sqlalchemy_engine(opts)
 
     retry_count = opts.get("retry_count", 3)
     retry_delay = opts.get("retry_delay", 1000) / 1000.0
 
     region_filter = opts.get("region")
-    locality_map = get_table_locality(engine, opts["db"], logger)
 
     # Pin the AS OF SYSTEM TIME value ONCE so every table and chunk reads the same
     # consistent snapshot. "auto" captures a single cluster_logical_timestamp().
     aost = opts.get("aost")
-    if aost == "auto":
+    resumed, pinned = find_pinned_aost(out_dir) if opts.get("resume") else (False, None)
+    if resumed:
+        # Resumed chunks must come from the snapshot the interrupted run pinned.
+        aost = pinned
+        if aost is None:
+            logger.warning("⚠️ Resuming an export taken without --as-of-system-time; "
+                           "resumed tables are not a consistent snapshot")
+        else:
+            logger.info("↩️ Resuming at the checkpointed AS OF SYSTEM TIME")
+    elif aost == "auto":
         with engine.connect() as conn:
             aost = str(conn.execute(text("SELECT cluster_logical_timestamp()")).scalar())
     elif aost == "follower":
@@ -182,10 +583,20 @@ def export_data(opts, out_dir, logger):
         print(str(engine.url))
         return
 
+    # One catalog snapshot at the pinned AOST serves table listing, localities,
+    # columns and primary keys for every table of the run.
+    catalog = CatalogSnapshot.load(engine, opts["db"], logger, aost=aost,
+                                   retry_count=retry_count, retry_delay=retry_delay,
+                                   cache_path=opts.get("catalog_cache_path"))
+    opts["catalog"] = catalog
+    locality_map = catalog.localities if catalog else get_table_locality(engine, opts["db"], logger)
+
     if opts['tables']:
         # Normalize user-provided names (table / schema.table / db.schema.table)
         # to three-part db.schema.table using --db as the default database.
         table_list = validate_fq_table_names(opts['tables'].split(','), opts['db'])
+    elif catalog:
+        table_list = list(catalog.objects["table"])
     else:
         table_list = collect_objects(engine, opts['db'], 'table', logger, retry_count, retry_delay)
 
@@ -202,21 +613,38 @@ def export_data(opts, out_dir, logger):
 
     data_tasks = [
         (engine, table, out_dir, opts['data_format'], opts['data_split'], opts['data_limit'],
-         opts['data_compress'], opts['data_order'], opts['data_order_desc'],
+         compression, opts['data_order'], opts['data_order_desc'],
          opts['chunk_size'], opts['data_order_strict'], logger)
         for table in table_list
     ]
 
-    if opts['data_parallel']:
-        results = []
-        with ThreadPoolExecutor() as executor:
-            futures = [executor.submit(wrapped_export, *args) for args in data_tasks]
-            for future in as_completed(futures):
-                results.append(future.result())
-    else:
-        results = [wrapped_export(*args) for args in data_tasks]
+    # One S3 client and upload pool shared by every table (and range) of the run.
+    if opts.get("use_s3"):
+        opts["s3_uploader"] = S3Uploader(
+            opts,
+            workers=opts.get("s3_upload_workers") or 4,
+            queue_size=8 if opts.get("s3_upload_queue") is None else opts["s3_upload_queue"])
+    # Concurrent tables and key ranges share one adaptive cap on in-flight reads.
+    if (opts['data_parallel'] or (opts.get("data_ranges") or 1) > 1) and min_workers < max_workers:
+        opts["limiter"] = AdaptiveLimiter(min_workers, max_workers, logger, name="Export workers")
+    try:
+        if opts['data_parallel']:
+            results = {}
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Tables finish in any order; each future maps back to its table.
+                futures = {executor.submit(wrapped_export, *args): args[1] for args in data_tasks}
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+        else:
+            results = {args[1]: wrapped_export(*args) for args in data_tasks}
+    finally:
+        if opts.get("s3_uploader"):
+            opts.pop("s3_uploader").close()
+        limiter = opts.pop("limiter", None)
+        if limiter:
+            logger.info(f"🎚️ Export workers peaked at {limiter.peak} and finished at {limiter.limit}")
 
-    table_row_counts = {t[1]: count for t, count in zip(data_tasks, results)}
+    table_row_counts = {t[1]: results[t[1]] for t in data_tasks}
     total_rows = sum(table_row_counts.values())
 
     for table, count in table_row_counts.items():
@@ -2,12 +2,13 @@ import json
 import os
 import click
 import yaml
-from crdb_dump.utils.common import retry
+from crdb_dump.utils.common import retry, default_workers
 from datetime import datetime, timezone
 from concurrent.futures import ThreadPoolExecutor
 from sqlalchemy import text
 from crdb_dump.utils.db_connection import get_sqlalchemy_engine
 from crdb_dump.utils.common import to_json_literal, get_table_locality
+from crdb_dump.utils.catalog import CatalogSnapshot
 from crdb_dump.utils.io import write_file, archive_output, normalize_filename, validate_fq_table_names
 from crdb_dump.utils.identifiers import ObjectName, parse_object_name, quote_ident
 
@@ -46,6 +47,57 @@ def dump_all_ddl(engine, db, logger, retry_count, retry_delay):
     return "\n".join(parts) + ("\n" if parts else "")
 
 
+# Kinds in the dependency-friendly order the per-object outputs use.
+DDL_KINDS = ("TYPE", "SEQUENCE", "TABLE", "VIEW")
+
+
+def fetch_ddl_index(engine, db, logger, retry_count, retry_delay):
+    """Return ``{"db.schema.name": (kind, ddl)}`` for every object in ``db``, or ``None``.
+
+    Two catalog queries (``crdb_internal.create_type_statements`` for enums and
+    ``crdb_internal.create_statements`` for tables, views and sequences)
+    replace a connection, ``USE`` and ``SHOW CREATE`` per object. Entries are
+    ordered by kind (see ``DDL_KINDS``), then schema and name; DDL text matches
+    :func:`dump_create_statement`. Returns ``None`` if the catalog cannot be
+    read or lists no objects, so callers can fall back to per-object statements.
+    """
+    by_kind = {kind: [] for kind in DDL_KINDS}
+    try:
+        with retry(retries=retry_count, delay=retry_delay)(engine.connect)() as conn:
+            # These crdb_internal tables only list the current database's objects.
+            conn.execute(text(f"USE {quote_ident(db)}"))
+            types = conn.execute(text(
+                "SELECT schema_name, descriptor_name, create_statement "
+                "FROM crdb_internal.create_type_statements "
+                "WHERE database_name = :db AND enum_members IS NOT NULL "
+                "ORDER BY schema_name, descriptor_name"
+            ), {"db": db})
+            for schema, name, stmt in types:
+                by_kind["TYPE"].append((schema, name, stmt))
+            objects = conn.execute(text(
+                "SELECT schema_name, descriptor_name, descriptor_type, create_statement "
+                "FROM crdb_internal.create_statements "
+                "WHERE database_name = :db AND NOT is_virtual AND NOT is_temporary "
+                "ORDER BY schema_name, descriptor_name"
+            ), {"db": db})
+            for schema, name, kind, stmt in objects:
+                if str(kind).upper() in by_kind:
+                    by_kind[str(kind).upper()].append((schema, name, stmt))
+    except Exception as e:
+        logger.warning(f"⚠️ Bulk DDL lookup failed, falling back to per-object SHOW CREATE: {e}")
+        return None
+
+    index = {}
+    for kind in DDL_KINDS:
+        for schema, name, stmt in by_kind[kind]:
+            if stmt and stmt.strip():
+                index[f"{db}.{schema}.{name}"] = (kind, stmt.rstrip().rstrip(";") + ";\n")
+    if not index:
+        logger.warning(f"⚠️ Bulk DDL lookup found no objects in {db}, falling back to per-object SHOW CREATE")
+        return None
+    return index
+
+
 def dump_create_statement(engine, obj_type, full_name, logger, retry_count, retry_delay):
     obj = parse_object_name(full_name, default_db=full_name.split('.')[0])
     try:
@@ -169,7 +221,7 @@ def resolve_object_types(engine, object_names, logger, retry_count, retry_delay)
     return mapping
 
 def export_schema(opts, out_dir, logger):
-    engine = get_sqlalchemy_engine(opts)
+    engine = opts.get("engine") or get_sqlalchemy_engine(opts)
     db = opts["db"]
     parallel = opts.get("parallel", False)
     per_table = opts.get("per_table", False)
@@ -184,7 +236,6 @@ def export_schema(opts, out_dir, logger):
     retry_delay = opts.get("retry_delay", 1000) / 1000.0
 
     region_filter = opts.get("region")
-    locality_map = get_table_locality(engine, db, logger)
 
     if include and exclude:
         raise click.UsageError("You cannot use --tables and --exclude-tables at the same time.")
@@ -201,22 +252,42 @@ def export_schema(opts, out_dir, logger):
             dump_permissions(engine, out_dir, logger, retry_count, retry_delay)
         return
 
-    # Selective / per-table / json / yaml path (per-object SHOW CREATE).
+    # Selective / per-table / json / yaml path: all DDL is read in bulk and
+    # indexed by name; per-object SHOW CREATE is only the fallback.
+    ddl_index = fetch_ddl_index(engine, db, logger, retry_count, retry_delay)
+    # Object kinds and localities come from one catalog snapshot.
+    catalog = CatalogSnapshot.load(engine, db, logger, columns=False,
+                                   retry_count=retry_count, retry_delay=retry_delay,
+                                   cache_path=opts.get("catalog_cache_path"))
+    locality_map = catalog.localities if catalog else get_table_locality(engine, db, logger)
     if include:
-        tables_fq = validate_fq_table_names(include.split(','), db)
-        object_map = resolve_object_types(engine, tables_fq, logger, retry_count, retry_delay)
-        all_objects = [(typ, name) for name, typ in object_map.items()]
+        tables_fq = list(dict.fromkeys(validate_fq_table_names(include.split(','), db)))
+        known = {name: kind for name, (kind, _) in (ddl_index or {}).items()}
+        if catalog:
+            known.update({name: catalog.kind_of(name) for name in tables_fq
+                          if name not in known and catalog.kind_of(name)})
+        unknown = [name for name in tables_fq if name not in known]
+        if unknown:
+            known.update(resolve_object_types(engine, unknown, logger, retry_count, retry_delay))
+        all_objects = [(known[name], name) for name in tables_fq if name in known]
     else:
-        tables = collect_objects(engine, db, 'table', logger, retry_count, retry_delay)
-        views = collect_objects(engine, db, 'view', logger, retry_count, retry_delay)
-        sequences = collect_objects(engine, db, 'sequence', logger, retry_count, retry_delay)
-        types = collect_objects(engine, db, 'type', logger, retry_count, retry_delay)
+        if ddl_index is not None:
+            all_objects = [(kind, name) for name, (kind, _) in ddl_index.items()]
+        else:
+            if catalog:
+                tables, views, sequences, types = (catalog.objects[kind]
+                                                   for kind in ("table", "view", "sequence", "type"))
+            else:
+                tables = collect_objects(engine, db, 'table', logger, retry_count, retry_delay)
+                views = collect_objects(engine, db, 'view', logger, retry_count, retry_delay)
+                sequences = collect_objects(engine, db, 'sequence', logger, retry_count, retry_delay)
+                types = collect_objects(engine, db, 'type', logger, retry_count, retry_delay)
 
-        # Dependency-friendly order: types -> sequences -> tables -> views.
-        all_objects = [("TYPE", name) for name in types] + \
-                      [("SEQUENCE", name) for name in sequences] + \
-                      [("TABLE", name) for name in tables] + \
-                      [("VIEW", name) for name in views]
+            # Dependency-friendly order: types -> sequences -> tables -> views.
+            all_objects = [("TYPE", name) for name in types] + \
+                          [("SEQUENCE", name) for name in sequences] + \
+                          [("TABLE", name) for name in tables] + \
+                          [("VIEW", name) for name in views]
 
         if region_filter:
             before = len(all_objects)
@@ -238,7 +309,11 @@ def export_schema(opts, out_dir, logger):
     dump_data = []
 
     def process(obj_type, full_name):
-        ddl = dump_create_statement(engine, obj_type, full_name, logger, retry_count, retry_delay)
+        indexed = (ddl_index or {}).get(full_name)
+        if indexed is not None:
+            ddl = indexed[1]
+        else:
+            ddl = dump_create_statement(engine, obj_type, full_name, logger, retry_count, retry_delay)
         if not ddl:
             return  # Skip entirely if no DDL returned
 
@@ -254,7 +329,7 @@ def export_schema(opts, out_dir, logger):
             logger.info(f"Appended {full_name} to {aggregate_file}")
 
     if parallel:
-        with ThreadPoolExecutor() as executor:
+        with ThreadPoolExecutor(max_workers=default_workers()) as executor:
             list(executor.map(lambda args: process(*args), all_objects))
     else:
         for obj in all_objects:
@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks; a journal is then per-process only.
+    fcntl = None
+
+
+class ResumeJournal:
+    """Append-only log of loaded chunks, one JSON line per chunk.
+
+    Each completed chunk costs one small appended line instead of a rewrite of
+    the whole resume file. Appends take an exclusive ``flock`` so several
+    ``load`` processes can share a journal, and are fsynced in batches of
+    ``fsync_every`` lines (or after ``fsync_interval`` seconds) and on close.
+
+    Opening a journal reads it into per-table sets for O(1) lookups and
+    compacts it when it holds duplicates or is in the original JSON format
+    (``{"<log key>": ["<chunk>", ...]}``), which is still read transparently.
+    """
+
+    def __init__(self, path, fsync_every=64, fsync_interval=1.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._loaded = {}
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._file = open(path, "a+", encoding="utf-8")
+        with self._locked():
+            self._read_and_compact()
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def _read_and_compact(self):
+        self._file.seek(0)
+        content = self._file.read()
+        entries = 0
+        try:
+            doc = json.loads(content) if content.strip() else None
+        except ValueError:
+            doc = None
+        legacy = isinstance(doc, dict) and all(isinstance(v, list) for v in doc.values())
+        if legacy:
+            for key, chunks in doc.items():
+                self._loaded.setdefault(key, set()).update(chunks)
+        else:
+            for line in content.splitlines():
+                try:
+                    entry = json.loads(line)
+                    self._loaded.setdefault(entry["table"], set()).add(entry["chunk"])
+                    entries += 1
+                except (ValueError, KeyError, TypeError):
+                    # A torn final line from a crash mid-append; compaction drops it.
+                    entries += 1
+        if legacy or entries != sum(len(c) for c in self._loaded.values()):
+            # Rewrite in place (same inode) while holding the lock, so other
+            # processes appending to this journal keep writing to the live file.
+            self._file.seek(0)
+            self._file.truncate()
+            for key in sorted(self._loaded):
+                for chunk in sorted(self._loaded[key]):
+                    self._file.write(json.dumps({"table": key, "chunk": chunk}) + "\n")
+            self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def loaded(self, log_key):
+        """Set of chunk names already loaded for ``log_key``."""
+        return set(self._loaded.get(log_key, ()))
+
+    def __contains__(self, key_and_chunk):
+        log_key, chunk = key_and_chunk
+        return chunk in self._loaded.get(log_key, ())
+
+    def record(self, log_key, chunk):
+        """Append ``chunk`` as loaded for ``log_key``."""
+        line = json.dumps({"table": log_key, "chunk": chunk}) + "\n"
+        with self._lock:
+            if chunk in self._loaded.get(log_key, ()):
+                return
+            self._loaded.setdefault(log_key, set()).add(chunk)
+            with self._locked():
+                self._file.write(line)
+                self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every or \
+                    time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+
+def open_journal(journals, path):
+    """Return the journal for ``path`` from ``journals``, opening it on first use."""
+    if not path:
+        return None
+    key = os.path.abspath(path)
+    if key not in journals:
+        journals[key] = ResumeJournal(path)
+    return journals[key]
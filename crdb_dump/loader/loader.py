@@ -1,14 +1,21 @@
 import csv
+import io
 import json
 import os
+import re
+from contextlib import contextmanager
 import psycopg2.extras
 import sqlparse
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from sqlalchemy import text
-from crdb_dump.utils.common import retry
-from crdb_dump.utils.db_connection import get_psycopg_connection
+from crdb_dump.loader.journal import open_journal
+from crdb_dump.loader.scheduler import run_load_plans
+from crdb_dump.utils.common import retry, default_workers, RETRYABLE_EXCEPTIONS
+from crdb_dump.utils.concurrency import AdaptiveLimiter
+from crdb_dump.utils.compression import open_chunk, codec_for_path, decompress_stream
+from crdb_dump.utils.db_connection import get_psycopg_connection, PsycopgPool
+from crdb_dump.utils.hashing import file_checksum, manifest_checksum_algo, chunk_checksum, HashingReader
 from crdb_dump.utils.identifiers import parse_object_name
-from crdb_dump.utils.s3 import get_s3_client, download_file_from_s3
+from crdb_dump.utils.s3 import S3Prefetcher, MB
 
 
 def _split_sql_statements(sql):
@@ -42,19 +49,37 @@ def load_schema(schema_path, engine, logger):
         return False
 
 
-def validate_csv_header(table, filepath, logger, opts=None):
-    obj = parse_object_name(table, default_db=table.split('.')[0])
+@contextmanager
+def _connection(opts=None, pool=None):
+    """Check a connection out of ``pool``, or open (and close) a dedicated one."""
+    if pool is not None:
+        with pool.connection() as conn:
+            yield conn
+        return
     conn = get_psycopg_connection(opts)
-    with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
-        cur.execute(
-            "SELECT column_name FROM information_schema.columns "
-            "WHERE table_name = %s AND table_schema = %s ORDER BY ordinal_position",
-            (obj.table, obj.schema))
-        db_columns = [row[0] for row in cur.fetchall()]
-
-    with open(filepath, 'r') as f:
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def validate_csv_header(table, filepath, logger, opts=None, pool=None, compression=None):
+    with io.TextIOWrapper(open_chunk(filepath, compression), encoding='utf-8', newline='') as f:
         reader = csv.reader(f)
         csv_header = next(reader)
+    return _header_matches(table, csv_header, logger, opts, pool)
+
+
+def _header_matches(table, csv_header, logger, opts=None, pool=None):
+    obj = parse_object_name(table, default_db=table.split('.')[0])
+    with _connection(opts, pool) as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
+            cur.execute(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_name = %s AND table_schema = %s ORDER BY ordinal_position",
+                (obj.table, obj.schema))
+            db_columns = [row[0] for row in cur.fetchall()]
+        conn.rollback()
 
     if db_columns != csv_header:
         logger.warning(f"Header mismatch for {table}:\nDB:   {db_columns}\nFile: {csv_header}")
@@ -62,52 +87,205 @@ def validate_csv_header(table, filepath, logger, opts=None):
     return True
 
 
-def load_chunk(table, file_path, engine, logger, validate=False, opts=None):
-    try:
-        local_path = file_path
-
-        if opts and opts.get("use_s3"):
-            s3 = get_s3_client(
-                endpoint_url=opts.get("s3_endpoint"),
-                access_key=opts.get("s3_access_key"),
-                secret_key=opts.get("s3_secret_key")
-            )
-            s3_key = f"{opts['s3_prefix']}{os.path.basename(file_path)}"
-            local_path = f"/tmp/{os.path.basename(file_path)}"
-            download_file_from_s3(s3, opts["s3_bucket"], s3_key, local_path)
-            logger.info(f"☁️ Downloaded from S3: s3://{opts['s3_bucket']}/{s3_key}")
-
-        if validate and not validate_csv_header(table, local_path, logger, opts):
-            logger.error(f"Skipping load for {file_path} due to header mismatch.")
-            return False
+# Statements executed per transaction when loading SQL chunks.
+DEFAULT_SQL_BATCH_STATEMENTS = 100
+_SQL_SPECIAL = re.compile(r"['\";]")
+
+
+def chunk_format(path):
+    """``sql`` or ``csv``, from a chunk file name (ignoring any codec suffix)."""
+    if codec_for_path(path):
+        path = os.path.splitext(path)[0]
+    return "sql" if path.lower().endswith(".sql") else "csv"
+
+
+def iter_sql_statements(f, block_size=1 << 20):
+    """Yield the statements of a SQL data chunk read from the text stream ``f``.
+
+    Splits on ``;`` outside single-quoted literals and double-quoted
+    identifiers, the only quoting crdb-dump writes in SQL chunks, and reads
+    ``block_size`` characters at a time so large chunks are never held whole.
+    """
+    pending = []
+    quote = None
+    while True:
+        block = f.read(block_size)
+        if not block:
+            break
+        start = i = 0
+        while True:
+            if quote:
+                # A doubled quote ('') simply closes and reopens the literal.
+                j = block.find(quote, i)
+                if j < 0:
+                    break
+                quote, i = None, j + 1
+                continue
+            m = _SQL_SPECIAL.search(block, i)
+            if not m:
+                break
+            i = m.end()
+            if m.group() == ";":
+                pending.append(block[start:i - 1])
+                stmt = "".join(pending).strip()
+                pending, start = [], i
+                if stmt:
+                    yield stmt
+            else:
+                quote = m.group()
+        pending.append(block[start:])
+    stmt = "".join(pending).strip()
+    if stmt:
+        yield stmt
+
+
+def _load_sql_chunk(local_path, compression=None, opts=None, pool=None):
+    """Execute a SQL chunk in one transaction, ``sql_batch_statements`` statements at a time.
 
-        obj = parse_object_name(table, default_db=table.split('.')[0])
-        conn = get_psycopg_connection(opts)
+    Each batch is sent as one multi-statement query, so it costs a single round
+    trip on the (pooled) connection. The chunk commits once at the end, so a
+    retried chunk (and the resume journal) never sees half of it applied.
+    """
+    batch_size = (opts or {}).get("sql_batch_statements") or DEFAULT_SQL_BATCH_STATEMENTS
+    with _connection(opts, pool) as conn:
+        with conn.cursor() as cur, \
+                io.TextIOWrapper(open_chunk(local_path, compression), encoding='utf-8') as f:
+            batch = []
+            for stmt in iter_sql_statements(f):
+                batch.append(stmt)
+                if len(batch) >= batch_size:
+                    cur.execute(";\n".join(batch))
+                    batch = []
+            if batch:
+                cur.execute(";\n".join(batch))
+        conn.commit()
+
+
+def _copy_csv(table, f, opts=None, pool=None, before_commit=None):
+    """``COPY`` the CSV stream ``f`` into ``table``; commit unless ``before_commit`` says no."""
+    obj = parse_object_name(table, default_db=table.split('.')[0])
+    with _connection(opts, pool) as conn:
         with conn.cursor() as cur:
-            with open(local_path, "r") as f:
-                sql = f"COPY {obj.fq_quoted()} FROM STDIN WITH CSV HEADER"
-                cur.copy_expert(sql, f)
+            sql = f"COPY {obj.fq_quoted()} FROM STDIN WITH CSV HEADER"
+            cur.copy_expert(sql, f)
+        if before_commit is not None and not before_commit():
+            conn.rollback()
+            return False
         conn.commit()
-        conn.close()
+    return True
+
+
+def _load_local_chunk(table, file_path, local_path, logger, validate=False, opts=None, checksum=None,
+                      pool=None, compression=None, data_format=None, verified=None):
+    if verified is None and checksum:
+        algo, expected = checksum
+        verified = file_checksum(local_path, algo) == expected
+    if verified is False:
+        logger.error(f"❌ Checksum mismatch for {file_path} ({checksum[0]}); skipping load.")
+        return False
+
+    if (data_format or chunk_format(file_path)) == "sql":
+        _load_sql_chunk(local_path, compression, opts, pool)
         logger.info(f"✔️ Loaded chunk: {file_path}")
         return True
-    except Exception as e:
-        logger.error(f"❌ Failed to load chunk {file_path}: {e}")
+
+    if validate and not validate_csv_header(table, local_path, logger, opts, pool=pool,
+                                            compression=compression):
+        logger.error(f"Skipping load for {file_path} due to header mismatch.")
         return False
 
+    # Compressed chunks are decompressed as COPY reads them.
+    with open_chunk(local_path, compression) as f:
+        _copy_csv(table, f, opts, pool)
+    logger.info(f"✔️ Loaded chunk: {file_path}")
+    return True
 
-def load_chunks_from_manifest(manifest_path, data_dir, engine, logger,
-                              resume_file=None, resume_log_dir=None,
-                              parallel=False, validate=False,
-                              retry_count=3, retry_delay=1.0,
-                              resume_strict=False, region_filter=None, opts=None):
 
-    table_loaded = 0
-    skipped = 0
-    failed = 0
+def _stream_csv_chunk(source, table, file_path, logger, validate=False, opts=None, checksum=None,
+                      pool=None, compression=None):
+    """``COPY`` a CSV chunk straight from its S3 object, never staging it on disk.
 
-    wrapped_load_chunk = retry(retries=retry_count, delay=retry_delay)(load_chunk)
+    The checksum is computed as ``COPY`` reads the object and checked before
+    the transaction commits, so a corrupt chunk is rolled back, not loaded.
+    """
+    if validate:
+        body = source.open_object(file_path)
+        try:
+            with io.TextIOWrapper(decompress_stream(body, compression), encoding='utf-8', newline='') as f:
+                csv_header = next(csv.reader(f))
+        finally:
+            body.close()
+        if not _header_matches(table, csv_header, logger, opts, pool):
+            logger.error(f"Skipping load for {file_path} due to header mismatch.")
+            return False
+
+    body = source.open_object(file_path)
+    try:
+        raw = HashingReader(body, checksum[0]) if checksum else body
+
+        def _verify():
+            if not checksum:
+                return True
+            raw.drain()
+            if raw.hexdigest() != checksum[1]:
+                logger.error(f"❌ Checksum mismatch for {file_path} ({checksum[0]}); rolled back.")
+                return False
+            return True
 
+        f = decompress_stream(raw, compression)
+        try:
+            loaded = _copy_csv(table, f, opts, pool, before_commit=_verify)
+        finally:
+            if f is not raw:
+                f.close()
+    finally:
+        body.close()
+    if loaded:
+        logger.info(f"✔️ Loaded chunk: {file_path} (streamed from S3)")
+    return loaded
+
+
+def load_chunk(table, file_path, engine, logger, validate=False, opts=None, checksum=None, pool=None,
+               compression=None, data_format=None):
+    try:
+        if not (opts and opts.get("use_s3")):
+            return _load_local_chunk(table, file_path, file_path, logger, validate, opts, checksum,
+                                     pool, compression, data_format)
+
+        # load_plans shares one prefetcher across workers; a direct call gets its own.
+        source = opts.get("s3_source")
+        owns_source = source is None
+        if owns_source:
+            source = S3Prefetcher(opts)
+        try:
+            if opts.get("s3_direct") and (data_format or chunk_format(file_path)) == "csv":
+                return _stream_csv_chunk(source, table, file_path, logger, validate, opts, checksum,
+                                         pool, compression)
+            with source.fetch(file_path, checksum) as (local_path, verified):
+                logger.info(f"☁️ Downloaded from S3: s3://{source.bucket}/{source.key_for(file_path)}")
+                return _load_local_chunk(table, file_path, local_path, logger, validate, opts, checksum,
+                                         pool, compression, data_format, verified=verified)
+        finally:
+            if owns_source:
+                source.close()
+    except RETRYABLE_EXCEPTIONS:
+        # Let the retry wrapper reconnect (the pool has discarded the connection).
+        raise
+    except Exception as e:
+        logger.error(f"❌ Failed to load chunk {file_path}: {e}")
+        return False
+
+
+def plan_manifest(manifest_path, data_dir, logger, resume_file=None, resume_log_dir=None,
+                  region_filter=None, verify_chunks=False, journals=None):
+    """Read a manifest and return its table's load plan, or ``None`` if filtered out.
+
+    The plan lists the chunks still to load as ``(table, path, checksum,
+    compression, format)`` tasks (chunks already in the resume log are counted as skipped) and the
+    table's total row count, which the scheduler uses to order tables.
+    Resume journals are opened through ``journals`` (path -> journal) so
+    tables sharing a resume log share one journal.
+    """
     with open(manifest_path) as mf:
         manifest = json.load(mf)
 
@@ -117,68 +295,128 @@ def load_chunks_from_manifest(manifest_path, data_dir, engine, logger,
 
     if region_filter and region_filter.lower() not in manifest_region.lower():
         logger.info(f"⏩ Skipping {table} due to region filter: {region_filter} (manifest says: {manifest_region})")
-        return 0, 0, 0
+        return None
 
     if resume_log_dir:
         os.makedirs(resume_log_dir, exist_ok=True)
         resume_file = os.path.join(resume_log_dir, f"{log_key}.json")
 
-    loaded_chunks = set()
-    if resume_file and os.path.exists(resume_file):
-        with open(resume_file) as f:
-            loaded_chunks = set(json.load(f).get(log_key, []))
+    journal = open_journal({} if journals is None else journals, resume_file)
+    loaded_chunks = journal.loaded(log_key) if journal else set()
 
+    algo = manifest_checksum_algo(manifest)
+    data_format = manifest.get('format')
     tasks = []
+    skipped = 0
     for chunk in manifest['chunks']:
         chunk_file = os.path.join(data_dir, chunk['file'])
         if chunk['file'] in loaded_chunks:
             logger.info(f"⏩ Skipped already loaded: {chunk['file']}")
             skipped += 1
             continue
-        tasks.append((table, chunk_file))
-
-    def _update_log(chunk_name):
-        if resume_file:
-            current = {}
-            if os.path.exists(resume_file):
-                with open(resume_file) as f:
-                    current = json.load(f)
-            loaded = set(current.get(log_key, []))
-            loaded.add(chunk_name)
-            current[log_key] = sorted(list(loaded))
-            with open(resume_file, 'w') as f:
-                json.dump(current, f, indent=2)
-
-    def _load_task(table, path):
-        success = wrapped_load_chunk(table, path, engine, logger, validate=validate, opts=opts)
-        return path, success
-
-    if parallel:
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(_load_task, t, p): p for t, p in tasks}
-            for future in as_completed(futures):
-                path, success = future.result()
-                if success:
-                    table_loaded += 1
-                    loaded_chunks.add(os.path.basename(path))
-                    _update_log(os.path.basename(path))
-                else:
-                    failed += 1
-                    if resume_strict:
-                        logger.error(f"❌ Aborting due to failed chunk: {path}")
-                        break
-    else:
-        for table, path in tasks:
-            success = _load_task(table, path)[1]
-            if success:
-                table_loaded += 1
-                loaded_chunks.add(os.path.basename(path))
-                _update_log(os.path.basename(path))
-            else:
-                failed += 1
-                if resume_strict:
-                    logger.error(f"❌ Aborting due to failed chunk: {path}")
-                    break
+        expected = chunk_checksum(manifest, chunk) if verify_chunks else None
+        tasks.append((table, chunk_file, (algo, expected) if expected else None,
+                      chunk.get('compression'), data_format or chunk_format(chunk['file'])))
 
-    logger.info(f"✅ Loaded {table_loaded} chunks | ⏩ Skipped: {skipped} | ❌ Failed: {failed}")
-    return table_loaded, skipped, failed
+    return {
+        "table": table,
+        "tasks": tasks,
+        "skipped": skipped,
+        "rows": sum(chunk.get('rows', 0) for chunk in manifest['chunks']),
+        "resume_file": resume_file,
+        "journal": journal,
+        "log_key": log_key,
+    }
+
+
+def load_plans(plans, engine, logger, max_workers=1, table_workers=None, validate=False,
+               retry_count=3, retry_delay=1.0, resume_strict=False, opts=None, pool=None,
+               min_workers=None):
+    """Load the chunks of every plan through one scheduler and connection pool.
+
+    With ``min_workers`` below ``max_workers`` the number of concurrent
+    ``COPY`` statements adapts between the two (see
+    :class:`~crdb_dump.utils.concurrency.AdaptiveLimiter`).
+
+    Returns ``{table: (loaded, skipped, failed)}``.
+    """
+    limiter = None
+    if min_workers is not None and min_workers < max_workers:
+        limiter = AdaptiveLimiter(min_workers, max_workers, logger, name="Load workers")
+    wrapped_load_chunk = retry(retries=retry_count, delay=retry_delay,
+                               on_retry=limiter.record_error if limiter else None)(load_chunk)
+
+    # Workers share one bounded pool instead of opening a connection per chunk.
+    owns_pool = pool is None
+    if owns_pool:
+        pool = PsycopgPool(opts, size=max_workers)
+
+    source = None
+    if opts and opts.get("use_s3"):
+        # Download chunks ahead of the workers, in roughly the order the
+        # scheduler hands them out (largest tables first).
+        ordered = sorted(plans, key=lambda p: (p["rows"], len(p["tasks"])), reverse=True)
+        order = [(task[1], task[2]) for plan in ordered for task in plan["tasks"]
+                 if not (opts.get("s3_direct") and task[4] == "csv")]
+        source = S3Prefetcher(opts, order, workers=opts.get("s3_prefetch", 4),
+                              max_bytes=opts.get("s3_prefetch_mb", 1024) * MB)
+        opts = dict(opts, s3_source=source)
+
+    def _load_task(task):
+        table, path, checksum, compression, data_format = task
+        try:
+            return wrapped_load_chunk(table, path, engine, logger, validate=validate, opts=opts,
+                                      checksum=checksum, pool=pool, compression=compression,
+                                      data_format=data_format)
+        except RETRYABLE_EXCEPTIONS as e:
+            if limiter:
+                limiter.record_error(e)
+            logger.error(f"❌ Failed to load chunk {path} after {retry_count} attempts: {e}")
+            return False
+
+    def _on_result(plan, task, success):
+        if success:
+            if plan.get("journal"):
+                plan["journal"].record(plan["log_key"], os.path.basename(task[1]))
+        elif resume_strict:
+            logger.error(f"❌ Aborting {plan['table']} due to failed chunk: {task[1]}")
+
+    def _on_table_done(plan):
+        logger.info(f"✅ {plan['table']}: Loaded {plan['loaded']} chunks | "
+                    f"⏩ Skipped: {plan['skipped']} | ❌ Failed: {plan['failed']}")
+
+    try:
+        plans = run_load_plans(plans, _load_task, on_result=_on_result, on_table_done=_on_table_done,
+                               max_workers=max_workers, table_workers=table_workers,
+                               resume_strict=resume_strict, limiter=limiter)
+        if limiter:
+            logger.info(f"🎚️ Load workers peaked at {limiter.peak} and finished at {limiter.limit}")
+    finally:
+        if owns_pool:
+            pool.close()
+        if source is not None:
+            source.close()
+        for journal in {id(p["journal"]): p["journal"] for p in plans if p.get("journal")}.values():
+            journal.close()
+
+    return {plan["table"]: (plan["loaded"], plan["skipped"], plan["failed"]) for plan in plans}
+
+
+def load_chunks_from_manifest(manifest_path, data_dir, engine, logger,
+                              resume_file=None, resume_log_dir=None,
+                              parallel=False, validate=False,
+                              retry_count=3, retry_delay=1.0,
+                              resume_strict=False, region_filter=None, opts=None,
+                              verify_chunks=False, pool=None, min_workers=None):
+    """Load a single manifest's chunks; returns ``(loaded, skipped, failed)``."""
+    plan = plan_manifest(manifest_path, data_dir, logger, resume_file=resume_file,
+                         resume_log_dir=resume_log_dir, region_filter=region_filter,
+                         verify_chunks=verify_chunks)
+    if plan is None:
+        return 0, 0, 0
+    results = load_plans([plan], engine, logger,
+                         max_workers=default_workers() if parallel else 1,
+                         validate=validate, retry_count=retry_count, retry_delay=retry_delay,
+                         resume_strict=resume_strict, opts=opts, pool=pool,
+                         min_workers=min_workers if parallel else None)
+    return results[plan["table"]]
@@ -0,0 +1,97 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run_load_plans(plans, run_task, on_result=None, on_table_done=None,
+                   max_workers=1, table_workers=None, resume_strict=False, limiter=None):
+    """Load the chunk tasks of many tables through one bounded pool of workers.
+
+    ``plans`` are table plans from :func:`crdb_dump.loader.loader.plan_manifest`.
+    Tables are started largest first (by manifest row count) so the biggest
+    tables do not end up running alone at the end of the load. At most
+    ``max_workers`` chunks run at once across all tables, and at most
+    ``table_workers`` (if set) from any single table.
+
+    ``run_task(task)`` loads one chunk and returns ``True`` on success;
+    ``on_result(plan, task, success)`` is called after each chunk and
+    ``on_table_done(plan)`` once a table has no chunks left to run. With
+    ``resume_strict`` a table stops scheduling chunks after its first failure.
+    A :class:`~crdb_dump.utils.concurrency.AdaptiveLimiter` as ``limiter``
+    further caps, and adapts, how many of the ``max_workers`` run chunks.
+    """
+    plans = sorted(plans, key=lambda p: (p["rows"], len(p["tasks"])), reverse=True)
+    for plan in plans:
+        plan.update(next=0, active=0, loaded=0, failed=0, aborted=False)
+    cond = threading.Condition()
+
+    def exhausted(plan):
+        return plan["aborted"] or plan["next"] >= len(plan["tasks"])
+
+    def next_task():
+        with cond:
+            while True:
+                waiting = False
+                for plan in plans:
+                    if exhausted(plan):
+                        continue
+                    if table_workers and plan["active"] >= table_workers:
+                        waiting = True
+                        continue
+                    task = plan["tasks"][plan["next"]]
+                    plan["next"] += 1
+                    plan["active"] += 1
+                    return plan, task
+                if not waiting:
+                    return None
+                cond.wait()
+
+    def finish_task(plan, success):
+        with cond:
+            plan["active"] -= 1
+            plan["loaded" if success else "failed"] += 1
+            if not success and resume_strict:
+                plan["aborted"] = True
+            cond.notify_all()
+            return plan["active"] == 0 and exhausted(plan)
+
+    def run_next():
+        picked = next_task()
+        if picked is None:
+            return False
+        plan, task = picked
+        success = False
+        try:
+            success = run_task(task)
+        finally:
+            if on_result:
+                on_result(plan, task, success)
+            if finish_task(plan, success) and on_table_done:
+                on_table_done(plan)
+        return True
+
+    def worker():
+        while True:
+            if limiter is None:
+                if not run_next():
+                    return
+                continue
+            started = limiter.acquire()
+            ran = False
+            try:
+                ran = run_next()
+            finally:
+                limiter.release(started, sample=ran)
+            if not ran:
+                return
+
+    for plan in plans:
+        if not plan["tasks"] and on_table_done:
+            on_table_done(plan)
+
+    if max_workers <= 1:
+        worker()
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for future in [executor.submit(worker) for _ in range(max_workers)]:
+                future.result()
+    return plans
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+from sqlalchemy import text
+from crdb_dump.utils.common import retry, aost_clause, get_table_locality
+from crdb_dump.utils.identifiers import quote_ident
+
+_NOT_SYSTEM = "NOT IN ('pg_catalog', 'information_schema', 'crdb_internal', 'pg_extension')"
+
+_ENUMS_QUERY = ("SELECT n.nspname, t.typname FROM pg_catalog.pg_type AS t "
+                "JOIN pg_catalog.pg_namespace AS n ON n.oid = t.typnamespace{clause} "
+                "WHERE t.typtype = 'e' ORDER BY n.nspname, t.typname")
+
+# Bump when the cache file layout changes; older files are then ignored.
+CATALOG_CACHE_VERSION = 1
+
+# information_schema.tables table_type -> object kind.
+_TABLE_KINDS = {"BASE TABLE": "table", "VIEW": "view", "MATERIALIZED VIEW": "view", "SEQUENCE": "sequence"}
+
+
+class CatalogSnapshot:
+    """One database's tables, views, sequences, enums, localities, columns and keys.
+
+    :meth:`load` reads them with a handful of set-based queries (one per kind
+    of information, at the pinned AS OF SYSTEM TIME when one is given) instead
+    of several queries per object, and every lookup is then served from
+    memory. Object names are three-part ``db.schema.name`` strings; listings
+    are ordered by schema and name, like ``SHOW TABLES``.
+    """
+
+    def __init__(self, db, objects=None, localities=None, columns=None, primary_keys=None):
+        self.db = db
+        self.objects = {kind: [] for kind in ("table", "view", "sequence", "type")}
+        self.objects.update(objects or {})
+        self.localities = localities or {}
+        # Whether column and key lookups were loaded (``load(columns=True)``).
+        self.has_columns = columns is not None
+        self.columns = columns or {}
+        self.primary_keys = primary_keys or {}
+        self._kinds = {name: kind for kind, names in self.objects.items() for name in names}
+
+    @classmethod
+    def load(cls, engine, db, logger, aost=None, columns=True, retry_count=3, retry_delay=1.0,
+             cache_path=None):
+        """Read the catalog of ``db``; returns ``None`` (with a warning) if it cannot be read.
+
+        ``columns=False`` skips the column and primary-key queries, which only
+        the data export needs. With ``cache_path`` the snapshot is reused from
+        that file while the catalog's fingerprint (see
+        :func:`catalog_fingerprint`) is unchanged, and rewritten otherwise.
+        """
+        clause = aost_clause(aost)
+        fingerprint = None
+        if cache_path:
+            fingerprint = catalog_fingerprint(engine, db, clause, logger, retry_count, retry_delay)
+            cached = read_cache(cache_path, db, fingerprint, columns)
+            if cached is not None:
+                logger.info(f"♻️ Catalog unchanged; reusing {cache_path}")
+                return cached
+        try:
+            with retry(retries=retry_count, delay=retry_delay)(engine.connect)() as conn:
+                if clause:
+                    # One AOST per transaction: run each catalog read in its own.
+                    # The isolation level can only change before the first
+                    # statement begins a transaction.
+                    conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+                conn.execute(text(f"USE {quote_ident(db)}"))
+                snapshot, localities = cls._read(conn, db, clause, columns, logger)
+        except Exception as e:
+            logger.warning(f"⚠️ Catalog snapshot failed, falling back to per-object queries: {e}")
+            return None
+        snapshot.localities = localities if localities is not None else get_table_locality(engine, db, logger)
+        if fingerprint is not None:
+            write_cache(cache_path, snapshot, fingerprint, logger)
+        return snapshot
+
+    @classmethod
+    def _read(cls, conn, db, clause, columns, logger):
+        objects = {"table": [], "view": [], "sequence": [], "type": []}
+        cols, keys = {}, {}
+        for schema, name, table_type in conn.execute(text(
+                "SELECT table_schema, table_name, table_type FROM information_schema.tables" + clause +
+                f" WHERE table_schema {_NOT_SYSTEM} ORDER BY table_schema, table_name")):
+            kind = _TABLE_KINDS.get(str(table_type).upper())
+            if kind:
+                objects[kind].append(f"{db}.{schema}.{name}")
+        for schema, name in conn.execute(text(_ENUMS_QUERY.format(clause=clause))):
+            objects["type"].append(f"{db}.{schema}.{name}")
+        if columns:
+            for schema, name, column, data_type in conn.execute(text(
+                    "SELECT table_schema, table_name, column_name, data_type "
+                    "FROM information_schema.columns" + clause +
+                    f" WHERE table_schema {_NOT_SYSTEM} "
+                    "ORDER BY table_schema, table_name, ordinal_position")):
+                cols.setdefault(f"{db}.{schema}.{name}", []).append((column, data_type))
+            for schema, name, column in conn.execute(text(
+                    "SELECT tc.table_schema, tc.table_name, kcu.column_name "
+                    "FROM information_schema.table_constraints AS tc "
+                    "JOIN information_schema.key_column_usage AS kcu "
+                    "ON kcu.constraint_name = tc.constraint_name "
+                    "AND kcu.table_schema = tc.table_schema AND kcu.table_name = tc.table_name" +
+                    clause + f" WHERE tc.constraint_type = 'PRIMARY KEY' AND tc.table_schema {_NOT_SYSTEM}"
+                    " ORDER BY tc.table_schema, tc.table_name, kcu.ordinal_position")):
+                keys.setdefault(f"{db}.{schema}.{name}", []).append(column)
+        snapshot = cls(db, objects, None, cols if columns else None, keys if columns else None)
+        return snapshot, cls._load_localities(conn, db, clause, logger)
+
+    def to_dict(self):
+        return {
+            "db": self.db,
+            "objects": self.objects,
+            "has_columns": self.has_columns,
+            "localities": self.localities,
+            "columns": self.columns,
+            "primary_keys": self.primary_keys,
+        }
+
+    @classmethod
+    def from_dict(cls, doc):
+        columns = {name: [tuple(c) for c in cols] for name, cols in doc["columns"].items()}
+        return cls(doc["db"], doc["objects"], doc["localities"],
+                   columns if doc["has_columns"] else None, doc["primary_keys"])
+
+    @staticmethod
+    def _load_localities(conn, db, clause, logger):
+        try:
+            rows = conn.execute(text(
+                "SELECT schema_name, name, locality FROM crdb_internal.tables" + clause +
+                " WHERE database_name = :db AND drop_time IS NULL"), {"db": db})
+            return {f"{db}.{schema}.{name}": locality or "N/A" for schema, name, locality in rows}
+        except Exception as e:
+            logger.debug(f"crdb_internal.tables has no localities ({e}); using SHOW TABLES")
+            return None
+
+    def kind_of(self, name):
+        """``TABLE``/``VIEW``/``SEQUENCE``/``TYPE`` for ``db.schema.name``, or ``None``."""
+        kind = self._kinds.get(name)
+        return kind.upper() if kind else None
+
+    def table_columns(self, name):
+        """``[(column_name, data_type), ...]`` in ordinal order, or ``None`` if not loaded."""
+        return self.columns.get(name)
+
+    def primary_key(self, name):
+        """Primary-key columns of ``name`` in key order (``[]`` if it has none)."""
+        return self.primary_keys.get(name, [])
+
+
+def catalog_cache_path(out_root, db):
+    """Catalog cache file for ``db`` under the export root ``out_root``."""
+    return os.path.join(out_root, f".{db}.catalog.json")
+
+
+def catalog_fingerprint(engine, db, clause, logger, retry_count=3, retry_delay=1.0):
+    """Digest of every descriptor's id, version and name in ``db``, plus its enums.
+
+    CockroachDB bumps a descriptor's version on every schema change (columns,
+    keys, locality), and creating, dropping or renaming an object changes the
+    listed ids and names. Both queries are far cheaper than a full snapshot.
+    Returns ``None`` if the fingerprint cannot be read.
+    """
+    try:
+        digest = hashlib.sha256()
+        with retry(retries=retry_count, delay=retry_delay)(engine.connect)() as conn:
+            if clause:
+                # As in CatalogSnapshot.load, before USE begins a transaction.
+                conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            conn.execute(text(f"USE {quote_ident(db)}"))
+            for row in conn.execute(text(
+                    "SELECT table_id, version, schema_name, name FROM crdb_internal.tables" + clause +
+                    " WHERE database_name = :db AND drop_time IS NULL ORDER BY table_id"), {"db": db}):
+                digest.update(json.dumps([str(v) for v in row]).encode("utf-8"))
+            digest.update(b"types")
+            for row in conn.execute(text(_ENUMS_QUERY.format(clause=clause))):
+                digest.update(json.dumps([str(v) for v in row]).encode("utf-8"))
+        return digest.hexdigest()
+    except Exception as e:
+        logger.warning(f"⚠️ Could not fingerprint the catalog; not using the catalog cache: {e}")
+        return None
+
+
+def read_cache(path, db, fingerprint, columns=True):
+    """Return the cached :class:`CatalogSnapshot` in ``path`` if it is still valid, else ``None``."""
+    if fingerprint is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            doc = json.load(f)
+        if doc.get("version") != CATALOG_CACHE_VERSION or doc.get("db") != db \
+                or doc.get("fingerprint") != fingerprint or (columns and not doc["snapshot"]["has_columns"]):
+            return None
+        return CatalogSnapshot.from_dict(doc["snapshot"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_cache(path, snapshot, fingerprint, logger):
+    """Atomically replace ``path`` with ``snapshot``; failures only log a warning."""
+    doc = {
+        "version": CATALOG_CACHE_VERSION,
+        "db": snapshot.db,
+        "fingerprint": fingerprint,
+        "snapshot": snapshot.to_dict(),
+    }
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(doc, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not write catalog cache {path}: {e}")
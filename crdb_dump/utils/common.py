@@ -1,4 +1,4 @@
-import re
+import os
 import json
 import time
 import random
@@ -6,12 +6,17 @@ import datetime
 import functools
 import psycopg2
 from sqlalchemy import exc, text
+from crdb_dump.utils.arrays import array_literal, sql_array_literal
 from crdb_dump.utils.type_constants import NOT_NULL_MIN, NOT_NULL_MAX, DEFAULT_ARRAY_COUNT
 
 
 RETRYABLE_EXCEPTIONS = (psycopg2.OperationalError, exc.OperationalError)
 
-def retry(retries=3, delay=1.0, backoff=2.0, exceptions=RETRYABLE_EXCEPTIONS):
+def retry(retries=3, delay=1.0, backoff=2.0, exceptions=RETRYABLE_EXCEPTIONS, on_retry=None):
+    """Retry ``func`` on ``exceptions`` with exponential backoff and jitter.
+
+    ``on_retry(error)`` is called for every failed attempt that is retried.
+    """
     def decorator_retry(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
@@ -22,6 +27,8 @@ def retry(retries=3, delay=1.0, backoff=2.0, exceptions=RETRYABLE_EXCEPTIONS):
                 except exceptions as e:
                     if attempt == retries - 1:
                         raise
+                    if on_retry:
+                        on_retry(e)
                     sleep = current_delay + random.uniform(0, 0.3)
                     print(f"[Retry] Attempt {attempt + 1} failed: {e}. Retrying in {sleep:.2f}s...")
                     time.sleep(sleep)
@@ -29,6 +36,11 @@ def retry(retries=3, delay=1.0, backoff=2.0, exceptions=RETRYABLE_EXCEPTIONS):
         return wrapper
     return decorator_retry
 
+def default_workers():
+    """Worker count used when none is configured (ThreadPoolExecutor's default)."""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
 def aost_clause(resolved_value):
     """Return an ' AS OF SYSTEM TIME ...' SQL fragment, or '' when no AOST.
 
@@ -67,19 +79,7 @@ def to_sql_literal(val, data_type=None):
         return f"'{val}'"
 
     if isinstance(val, list):
-        def serialize_item(v):
-            if v is None:
-                return 'NULL'
-            if isinstance(v, str):
-                escaped = v.replace("'", "''")
-                # Only quote if special characters
-                if re.search(r'[,\s{}"]', escaped):
-                    return f'"{escaped}"'
-                return escaped
-            return str(v)
-
-        items = [serialize_item(item) for item in val]
-        return f"'{{{','.join(items)}}}'"
+        return sql_array_literal(val)
 
     if isinstance(val, str):
         escaped = val.replace("'", "''")
@@ -100,17 +100,8 @@ def to_csv_literal(val, data_type=None):
     if isinstance(val, dict) or (_is_json_type(data_type) and isinstance(val, list)):
         return json.dumps(val)
     if isinstance(val, list):
-        def escape_csv_array_item(item):
-            if item is None:
-                return ''
-            if isinstance(item, str):
-                escaped = item.replace('"', '""')
-                if re.search(r'[\s,{}"]', escaped):
-                    return f'"{escaped}"'
-                return escaped
-            return str(item)
-
-        return '{' + ','.join(escape_csv_array_item(v) for v in val) + '}'
+        # csv.writer applies the CSV quoting on top of the array literal.
+        return array_literal(val)
     return val
 
 def to_json_literal(val):
@@ -0,0 +1,85 @@
+import gzip
+import os
+
+# gzip ships with Python; zstd and lz4 need the optional "compression" extra.
+COMPRESSION_CODECS = ("gzip", "zstd", "lz4")
+
+# Codec name -> chunk file suffix, and back.
+CODEC_SUFFIXES = {"gzip": "gz", "zstd": "zst", "lz4": "lz4"}
+CODEC_EXTENSIONS = {f".{suffix}": codec for codec, suffix in CODEC_SUFFIXES.items()}
+
+
+def _module(codec):
+    try:
+        if codec == "zstd":
+            import zstandard
+            return zstandard
+        if codec == "lz4":
+            import lz4.frame
+            return lz4.frame
+    except ImportError:
+        raise ValueError(
+            f"Compression codec '{codec}' requires an optional dependency: "
+            f"pip install 'crdb-dump[compression]'")
+    raise ValueError(f"Unsupported compression codec '{codec}' "
+                     f"(expected one of {', '.join(COMPRESSION_CODECS)})")
+
+
+def check_codec(codec):
+    """Raise ``ValueError`` unless ``codec`` is known and importable."""
+    if codec != "gzip":
+        _module(codec)
+
+
+def codec_for_path(path):
+    """Return the codec a chunk file was written with (by suffix), or ``None``."""
+    return CODEC_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def compress_stream(raw, codec, level=None, threads=0):
+    """Wrap the binary writer ``raw`` so written bytes are compressed with ``codec``.
+
+    ``level`` defaults to each codec's own default (gzip 9, zstd 3, lz4 0);
+    ``threads`` enables zstd's multi-threaded compression (``-1`` = all CPUs).
+    Closing the returned stream finishes the frame but leaves ``raw`` open.
+    """
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9 if level is None else level)
+    module = _module(codec)
+    if codec == "zstd":
+        compressor = module.ZstdCompressor(level=3 if level is None else level, threads=threads or 0)
+        return compressor.stream_writer(raw, closefd=False)
+    return module.LZ4FrameFile(raw, mode="wb", compression_level=0 if level is None else level)
+
+
+def open_chunk(path, codec=None):
+    """Open a chunk file for binary reading, decompressing it on the fly.
+
+    ``codec`` defaults to the one implied by the file name; uncompressed files
+    are returned as plain binary file objects.
+    """
+    codec = codec or codec_for_path(path)
+    if codec is None:
+        return open(path, "rb")
+    if codec == "gzip":
+        return gzip.open(path, "rb")
+    module = _module(codec)
+    if codec == "zstd":
+        return module.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return module.open(path, "rb")
+
+
+def decompress_stream(fileobj, codec):
+    """Wrap the readable binary ``fileobj`` (e.g. an S3 body) to decompress ``codec``.
+
+    ``codec=None`` returns ``fileobj`` unchanged. Closing the wrapper does not
+    close ``fileobj``.
+    """
+    if codec is None:
+        return fileobj
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+    module = _module(codec)
+    if codec == "zstd":
+        return module.ZstdDecompressor().stream_reader(fileobj, closefd=False)
+    return module.LZ4FrameFile(fileobj, mode="rb")
@@ -0,0 +1,174 @@
+import threading
+import time
+from contextlib import contextmanager
+from crdb_dump.utils.common import RETRYABLE_EXCEPTIONS
+
+
+class AdaptiveLimiter:
+    """AIMD limit on in-flight chunk queries or ``COPY`` statements.
+
+    Workers call :meth:`slot` around each unit of work; at most ``limit`` run
+    at once, and ``limit`` moves between ``min_workers`` and ``max_workers``:
+
+    * It starts at ``min_workers`` and doubles after every clean window
+      (slow start), then grows by one per clean window.
+    * A retryable error halves it (``backoff``) at once, ends slow start and
+      holds it for the rest of that window.
+    * A window whose mean latency exceeds ``latency_tolerance`` times the
+      lowest window mean seen, without more throughput than the previous
+      window, shrinks it by ``backoff`` too: the cluster is queueing work.
+
+    A window closes after ``max(limit, min_window)`` units that started in
+    it. Every change is logged with the measurements that caused it. Equal
+    bounds make it a fixed limit.
+    """
+
+    def __init__(self, min_workers, max_workers, logger, name="workers",
+                 backoff=0.5, latency_tolerance=2.0, min_window=4):
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.limit = self.peak = self.min_workers
+        self.logger = logger
+        self.name = name
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.min_window = min_window
+        self._cond = threading.Condition()
+        self._active = 0
+        self._slow_start = True
+        self._baseline = None
+        self._last_throughput = None
+        self._reset_window(time.monotonic())
+
+    def _reset_window(self, now):
+        self._window_start = now
+        self._done = 0
+        self._latency = 0.0
+        self._errors = 0
+
+    def acquire(self):
+        """Wait for a free slot; returns the start time to pass to :meth:`release`."""
+        with self._cond:
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+        return time.monotonic()
+
+    def release(self, started, sample=True, excluded=0.0):
+        """Free a slot; ``sample=False`` for a slot that did no work.
+
+        ``excluded`` seconds of the slot's time (client-side work) are left
+        out of its latency sample.
+        """
+        now = time.monotonic()
+        with self._cond:
+            self._active -= 1
+            # Units started before the window opened ran at the old limit.
+            if sample and started >= self._window_start:
+                self._done += 1
+                self._latency += max(0.0, now - started - excluded)
+                if self._done >= max(self.limit, self.min_window):
+                    self._close_window(now)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Run the body in a slot; a retryable error it raises also counts as one."""
+        started = self.acquire()
+        try:
+            yield
+        except RETRYABLE_EXCEPTIONS as e:
+            self.record_error(e)
+            raise
+        finally:
+            self.release(started)
+
+    @contextmanager
+    def per_batch(self, sink, batch):
+        """Wrap the file-like ``sink`` of a push-style read such as ``COPY ... TO STDOUT``.
+
+        A slot is held while each ``batch`` writes are produced and given up
+        between batches, so a long ``COPY`` counts as many short reads and
+        lets other readers in. This only paces how fast the client takes rows:
+        the query stays open on the server between batches, so server work in
+        flight is not bounded. Latency samples cover the wait for rows, not
+        the time spent in ``sink.write`` or waiting for the slot. A retryable
+        error counts as in :meth:`slot`.
+        """
+        gate = _BatchGate(self, sink, batch)
+        try:
+            yield gate
+        except RETRYABLE_EXCEPTIONS as e:
+            self.record_error(e)
+            raise
+        finally:
+            gate.release()
+
+    def record_error(self, error=None):
+        """Note a retryable error (e.g. from ``retry(on_retry=...)``)."""
+        with self._cond:
+            self._errors += 1
+            if self._errors == 1:
+                self._slow_start = False
+                self._set(max(self.min_workers, int(self.limit * self.backoff)),
+                          f"retryable error: {error}")
+
+    def _close_window(self, now):
+        elapsed = now - self._window_start
+        latency = self._latency / self._done
+        throughput = self._done / elapsed if elapsed > 0 else float("inf")
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        measured = f"{throughput:.2f}/s, {latency:.2f}s each"
+        if self._errors:
+            self.logger.debug(f"🎚️ {self.name}: holding at {self.limit} after "
+                              f"{self._errors} retryable errors ({measured})")
+        elif latency > self._baseline * self.latency_tolerance \
+                and self._last_throughput is not None and throughput <= self._last_throughput:
+            self._slow_start = False
+            self._set(max(self.min_workers, int(self.limit * self.backoff)),
+                      f"latency over {self.latency_tolerance:g}x the {self._baseline:.2f}s baseline "
+                      f"without more throughput ({measured})")
+        elif self.limit < self.max_workers:
+            grown = self.limit * 2 if self._slow_start else self.limit + 1
+            self._set(min(self.max_workers, grown), measured)
+        self._last_throughput = throughput
+        self._reset_window(now)
+
+    def _set(self, limit, reason):
+        if limit == self.limit:
+            return
+        self.logger.info(f"🎚️ {self.name}: {self.limit} → {limit} ({reason})")
+        self.limit = limit
+        self.peak = max(self.peak, limit)
+        self._cond.notify_all()
+
+
+class _BatchGate:
+    """File-like wrapper that cycles a limiter slot every ``batch`` writes."""
+
+    def __init__(self, limiter, sink, batch):
+        self._limiter = limiter
+        self._sink = sink
+        self._batch = max(1, batch)
+        self._writes = 0
+        self._client = 0.0
+        self._started = limiter.acquire()
+
+    def write(self, data):
+        began = time.monotonic()
+        result = self._sink.write(data)
+        self._client += time.monotonic() - began
+        self._writes += 1
+        if self._writes >= self._batch:
+            self.release()
+            self._started = self._limiter.acquire()
+        return result
+
+    def release(self):
+        if self._started is not None:
+            # A slot that got no rows (e.g. after the last full batch) did no work.
+            self._limiter.release(self._started, sample=self._writes > 0, excluded=self._client)
+            self._started = None
+            self._writes = 0
+            self._client = 0.0
@@ -1,18 +1,54 @@
 import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit, parse_qs
 from sqlalchemy import create_engine
 import psycopg2
+import psycopg2.pool
+from crdb_dump.utils.common import default_workers
 
+# Session settings every connection starts with, unless the URL sets them.
+SESSION_SETTINGS = {"application_name": "crdb-dump"}
 
-def get_sqlalchemy_engine(opts=None):
+# Pooled connections older than this (seconds) are replaced on checkout, so a
+# long run spreads over nodes added meanwhile and outlives idle-connection
+# timeouts of load balancers.
+POOL_RECYCLE = 1800
+
+# Connections beyond the computed pool size, for short side queries.
+POOL_OVERFLOW = 2
+
+
+def _session_args(url):
+    query = parse_qs(urlsplit(str(url)).query)
+    return {k: v for k, v in SESSION_SETTINGS.items() if k not in query}
+
+
+def _create_engine(url, pool_size):
+    kwargs = {"pool_pre_ping": True, "pool_recycle": POOL_RECYCLE,
+              "connect_args": _session_args(url)}
+    if pool_size is not None:
+        kwargs.update(pool_size=pool_size, max_overflow=POOL_OVERFLOW)
+    return create_engine(url, **kwargs)
+
+
+def get_sqlalchemy_engine(opts=None, pool_size=None):
+    """Create a SQLAlchemy engine for the configured cluster.
+
+    Connections are pinged before reuse, recycled after ``POOL_RECYCLE``
+    seconds and start with ``SESSION_SETTINGS``. ``pool_size`` overrides
+    SQLAlchemy's default of 5 pooled connections.
+    """
     url = os.getenv("CRDB_URL")
     if url:
         if url.startswith("postgresql://"):
             url = url.replace("postgresql://", "cockroachdb://", 1)
-        return create_engine(url)
+        return _create_engine(url, pool_size)
 
     if opts is None:
         # fallback default to local instance
-        return create_engine("cockroachdb://root@localhost:26257/defaultdb?sslmode=disable")
+        return _create_engine("cockroachdb://root@localhost:26257/defaultdb?sslmode=disable", pool_size)
 
     base = f"cockroachdb://root@{opts.get('host', 'localhost')}:{opts.get('port', 26257)}/{opts['db']}"
     if opts.get("certs_dir"):
@@ -25,14 +61,47 @@ def get_sqlalchemy_engine(opts=None):
     else:
         base += "?sslmode=disable"
 
-    return create_engine(base)
+    return _create_engine(base, pool_size)
 
 
-def get_psycopg_connection(opts=None):
+def run_pool_size(opts):
+    """Connections an export run holds at once with the parallelism in ``opts``.
+
+    Every table being exported keeps one connection open and reads its key
+    ranges (``--data-ranges``) or its stream/``COPY`` on further connections;
+    ``--data-parallel`` exports ``--max-workers`` (default
+    ``default_workers()``) tables at a time and
+    ``--parallel`` dumps that many schema objects at a time.
+    """
+    schema = default_workers() if opts.get("parallel") else 1
+    tables = (opts.get("max_workers") or default_workers()) if opts.get("data_parallel") else 1
+    per_table = 1 + max(1, opts.get("data_ranges") or 1)
+    return max(schema, tables * per_table)
+
+
+@contextmanager
+def run_engine(opts):
+    """Provide the run's shared engine as ``opts["engine"]``; disposed of on exit.
+
+    Schema export, data export, verification and load pick it up from
+    ``opts`` instead of each building their own engine and pool. If
+    ``opts`` already carries an engine it is reused and left open.
+    """
+    if opts.get("engine") is not None:
+        yield opts["engine"]
+        return
+    engine = opts["engine"] = get_sqlalchemy_engine(opts, pool_size=run_pool_size(opts))
+    try:
+        yield engine
+    finally:
+        opts.pop("engine", None)
+        engine.dispose()
+
+
+def psycopg_dsn(opts=None):
     url = os.getenv("CRDB_URL")
     if url:
-        pg_url = url.replace("cockroachdb://", "postgresql://", 1)
-        return psycopg2.connect(pg_url)
+        return url.replace("cockroachdb://", "postgresql://", 1)
 
     opts = opts or {}
     host = opts.get("host", "localhost")
@@ -48,4 +117,74 @@ def get_psycopg_connection(opts=None):
         )
     else:
         base += "?sslmode=disable"
-    return psycopg2.connect(base)
+    return base
+
+
+def get_psycopg_connection(opts=None):
+    return psycopg2.connect(psycopg_dsn(opts))
+
+
+class PsycopgPool:
+    """Bounded psycopg2 connection pool shared by loader worker threads.
+
+    Checkouts block once ``size`` connections are in use. A connection idle for
+    longer than ``ping_after`` seconds is pinged before reuse, and one that hit
+    a connection-level error is discarded so the next checkout reconnects.
+    """
+
+    def __init__(self, opts=None, size=1, ping_after=30.0):
+        # Connect lazily, but keep up to ``size`` idle connections: psycopg2
+        # closes returned connections once ``minconn`` idle ones are pooled.
+        dsn = psycopg_dsn(opts)
+        self._pool = psycopg2.pool.ThreadedConnectionPool(0, size, dsn, **_session_args(dsn))
+        self._pool.minconn = size
+        self._slots = threading.BoundedSemaphore(size)
+        self._last_used = {}
+        self.ping_after = ping_after
+
+    def _healthy(self, conn):
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is None or time.monotonic() - last_used < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        self._last_used.pop(id(conn), None)
+        self._pool.putconn(conn, close=True)
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            conn = self._pool.getconn()
+            if not self._healthy(conn):
+                self._discard(conn)
+                conn = self._pool.getconn()
+            try:
+                yield conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                self._discard(conn)
+                raise
+            except BaseException:
+                try:
+                    conn.rollback()
+                    self._release(conn)
+                except psycopg2.Error:
+                    self._discard(conn)
+                raise
+            else:
+                self._release(conn)
+
+    def _release(self, conn):
+        self._last_used[id(conn)] = time.monotonic()
+        self._pool.putconn(conn)
+
+    def close(self):
+        self._pool.closeall()
@@ -0,0 +1,116 @@
+import hashlib
+import io
+
+# sha256 stays the default so manifests remain readable by older releases.
+# blake3 and xxh3_128 are much faster but need the optional "fast-hash" extra.
+CHECKSUM_ALGOS = ("sha256", "blake2b", "blake3", "xxh3_128")
+DEFAULT_CHECKSUM_ALGO = "sha256"
+
+
+def new_hasher(algo=DEFAULT_CHECKSUM_ALGO):
+    """Return a fresh hash object (``update``/``hexdigest``) for ``algo``."""
+    if algo in ("sha256", "blake2b"):
+        return hashlib.new(algo)
+    try:
+        if algo == "blake3":
+            import blake3
+            return blake3.blake3()
+        if algo == "xxh3_128":
+            import xxhash
+            return xxhash.xxh3_128()
+    except ImportError:
+        raise ValueError(
+            f"Checksum algorithm '{algo}' requires an optional dependency: "
+            f"pip install 'crdb-dump[fast-hash]'")
+    raise ValueError(f"Unsupported checksum algorithm '{algo}' (expected one of {', '.join(CHECKSUM_ALGOS)})")
+
+
+def manifest_checksum_algo(manifest):
+    """Checksum algorithm of a manifest; manifests predating the field used sha256."""
+    return manifest.get("checksum_algo") or DEFAULT_CHECKSUM_ALGO
+
+
+def chunk_checksum(manifest, chunk):
+    """Expected digest of ``chunk``, stored under the manifest's algorithm name."""
+    return chunk.get(manifest_checksum_algo(manifest))
+
+
+def file_checksum(path, algo=DEFAULT_CHECKSUM_ALGO):
+    h = new_hasher(algo)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(8192), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class HashingWriter(io.RawIOBase):
+    """Binary sink that digests and counts bytes on their way to ``raw``.
+
+    Wrapping a chunk file with this lets the exporter record the checksum and
+    size of exactly the bytes it wrote, without reading the file back.
+    """
+
+    def __init__(self, raw, algo=DEFAULT_CHECKSUM_ALGO):
+        super().__init__()
+        self._raw = raw
+        self._hash = new_hasher(algo)
+        self.bytes_written = 0
+
+    @property
+    def name(self):
+        return getattr(self._raw, "name", "")
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._hash.update(b)
+        n = len(b) if isinstance(b, (bytes, bytearray)) else memoryview(b).nbytes
+        self.bytes_written += n
+        self._raw.write(b)
+        return n
+
+    def flush(self):
+        self._raw.flush()
+
+    def close(self):
+        if not self.closed:
+            super().close()
+            self._raw.close()
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+class HashingReader(io.RawIOBase):
+    """Readable wrapper that digests bytes as they are read from ``raw``.
+
+    Lets the loader verify a chunk streamed from S3 straight into ``COPY``
+    without staging it on disk; call :meth:`drain` before checking the digest.
+    """
+
+    def __init__(self, raw, algo=DEFAULT_CHECKSUM_ALGO):
+        super().__init__()
+        self._raw = raw
+        self._hash = new_hasher(algo)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        data = self._raw.read() if size is None or size < 0 else self._raw.read(size)
+        self._hash.update(data)
+        return data
+
+    def readinto(self, b):
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def drain(self, block_size=1 << 20):
+        """Read (and digest) whatever the consumer left unread."""
+        while self.read(block_size):
+            pass
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
@@ -1,4 +1,16 @@
+import io
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from contextlib import contextmanager
 import boto3
+from boto3.s3.transfer import TransferConfig
+from crdb_dump.utils.hashing import file_checksum
+
+MB = 1024 * 1024
+
 
 def get_s3_client(endpoint_url=None, access_key=None, secret_key=None):
     return boto3.client(
@@ -8,8 +20,291 @@ def get_s3_client(endpoint_url=None, access_key=None, secret_key=None):
         aws_secret_access_key=secret_key
     )
 
-def upload_file_to_s3(s3, bucket, key, local_path):
-    s3.upload_file(local_path, bucket, key)
+def upload_file_to_s3(s3, bucket, key, local_path, config=None):
+    if config is None:
+        s3.upload_file(local_path, bucket, key)
+    else:
+        s3.upload_file(local_path, bucket, key, Config=config)
 
 def download_file_from_s3(s3, bucket, key, local_path):
     s3.download_file(bucket, key, local_path)
+
+
+class S3Uploader:
+    """Upload chunk files in the background while the export keeps reading.
+
+    One boto3 client (thread-safe) is shared by ``workers`` upload threads.
+    At most ``workers + queue_size`` uploads may be pending; ``submit`` blocks
+    beyond that, so a slow network throttles the export instead of letting
+    finished chunks pile up. Large files go up as multipart uploads of
+    ``part_size`` bytes.
+    """
+
+    def __init__(self, opts, workers=4, queue_size=8, part_size=16 * MB):
+        self.bucket = opts["s3_bucket"]
+        self.prefix = opts.get("s3_prefix") or ""
+        self.client = get_s3_client(
+            endpoint_url=opts.get("s3_endpoint"),
+            access_key=opts.get("s3_access_key"),
+            secret_key=opts.get("s3_secret_key")
+        )
+        self.config = TransferConfig(multipart_threshold=part_size, multipart_chunksize=part_size)
+        self.part_size = part_size
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._streams = set()
+        self._lock = threading.Lock()
+
+    def key_for(self, name):
+        return f"{self.prefix}{name}"
+
+    def upload(self, local_path, name, delete=False):
+        """Upload ``local_path`` as ``<prefix><name>`` in the calling thread.
+
+        With ``delete`` the local file is removed once the upload succeeds.
+        """
+        key = self.key_for(name)
+        upload_file_to_s3(self.client, self.bucket, key, local_path, self.config)
+        if delete:
+            os.remove(local_path)
+        return key
+
+    def submit(self, local_path, name, delete=False):
+        """Queue an upload and return its future, blocking while the queue is full."""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self.upload, local_path, name, delete)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    @staticmethod
+    def wait_all(futures):
+        """Wait for ``futures``; raise the first upload error, if any."""
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+        return [future.result() for future in futures]
+
+    def open_stream(self, name):
+        """Return a binary writer that streams ``<prefix><name>`` straight to S3."""
+        stream = S3StreamWriter(self, name)
+        with self._lock:
+            self._streams.add(stream)
+        return stream
+
+    def _stream_closed(self, stream):
+        with self._lock:
+            self._streams.discard(stream)
+
+    def close(self):
+        # Streams left open by a failed export are aborted, not left as
+        # incomplete multipart uploads.
+        with self._lock:
+            streams = list(self._streams)
+        for stream in streams:
+            stream.abort()
+        self._executor.shutdown(wait=True)
+
+
+class S3StreamWriter(io.RawIOBase):
+    """Binary sink that writes one S3 object as a multipart upload, never touching disk.
+
+    Written bytes are buffered into ``part_size`` parts, and up to ``workers``
+    parts upload concurrently on the uploader's pool while writing continues,
+    which bounds memory to a few parts per stream. An object smaller than one
+    part is sent with a single ``put_object``. Closing completes the upload.
+    """
+
+    def __init__(self, uploader, name):
+        super().__init__()
+        self._uploader = uploader
+        self._client = uploader.client
+        self.name = name
+        self.key = uploader.key_for(name)
+        self._buf = bytearray()
+        self._upload_id = None
+        self._parts = []
+        self._slots = threading.BoundedSemaphore(uploader.workers)
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._buf += b
+        size = self._uploader.part_size
+        while len(self._buf) >= size:
+            self._send(bytes(self._buf[:size]))
+            del self._buf[:size]
+        return len(b) if isinstance(b, (bytes, bytearray)) else memoryview(b).nbytes
+
+    def _send(self, data):
+        if self._upload_id is None:
+            self._upload_id = self._client.create_multipart_upload(
+                Bucket=self._uploader.bucket, Key=self.key)["UploadId"]
+        number = len(self._parts) + 1
+        self._slots.acquire()
+        try:
+            future = self._uploader._executor.submit(self._upload_part, number, data)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._parts.append(future)
+
+    def _upload_part(self, number, data):
+        resp = self._client.upload_part(Bucket=self._uploader.bucket, Key=self.key,
+                                        UploadId=self._upload_id, PartNumber=number, Body=data)
+        return {"PartNumber": number, "ETag": resp["ETag"]}
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._upload_id is None:
+                self._client.put_object(Bucket=self._uploader.bucket, Key=self.key, Body=bytes(self._buf))
+            else:
+                if self._buf:
+                    self._send(bytes(self._buf))
+                parts = [future.result() for future in self._parts]
+                self._client.complete_multipart_upload(
+                    Bucket=self._uploader.bucket, Key=self.key, UploadId=self._upload_id,
+                    MultipartUpload={"Parts": parts})
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self._buf = bytearray()
+            self._uploader._stream_closed(self)
+            super().close()
+
+    def abort(self):
+        """Discard the object: abort its multipart upload (if started) and close."""
+        upload_id, self._upload_id = self._upload_id, None
+        if upload_id is not None:
+            wait(self._parts)
+            self._client.abort_multipart_upload(Bucket=self._uploader.bucket, Key=self.key,
+                                                UploadId=upload_id)
+        self._uploader._stream_closed(self)
+        # Closed without completing, so a later close() uploads nothing.
+        super().close()
+
+
+class S3Prefetcher:
+    """Download load chunks from S3 ahead of the workers that ``COPY`` them.
+
+    ``order`` lists ``(path, checksum)`` pairs in the order the loader is
+    expected to need them. ``workers`` background threads download them into a
+    private temp directory, verify ``checksum`` (``(algo, digest)`` or
+    ``None``) off the ``COPY`` path, and pause while ``max_bytes`` of fetched
+    chunks are waiting. A chunk needed before it was prefetched is downloaded
+    by the caller. Every fetched file is deleted once the loader is done with
+    it, and the temp directory on :meth:`close`.
+    """
+
+    def __init__(self, opts, order=(), workers=4, max_bytes=1024 * MB):
+        self.bucket = opts["s3_bucket"]
+        self.prefix = opts.get("s3_prefix") or ""
+        self.client = get_s3_client(
+            endpoint_url=opts.get("s3_endpoint"),
+            access_key=opts.get("s3_access_key"),
+            secret_key=opts.get("s3_secret_key")
+        )
+        self.max_bytes = max_bytes
+        self._tmp_dir = tempfile.mkdtemp(prefix="crdb-dump-")
+        self._order = list(order)
+        self._next = 0
+        self._fetched = {}
+        # Paths the loader asked for; the prefetcher never downloads them again.
+        self._claimed = set()
+        self._on_disk = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._threads = [threading.Thread(target=self._prefetch, daemon=True)
+                         for _ in range(workers if self._order else 0)]
+        for thread in self._threads:
+            thread.start()
+
+    def key_for(self, path):
+        return f"{self.prefix}{os.path.basename(path)}"
+
+    def open_object(self, path):
+        """Return the S3 object body for ``path`` as a readable stream."""
+        return self.client.get_object(Bucket=self.bucket, Key=self.key_for(path))["Body"]
+
+    def _download(self, path, checksum, future):
+        local_path = os.path.join(self._tmp_dir, os.path.basename(path))
+        try:
+            download_file_from_s3(self.client, self.bucket, self.key_for(path), local_path)
+            verified = None
+            if checksum:
+                algo, expected = checksum
+                verified = file_checksum(local_path, algo) == expected
+            size = os.path.getsize(local_path)
+        except BaseException as e:
+            if os.path.exists(local_path):
+                os.remove(local_path)
+            future.set_exception(e)
+            return
+        with self._cond:
+            self._on_disk += size
+        future.set_result((local_path, verified, size))
+
+    def _prefetch(self):
+        while True:
+            with self._cond:
+                while not self._closed and self._on_disk >= self.max_bytes:
+                    self._cond.wait()
+                while self._next < len(self._order) and (self._order[self._next][0] in self._fetched
+                                                          or self._order[self._next][0] in self._claimed):
+                    self._next += 1
+                if self._closed or self._next >= len(self._order):
+                    return
+                path, checksum = self._order[self._next]
+                self._next += 1
+                future = self._fetched[path] = Future()
+            self._download(path, checksum, future)
+
+    @contextmanager
+    def fetch(self, path, checksum=None):
+        """Yield ``(local_path, verified)`` for ``path``; the file is deleted afterwards.
+
+        ``verified`` is ``True``/``False`` when ``checksum`` was checked during
+        the download, else ``None``.
+        """
+        with self._cond:
+            self._claimed.add(path)
+            future = self._fetched.get(path)
+            owner = future is None
+            if owner:
+                future = self._fetched[path] = Future()
+        if owner:
+            self._download(path, checksum, future)
+        try:
+            local_path, verified, size = future.result()
+        except BaseException:
+            with self._cond:
+                self._fetched.pop(path, None)
+            raise
+        try:
+            yield local_path, verified
+        finally:
+            if os.path.exists(local_path):
+                os.remove(local_path)
+            with self._cond:
+                # A retried chunk is downloaded again rather than kept on disk.
+                self._fetched.pop(path, None)
+                self._on_disk -= size
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
@@ -1,8 +1,93 @@
 import os
 import json
-import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from crdb_dump.export.schema import collect_objects
 from crdb_dump.utils.db_connection import get_sqlalchemy_engine
+from crdb_dump.utils.hashing import file_checksum, manifest_checksum_algo, chunk_checksum
+from crdb_dump.utils.identifiers import parse_object_name
+
+
+def _hash_chunk(path, algo):
+    """Process-pool worker: return ``(path, digest)``, or ``(path, None)`` if missing."""
+    if not os.path.exists(path):
+        return path, None
+    return path, file_checksum(path, algo)
+
+
+def find_manifests(data_dir):
+    """Return the ``*.manifest.json`` paths in ``data_dir``, sorted by name."""
+    return [os.path.join(data_dir, f) for f in sorted(os.listdir(data_dir))
+            if f.endswith(".manifest.json")]
+
+
+def verify_manifests(manifest_paths, data_dir, logger, workers=None, strict=False, written=None,
+                     missing_manifests=0):
+    """Verify every chunk listed in ``manifest_paths`` against its checksum.
+
+    Hashing is CPU-bound, so chunks are hashed in a process pool of ``workers``
+    processes (``1`` hashes in-process). Chunks in ``written`` were hashed while
+    this run wrote them and are only size-checked. Returns a report of
+    ``passed``/``failed``/``missing`` counts, overall and per table.
+    """
+    written = written or {}
+    report = {"passed": 0, "failed": 0, "missing": missing_manifests, "tables": {}}
+
+    def record(table, outcome, path):
+        report[outcome] += 1
+        report["tables"].setdefault(table, {"passed": 0, "failed": 0, "missing": 0})[outcome] += 1
+        if outcome == "passed":
+            logger.info(f"✔️ Verified {path}")
+        elif outcome == "missing":
+            logger.error(f"Missing chunk: {path}")
+        else:
+            logger.error(f"Checksum mismatch for {path}")
+            if strict:
+                raise ValueError(f"Checksum failed for {path}")
+
+    pending = {}
+    for manifest_path in manifest_paths:
+        with open(manifest_path) as mf:
+            manifest = json.load(mf)
+        table = manifest.get("table", os.path.basename(manifest_path))
+        algo = manifest_checksum_algo(manifest)
+        for chunk in manifest['chunks']:
+            file_path = os.path.join(data_dir, chunk['file'])
+            expected = chunk_checksum(manifest, chunk)
+            fresh = written.get(os.path.abspath(file_path))
+            if fresh and fresh.get(algo) and os.path.exists(file_path) \
+                    and fresh.get("bytes") == os.path.getsize(file_path):
+                record(table, "passed" if fresh[algo] == expected else "failed", file_path)
+            else:
+                pending[file_path] = (table, algo, expected)
+
+    def check(path, actual):
+        table, _, expected = pending[path]
+        if actual is None:
+            record(table, "missing", path)
+        else:
+            record(table, "passed" if actual == expected else "failed", path)
+
+    if workers == 1 or len(pending) <= 1:
+        for path, (_, algo, _) in pending.items():
+            check(*_hash_chunk(path, algo))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_hash_chunk, path, algo)
+                       for path, (_, algo, _) in pending.items()]
+            try:
+                for future in as_completed(futures):
+                    check(*future.result())
+            except ValueError:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    for table, counts in sorted(report["tables"].items()):
+        if counts["failed"] or counts["missing"]:
+            logger.warning(f"⚠️ {table}: {counts['failed']} failed, {counts['missing']} missing")
+    logger.info(f"✅ Checksum verification complete: {report['passed']} passed, "
+                f"{report['failed']} failed, {report['missing']} missing")
+    return report
 
 
 def verify_checksums(opts, out_dir, logger):
@@ -10,44 +95,26 @@ def verify_checksums(opts, out_dir, logger):
     retry_delay = opts.get("retry_delay", 1000) / 1000.0  # Convert ms to seconds
 
     table_list = opts['tables'].split(',') if opts['tables'] else []
-    if not table_list:
-        engine = get_sqlalchemy_engine(opts)
+    if not table_list and opts.get("catalog"):
+        # Reuse the snapshot the data export just took.
+        table_list = list(opts["catalog"].objects["table"])
+    elif not table_list:
+        engine = opts.get("engine") or get_sqlalchemy_engine(opts)
         table_list = collect_objects(engine, opts['db'], 'table', logger, retry_count, retry_delay)
 
-    failed = 0
-    passed = 0
-    missing = 0
-
-    from crdb_dump.utils.identifiers import parse_object_name
+    manifest_paths = []
+    missing_manifests = 0
     for table in table_list:
         base_name = parse_object_name(table, default_db=opts['db']).file_base()
         manifest_path = os.path.join(out_dir, f"{base_name}.manifest.json")
         if not os.path.exists(manifest_path):
             logger.warning(f"No manifest found for {base_name}")
-            missing += 1
+            missing_manifests += 1
             continue
+        manifest_paths.append(manifest_path)
 
-        with open(manifest_path) as mf:
-            manifest = json.load(mf)
-            for chunk in manifest['chunks']:
-                file_path = os.path.join(out_dir, chunk['file'])
-                if not os.path.exists(file_path):
-                    logger.error(f"Missing chunk: {file_path}")
-                    missing += 1
-                    continue
-
-                h = hashlib.sha256()
-                with open(file_path, 'rb') as f:
-                    for part in iter(lambda: f.read(8192), b''):
-                        h.update(part)
-                actual = h.hexdigest()
-                if actual != chunk['sha256']:
-                    logger.error(f"Checksum mismatch for {file_path}")
-                    failed += 1
-                    if opts.get('verify_strict'):
-                        raise ValueError(f"Checksum failed for {file_path}")
-                else:
-                    logger.info(f"✔️ Verified {file_path}")
-                    passed += 1
-
-    logger.info(f"✅ Checksum verification complete: {passed} passed, {failed} failed, {missing} missing")
+    return verify_manifests(manifest_paths, out_dir, logger,
+                            workers=opts.get("verify_workers"),
+                            strict=opts.get("verify_strict"),
+                            written=opts.get("written_chunks"),
+                            missing_manifests=missing_manifests)
@@ -0,0 +1,36 @@
+import csv
+import io
+
+from crdb_dump.utils.arrays import array_literal, sql_array_literal
+from crdb_dump.utils.common import to_csv_literal, to_sql_literal
+
+
+def test_plain_elements_are_not_quoted():
+    assert array_literal(["a", "b"]) == "{a,b}"
+    assert array_literal([1, 2, 3]) == "{1,2,3}"
+    assert array_literal([1.5, 2.25]) == "{1.5,2.25}"
+    assert array_literal([]) == "{}"
+
+
+def test_special_elements_are_quoted_and_escaped():
+    assert array_literal(["a b", "x,y", "{z}"]) == '{"a b","x,y","{z}"}'
+    assert array_literal(['say "hi"', "back\\slash"]) == '{"say \\"hi\\"","back\\\\slash"}'
+    assert array_literal(["", "NULL", "null"]) == '{"","NULL","null"}'
+
+
+def test_null_and_nested_elements():
+    assert array_literal(["a", None]) == "{a,NULL}"
+    assert array_literal([[1, 2], [3, None]]) == "{{1,2},{3,NULL}}"
+    assert array_literal([["a b"], ["c"]]) == '{{"a b"},{c}}'
+    assert array_literal([True, False]) == "{True,False}"
+
+
+def test_sql_literal_doubles_single_quotes():
+    assert sql_array_literal(["it's", "x"]) == "'{it''s,x}'"
+    assert to_sql_literal(["it's a", None]) == "'{\"it''s a\",NULL}'"
+
+
+def test_csv_field_round_trips_through_csv_quoting():
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerow([to_csv_literal(['q"', "a,b"], "ARRAY")])
+    assert next(csv.reader(io.StringIO(buf.getvalue()))) == ['{"q\\"","a,b"}']
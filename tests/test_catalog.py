@@ -0,0 +1,190 @@
+import logging
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine, event
+
+from crdb_dump.utils.catalog import CatalogSnapshot
+
+
+def _catalog_engine(stmts):
+    results = {
+        "information_schema.tables": [("cpkit", "tasks", "BASE TABLE"), ("public", "seq", "SEQUENCE"),
+                                      ("public", "users", "BASE TABLE"), ("public", "v", "VIEW")],
+        "pg_type": [("public", "status")],
+        "information_schema.columns": [("cpkit", "tasks", "id", "bigint"), ("cpkit", "tasks", "s", "text"),
+                                       ("public", "users", "id", "uuid")],
+        "PRIMARY KEY": [("cpkit", "tasks", "id"), ("public", "users", "id")],
+        "crdb_internal.tables": [("public", "users", "REGIONAL BY ROW"), ("cpkit", "tasks", None)],
+    }
+    conn = MagicMock()
+    conn.__enter__.return_value = conn
+    conn.__exit__.return_value = False
+    conn.execution_options.return_value = conn
+
+    def execute(stmt, *a, **k):
+        s = str(stmt)
+        stmts.append(s)
+        for marker in ("PRIMARY KEY", "information_schema.tables", "pg_type",
+                       "information_schema.columns", "crdb_internal.tables"):
+            if marker in s:
+                return iter(results[marker])
+        return None
+
+    conn.execute.side_effect = execute
+    engine = MagicMock()
+    engine.connect.return_value = conn
+    return engine
+
+
+def test_snapshot_loads_everything_in_a_few_queries():
+    stmts = []
+    cat = CatalogSnapshot.load(_catalog_engine(stmts), "cp", logging.getLogger("t"), aost="1750.0")
+    assert cat.objects["table"] == ["cp.cpkit.tasks", "cp.public.users"]
+    assert cat.objects["view"] == ["cp.public.v"]
+    assert cat.objects["sequence"] == ["cp.public.seq"]
+    assert cat.kind_of("cp.public.status") == "TYPE"
+    assert cat.kind_of("cp.public.nope") is None
+    assert cat.table_columns("cp.cpkit.tasks") == [("id", "bigint"), ("s", "text")]
+    assert cat.primary_key("cp.public.users") == ["id"]
+    assert cat.localities == {"cp.public.users": "REGIONAL BY ROW", "cp.cpkit.tasks": "N/A"}
+    # USE plus five catalog reads, each at the pinned AOST, regardless of object count.
+    assert len(stmts) == 6
+    assert all("AS OF SYSTEM TIME '1750.0'" in s for s in stmts[1:])
+
+
+# CockroachDB catalog reads -> SQLite queries returning the same rows, checked in order.
+_SQLITE_ROWS = [
+    ("USE ", "SELECT 1"),
+    ("table_id, version", "SELECT 52, 3, 'public', 'users'"),
+    ("PRIMARY KEY", "SELECT 'public', 'users', 'id'"),
+    ("information_schema.tables", "SELECT 'public', 'users', 'BASE TABLE'"),
+    ("pg_type", "SELECT 'public', 'status'"),
+    ("information_schema.columns", "SELECT 'public', 'users', 'id', 'uuid'"),
+    ("crdb_internal.tables", "SELECT 'public', 'users', 'REGIONAL BY ROW'"),
+]
+
+
+def _sqlite_engine(stmts):
+    """A real SQLAlchemy engine, so transaction and isolation-level rules apply."""
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def rewrite(conn, cursor, statement, parameters, context, executemany):
+        stmts.append(statement)
+        for marker, query in _SQLITE_ROWS:
+            if marker in statement:
+                return query, ()
+        raise AssertionError(f"unexpected statement: {statement}")
+
+    return engine
+
+
+def test_snapshot_at_aost_on_a_real_connection():
+    stmts = []
+    cat = CatalogSnapshot.load(_sqlite_engine(stmts), "cp", logging.getLogger("t"),
+                               aost="1750.0", retry_count=1)
+    assert cat is not None
+    assert cat.objects["table"] == ["cp.public.users"]
+    assert cat.primary_key("cp.public.users") == ["id"]
+    assert cat.localities == {"cp.public.users": "REGIONAL BY ROW"}
+    assert stmts[0].startswith("USE ")
+    assert all("AS OF SYSTEM TIME '1750.0'" in s for s in stmts[1:])
+
+
+def test_snapshot_without_columns_and_on_failure():
+    stmts = []
+    cat = CatalogSnapshot.load(_catalog_engine(stmts), "cp", logging.getLogger("t"), columns=False)
+    assert cat.table_columns("cp.cpkit.tasks") is None
+    assert not any("information_schema.columns" in s for s in stmts)
+
+    engine = MagicMock()
+    engine.connect.side_effect = Exception("down")
+    assert CatalogSnapshot.load(engine, "cp", logging.getLogger("t"), retry_count=1) is None
+
+
+def test_export_table_data_uses_snapshot(tmp_path):
+    from crdb_dump.export import data as data_mod
+    catalog = CatalogSnapshot("cp", {"table": ["cp.cpkit.tasks"]},
+                              columns={"cp.cpkit.tasks": [("id", "bigint")]},
+                              primary_keys={"cp.cpkit.tasks": ["id"]})
+    stmts = []
+    conn = MagicMock()
+    conn.__enter__.return_value = conn
+    conn.__exit__.return_value = False
+
+    def execute(stmt, params=None, *a, **k):
+        stmts.append(str(stmt))
+        return MagicMock(fetchall=lambda: [(1,)] if not params else [])
+
+    conn.execute.side_effect = execute
+    engine = MagicMock()
+    engine.connect.return_value = conn
+    total = data_mod.export_table_data(
+        engine, "cp.cpkit.tasks", str(tmp_path), "csv", False, None, False,
+        None, False, 10, False, logging.getLogger("t"), {}, 1, 0.0,
+        {"data_pagination": "keyset", "catalog": catalog})
+    assert total == 1
+    assert not any("information_schema" in s for s in stmts)
+
+
+def _fingerprint_engine(stmts, versions):
+    engine = _catalog_engine(stmts)
+    conn = engine.connect.return_value
+    catalog_execute = conn.execute.side_effect
+
+    def execute(stmt, *a, **k):
+        if "table_id, version" in str(stmt):
+            stmts.append(str(stmt))
+            return iter([(52, versions["tasks"], "cpkit", "tasks"), (53, 1, "public", "users")])
+        return catalog_execute(stmt, *a, **k)
+
+    conn.execute.side_effect = execute
+    return engine
+
+
+def test_catalog_cache_reused_until_schema_changes(tmp_path):
+    from crdb_dump.utils.catalog import catalog_cache_path
+    path = catalog_cache_path(str(tmp_path), "cp")
+    versions = {"tasks": 3}
+    logger = logging.getLogger("t")
+
+    stmts = []
+    first = CatalogSnapshot.load(_fingerprint_engine(stmts, versions), "cp", logger, cache_path=path)
+    assert any("information_schema.columns" in s for s in stmts)
+
+    stmts = []
+    cached = CatalogSnapshot.load(_fingerprint_engine(stmts, versions), "cp", logger, cache_path=path)
+    assert not any("information_schema" in s for s in stmts)
+    assert cached.objects == first.objects
+    assert cached.table_columns("cp.cpkit.tasks") == [("id", "bigint"), ("s", "text")]
+    assert cached.primary_key("cp.cpkit.tasks") == ["id"]
+    assert cached.localities == first.localities
+
+    # An ALTER bumps the descriptor version, so the cache is rebuilt.
+    versions["tasks"] = 4
+    stmts = []
+    CatalogSnapshot.load(_fingerprint_engine(stmts, versions), "cp", logger, cache_path=path)
+    assert any("information_schema.columns" in s for s in stmts)
+
+
+def test_catalog_cache_without_columns_does_not_serve_column_lookups(tmp_path):
+    path = str(tmp_path / ".cp.catalog.json")
+    versions = {"tasks": 1}
+    logger = logging.getLogger("t")
+    CatalogSnapshot.load(_fingerprint_engine([], versions), "cp", logger, columns=False, cache_path=path)
+    stmts = []
+    CatalogSnapshot.load(_fingerprint_engine(stmts, versions), "cp", logger, cache_path=path)
+    assert any("information_schema.columns" in s for s in stmts)
+
+
+def test_catalog_cache_hit_at_aost_on_a_real_connection(tmp_path):
+    path = str(tmp_path / ".cp.catalog.json")
+    logger = logging.getLogger("t")
+    CatalogSnapshot.load(_sqlite_engine([]), "cp", logger, aost="1750.0", retry_count=1, cache_path=path)
+    stmts = []
+    cached = CatalogSnapshot.load(_sqlite_engine(stmts), "cp", logger, aost="1750.0",
+                                  retry_count=1, cache_path=path)
+    assert cached.objects["table"] == ["cp.public.users"]
+    # Only the fingerprint was read; the snapshot came from the cache.
+    assert any("table_id, version" in s for s in stmts)
+    assert not any("information_schema" in s for s in stmts)
@@ -32,3 +32,99 @@ def test_verify_uses_three_part_manifest(tmp_path):
     joined = "\n".join(records)
     assert "No manifest found" not in joined
     assert "Verified" in joined
+
+
+def test_verify_trusts_digest_recorded_while_writing(tmp_path, monkeypatch):
+    import os
+    from crdb_dump.verify import checksum as checksum_mod
+    base = "cp.cpkit.tasks"
+    data_file = tmp_path / f"{base}_001.csv"
+    data_file.write_text("id\n1\n")
+    h = hashlib.sha256(data_file.read_bytes()).hexdigest()
+    (tmp_path / f"{base}.manifest.json").write_text(json.dumps(
+        {"table": base, "region": "N/A",
+         "chunks": [{"file": f"{base}_001.csv", "rows": 1, "sha256": h, "bytes": 5}]}))
+
+    def no_reread(path):
+        raise AssertionError("freshly written chunk was re-read")
+
+    monkeypatch.setattr(checksum_mod, "file_checksum", no_reread)
+    records = []
+    opts = {"tables": base, "db": "cp", "retry_count": 1, "retry_delay": 0,
+            "written_chunks": {os.path.abspath(str(data_file)): {"sha256": h, "bytes": 5}}}
+    verify_checksums(opts, str(tmp_path), _logger_capturing(records))
+    assert "1 passed, 0 failed" in "\n".join(records)
+
+
+def test_verify_honors_manifest_checksum_algo(tmp_path):
+    base = "cp.cpkit.tasks"
+    data_file = tmp_path / f"{base}_001.csv"
+    data_file.write_text("id\n1\n")
+    good = hashlib.blake2b(data_file.read_bytes()).hexdigest()
+    (tmp_path / f"{base}.manifest.json").write_text(json.dumps(
+        {"table": base, "region": "N/A", "checksum_algo": "blake2b",
+         "chunks": [{"file": f"{base}_001.csv", "rows": 1, "blake2b": good}]}))
+
+    records = []
+    opts = {"tables": base, "db": "cp", "retry_count": 1, "retry_delay": 0}
+    verify_checksums(opts, str(tmp_path), _logger_capturing(records))
+    assert "1 passed, 0 failed" in "\n".join(records)
+
+
+def test_load_chunk_rejects_checksum_mismatch(tmp_path, monkeypatch):
+    from crdb_dump.loader import loader as loader_mod
+    chunk = tmp_path / "cp.cpkit.tasks_001.csv"
+    chunk.write_text("id\n1\n")
+
+    def no_connect(opts=None):
+        raise AssertionError("corrupt chunk must not be loaded")
+
+    monkeypatch.setattr(loader_mod, "get_psycopg_connection", no_connect)
+    ok = loader_mod.load_chunk("cp.cpkit.tasks", str(chunk), None, logging.getLogger("t"),
+                               checksum=("sha256", "0" * 64))
+    assert ok is False
+
+
+def test_unknown_checksum_algo_rejected():
+    import pytest
+    from crdb_dump.utils.hashing import new_hasher
+    with pytest.raises(ValueError):
+        new_hasher("md4")
+
+
+def _write_dump(tmp_path, tables, corrupt=None):
+    for base in tables:
+        chunks = []
+        for i in (1, 2):
+            f = tmp_path / f"{base}_00{i}.csv"
+            f.write_text(f"id\n{i}\n")
+            chunks.append({"file": f.name, "rows": 1,
+                           "sha256": hashlib.sha256(f.read_bytes()).hexdigest()})
+        (tmp_path / f"{base}.manifest.json").write_text(json.dumps(
+            {"table": base, "region": "N/A", "chunks": chunks}))
+    if corrupt:
+        (tmp_path / corrupt).write_text("tampered\n")
+
+
+def test_verify_manifests_parallel_report(tmp_path):
+    from crdb_dump.verify.checksum import verify_manifests, find_manifests
+    _write_dump(tmp_path, ["cp.public.a", "cp.public.b"], corrupt="cp.public.b_002.csv")
+    report = verify_manifests(find_manifests(str(tmp_path)), str(tmp_path),
+                              _logger_capturing([]), workers=2)
+    assert (report["passed"], report["failed"], report["missing"]) == (3, 1, 0)
+    assert report["tables"]["cp.public.b"] == {"passed": 1, "failed": 1, "missing": 0}
+
+
+def test_verify_command_reads_manifests_without_cluster(tmp_path):
+    from click.testing import CliRunner
+    from crdb_dump.cli import main
+    _write_dump(tmp_path, ["cp.public.a", "cp.public.b"])
+    (tmp_path / "cp.public.b_001.csv").unlink()
+    report_file = tmp_path / "report.json"
+    result = CliRunner().invoke(main, ["verify", f"--data-dir={tmp_path}", "--workers=1",
+                                       "--exclude-tables=cp.public.b", f"--report={report_file}"])
+    assert result.exit_code == 0, result.output
+    assert json.loads(report_file.read_text())["passed"] == 2
+
+    result = CliRunner().invoke(main, ["verify", f"--data-dir={tmp_path}", "--workers=1"])
+    assert result.exit_code == 1
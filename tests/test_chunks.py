@@ -0,0 +1,106 @@
+import gzip
+import hashlib
+from crdb_dump.export.chunks import ChunkWriter
+
+
+def test_rolls_over_on_rows(tmp_path):
+    w = ChunkWriter(str(tmp_path), "d.s.t", "csv", False, ["id"], ["INT8"], max_rows=2)
+    w.write([(1,), (2,), (3,)])
+    w.write([(4,), (5,)])
+    chunks, total = w.finish()
+    assert total == 5
+    assert [(c["file"], c["rows"]) for c in chunks] == [
+        ("d.s.t_001.csv", 2), ("d.s.t_002.csv", 2), ("d.s.t_003.csv", 1)]
+    assert (tmp_path / "d.s.t_002.csv").read_text() == "id\n3\n4\n"
+    data = (tmp_path / "d.s.t_001.csv").read_bytes()
+    assert chunks[0]["sha256"] == hashlib.sha256(data).hexdigest()
+
+
+def test_rolls_over_on_bytes(tmp_path):
+    # Sizes count bytes that reached the file, so use rows larger than the write buffers.
+    w = ChunkWriter(str(tmp_path), "d.s.t", "csv", False, ["v"], ["STRING"], max_bytes=10)
+    for _ in range(3):
+        w.write([("x" * 20000,)])
+    chunks, total = w.finish()
+    assert total == 3
+    assert [c["rows"] for c in chunks] == [1, 1, 1]
+
+
+def test_byte_limit_does_not_flush_compressor(tmp_path):
+    w = ChunkWriter(str(tmp_path), "d.s.t", "csv", "gzip", ["v"], ["STRING"],
+                    header=b"v\n", max_bytes=1 << 20)
+    for _ in range(10000):
+        w.write_raw([b"x,1\n"])
+    chunks, total = w.finish()
+    assert total == 10000 and len(chunks) == 1
+    # A sync flush per row would add several bytes per row.
+    assert chunks[0]["bytes"] < 1000
+
+
+def test_strips_hidden_key_columns_and_tracks_last_key(tmp_path):
+    seen = []
+    w = ChunkWriter(str(tmp_path), "d.s.t", "sql", False, ["name"], ["STRING"],
+                    insert_prefix='INSERT INTO "t" ("name") VALUES', key_idx=[1],
+                    on_chunk=lambda i, p, e, k: seen.append(k))
+    w.write([("a", 10), ("b", 11)])
+    w.finish()
+    assert seen == [(11,)]
+    assert (tmp_path / "d.s.t_001.sql").read_text() == (
+        "INSERT INTO \"t\" (\"name\") VALUES ('a');\nINSERT INTO \"t\" (\"name\") VALUES ('b');\n")
+
+
+def test_gzip_chunks(tmp_path):
+    w = ChunkWriter(str(tmp_path), "d.s.t", "csv", True, ["id"], ["INT8"])
+    w.write([(1,)])
+    chunks, _ = w.finish()
+    assert chunks[0]["file"] == "d.s.t_001.csv.gz"
+    assert gzip.decompress((tmp_path / "d.s.t_001.csv.gz").read_bytes()) == b"id\n1\n"
+
+
+def test_copy_sink_splits_on_row_boundaries(tmp_path):
+    from crdb_dump.export.chunks import CopyChunkSink
+    w = ChunkWriter(str(tmp_path), "d.s.t", "csv", False, ["id", "note"], ["INT8", "STRING"],
+                    max_rows=2)
+    sink = CopyChunkSink(w)
+    # Arbitrary message boundaries, a quoted newline and an escaped quote.
+    for piece in [b"id,no", b"te\n1,a\n2,\"x\ny\"\n3,", b"\"q\"\"\"\n4,\r\n", b"5,z"]:
+        sink.write(piece)
+    sink.close()
+    chunks, total = w.finish()
+    assert total == 5
+    assert [c["rows"] for c in chunks] == [2, 2, 1]
+    assert (tmp_path / "d.s.t_001.csv").read_bytes() == b'id,note\n1,a\n2,"x\ny"\n'
+    assert (tmp_path / "d.s.t_002.csv").read_bytes() == b'id,note\n3,"q"""\n4,\r\n'
+    assert (tmp_path / "d.s.t_003.csv").read_bytes() == b"id,note\n5,z\n"
+
+
+def test_checksum_and_size_recorded_while_writing(tmp_path):
+    for compress in (False, True):
+        w = ChunkWriter(str(tmp_path), f"d.s.t{int(compress)}", "csv", compress, ["id"], ["INT8"])
+        w.write([(i,) for i in range(100)])
+        chunks, _ = w.finish()
+        data = (tmp_path / chunks[0]["file"]).read_bytes()
+        assert chunks[0]["bytes"] == len(data)
+        assert chunks[0]["sha256"] == hashlib.sha256(data).hexdigest()
+
+
+def test_sql_batches_rows_per_statement_within_chunk(tmp_path):
+    w = ChunkWriter(str(tmp_path), "d.s.t", "sql", False, ["id"], ["INT8"],
+                    insert_prefix='UPSERT INTO "t" ("id") VALUES', max_rows=5, sql_batch_size=2)
+    w.write([(i,) for i in range(1, 7)])
+    chunks, total = w.finish()
+    assert total == 6 and [c["rows"] for c in chunks] == [5, 1]
+    assert (tmp_path / "d.s.t_001.sql").read_text() == (
+        'UPSERT INTO "t" ("id") VALUES (1), (2);\n'
+        'UPSERT INTO "t" ("id") VALUES (3), (4);\n'
+        'UPSERT INTO "t" ("id") VALUES (5);\n')
+    assert (tmp_path / "d.s.t_002.sql").read_text() == 'UPSERT INTO "t" ("id") VALUES (6);\n'
+
+
+def test_raw_rows_track_last_key(tmp_path):
+    seen = []
+    w = ChunkWriter(str(tmp_path), "d.s.t", "csv", False, ["id", "name"], ["INT8", "STRING"],
+                    key_idx=[0], header=b"id,name\n", on_chunk=lambda i, p, e, k: seen.append(k))
+    w.write_raw([b'1,a\n', b'2,"x,\ny"\n'])
+    w.finish()
+    assert seen == [("2",)]
@@ -0,0 +1,63 @@
+import gzip
+import logging
+from unittest.mock import MagicMock
+
+import pytest
+
+from crdb_dump.loader import loader as loader_mod
+from crdb_dump.utils.compression import codec_for_path, open_chunk
+
+
+def _fake_connection(monkeypatch, copied):
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.copy_expert.side_effect = lambda sql, f: copied.append(f.read())
+    cur.fetchall.return_value = [("id",), ("name",)]
+    monkeypatch.setattr(loader_mod, "get_psycopg_connection", lambda opts=None: conn)
+    return conn
+
+
+def test_codec_for_path():
+    assert codec_for_path("t_001.csv.gz") == "gzip"
+    assert codec_for_path("t_001.csv") is None
+
+
+def test_open_chunk_rejects_unknown_codec(tmp_path):
+    path = tmp_path / "t_001.csv"
+    path.write_text("id\n")
+    with pytest.raises(ValueError):
+        open_chunk(str(path), codec="brotli")
+
+
+def test_load_chunk_streams_gzip_into_copy(tmp_path, monkeypatch):
+    chunk = tmp_path / "db.public.t_001.csv.gz"
+    with gzip.open(chunk, "wt") as f:
+        f.write("id,name\n1,a\n2,b\n")
+    copied = []
+    _fake_connection(monkeypatch, copied)
+
+    ok = loader_mod.load_chunk("db.public.t", str(chunk), None, logging.getLogger("t"), validate=True)
+    assert ok is True
+    assert copied == [b"id,name\n1,a\n2,b\n"]
+
+
+@pytest.mark.parametrize("codec,module", [("gzip", "gzip"), ("zstd", "zstandard"), ("lz4", "lz4")])
+def test_chunk_writer_codecs_round_trip(tmp_path, codec, module):
+    from crdb_dump.export.chunks import ChunkWriter
+    pytest.importorskip(module)
+    w = ChunkWriter(str(tmp_path), "d.s.t", "csv", codec, ["id"], ["INT8"],
+                    compression_level=1, compression_threads=2 if codec == "zstd" else 0)
+    w.write([(1,), (2,)])
+    chunks, _ = w.finish()
+    assert chunks[0]["compression"] == codec
+    path = tmp_path / chunks[0]["file"]
+    assert codec_for_path(str(path)) == codec
+    with open_chunk(str(path)) as f:
+        assert f.read() == b"id\n1\n2\n"
+
+
+def test_compression_requires_csv():
+    from click import UsageError
+    from crdb_dump.export.data import export_data
+    with pytest.raises(UsageError):
+        export_data({"data_format": "sql", "compression": "zstd"}, "/tmp", logging.getLogger("t"))
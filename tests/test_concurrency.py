@@ -0,0 +1,165 @@
+import logging
+import threading
+import time
+from types import SimpleNamespace
+
+import psycopg2
+import pytest
+
+from crdb_dump.loader.scheduler import run_load_plans
+from crdb_dump.utils import concurrency
+from crdb_dump.utils.common import retry
+from crdb_dump.utils.concurrency import AdaptiveLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(concurrency, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_slow_start_then_additive(clock):
+    limiter = AdaptiveLimiter(1, 10, logging.getLogger("t"), min_window=1)
+    sizes = []
+    for _ in range(6):
+        start = clock.now = clock.now + 1
+        for _ in range(limiter.limit):
+            limiter.acquire()
+        clock.now += 1
+        sizes.append(limiter.limit)
+        for _ in range(sizes[-1]):
+            limiter.release(start)
+    assert sizes == [1, 2, 4, 8, 10, 10]
+    assert limiter.peak == 10
+
+
+def test_retryable_error_halves_and_ends_slow_start(clock):
+    limiter = AdaptiveLimiter(2, 32, logging.getLogger("t"), min_window=1)
+    limiter.limit = 16
+    limiter.record_error("serialization failure")
+    limiter.record_error("another one in the same window")
+    assert limiter.limit == 8
+    # The window with errors holds; the next clean one grows by one.
+    for expected in (8, 9):
+        start = clock.now = clock.now + 1
+        for _ in range(limiter.limit):
+            limiter.acquire()
+        clock.now += 1
+        for _ in range(limiter.limit):
+            limiter.release(start)
+        assert limiter.limit == expected
+    limiter.limit = 3
+    limiter.record_error("x")
+    assert limiter.limit == 2  # never below min_workers
+
+
+def test_latency_growth_without_throughput_backs_off(clock):
+    limiter = AdaptiveLimiter(1, 32, logging.getLogger("t"), min_window=4)
+    limiter.limit = limiter.peak = 8
+
+    def window(latency):
+        start = clock.now = clock.now + 1
+        for _ in range(limiter.limit):
+            limiter.acquire()
+        clock.now += latency
+        for _ in range(limiter.limit):
+            limiter.release(start)
+
+    window(1.0)   # baseline 1s, 8/s
+    assert limiter.limit == 16
+    window(5.0)   # 5x slower, 16/6s < 8/2s: queueing
+    assert limiter.limit == 8
+    window(1.0)
+    assert limiter.limit == 9  # slow start is over
+
+
+def test_slot_counts_retryable_errors(clock):
+    limiter = AdaptiveLimiter(1, 8, logging.getLogger("t"))
+    limiter.limit = 8
+    with pytest.raises(psycopg2.OperationalError):
+        with limiter.slot():
+            raise psycopg2.OperationalError("node unavailable")
+    assert limiter.limit == 4 and limiter._active == 0
+    with pytest.raises(ValueError):
+        with limiter.slot():
+            raise ValueError("not retryable")
+    assert limiter.limit == 4
+
+
+def test_equal_bounds_are_fixed(clock):
+    limiter = AdaptiveLimiter(3, 3, logging.getLogger("t"))
+    limiter.record_error("x")
+    assert limiter.limit == 3
+
+
+def test_retry_reports_retried_attempts():
+    seen = []
+    calls = iter([psycopg2.OperationalError("a"), psycopg2.OperationalError("b"), "ok"])
+
+    def flaky():
+        result = next(calls)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert retry(retries=3, delay=0, on_retry=seen.append)(flaky)() == "ok"
+    assert [str(e) for e in seen] == ["a", "b"]
+
+
+def test_scheduler_caps_chunks_by_limiter():
+    limiter = AdaptiveLimiter(2, 2, logging.getLogger("t"))
+    lock = threading.Lock()
+    state = {"active": 0, "most": 0}
+
+    def run(task):
+        with lock:
+            state["active"] += 1
+            state["most"] = max(state["most"], state["active"])
+        time.sleep(0.001)
+        with lock:
+            state["active"] -= 1
+        return True
+
+    plans = [{"table": "d.public.t", "rows": 1, "skipped": 0,
+              "tasks": [(i,) for i in range(20)]}]
+    result = run_load_plans(plans, run, max_workers=6, limiter=limiter)
+    assert result[0]["loaded"] == 20
+    assert state["most"] <= 2 and limiter._active == 0
+
+
+def test_per_batch_cycles_the_slot(clock):
+    limiter = AdaptiveLimiter(1, 1, logging.getLogger("t"))
+    written = []
+    releases = []
+    release = limiter.release
+    limiter.release = lambda started, **kw: releases.append(started) or release(started, **kw)
+    sink = SimpleNamespace(write=written.append)
+    with limiter.per_batch(sink, 3) as target:
+        for row in range(7):
+            target.write(row)
+        assert limiter._active == 1
+    assert written == list(range(7))
+    # Two full batches plus the partial one, and the slot is free afterwards.
+    assert len(releases) == 3 and limiter._active == 0
+
+
+def test_per_batch_samples_exclude_sink_writes(clock):
+    limiter = AdaptiveLimiter(1, 1, logging.getLogger("t"))
+
+    def slow_write(data):
+        clock.now += 1.0  # encoding and disk time on the client
+
+    with limiter.per_batch(SimpleNamespace(write=slow_write), 2) as target:
+        clock.now += 0.5  # waiting for the server's first row
+        target.write(b"1\n")
+        target.write(b"2\n")
+    assert limiter._done == 1 and limiter._latency == 0.5
@@ -1,8 +1,12 @@
 import json
 import os
 import logging
+import re
+
+import pytest
 from unittest.mock import MagicMock
 from crdb_dump.export import data as data_mod
+from crdb_dump.utils.hashing import manifest_checksum_algo
 
 
 def test_export_table_data_three_part_naming(tmp_path):
@@ -83,12 +87,73 @@ def test_export_data_resolves_follower(monkeypatch, tmp_path):
     monkeypatch.setattr(data_mod, "get_sqlalchemy_engine", lambda opts: engine)
     monkeypatch.setattr(data_mod, "get_table_locality", lambda e, db, lg: {})
     monkeypatch.setattr(data_mod, "collect_objects", lambda *a, **k: [])
+    monkeypatch.setattr(data_mod.CatalogSnapshot, "load", lambda *a, **k: None)
     opts = {"db": "d", "tables": None, "aost": "follower", "region": None,
             "data_parallel": False, "retry_count": 1, "retry_delay": 0}
     data_mod.export_data(opts, str(tmp_path), logging.getLogger("t"))
     assert opts["aost_resolved"] == "1750.5"
 
 
+def test_export_data_uses_run_engine(monkeypatch, tmp_path):
+    engine = _engine_returning_scalar(value="1750.5")
+
+    def no_new_engine(opts):
+        raise AssertionError("export_data must reuse opts['engine']")
+
+    monkeypatch.setattr(data_mod, "get_sqlalchemy_engine", no_new_engine)
+    monkeypatch.setattr(data_mod, "get_table_locality", lambda e, db, lg: {})
+    monkeypatch.setattr(data_mod, "collect_objects", lambda *a, **k: [])
+    monkeypatch.setattr(data_mod.CatalogSnapshot, "load", lambda *a, **k: None)
+    opts = {"db": "d", "tables": None, "aost": "auto", "region": None, "engine": engine,
+            "data_parallel": False, "retry_count": 1, "retry_delay": 0}
+    data_mod.export_data(opts, str(tmp_path), logging.getLogger("t"))
+    assert opts["aost_resolved"] == "1750.5"
+
+
+def test_export_data_adapts_only_with_min_workers(monkeypatch, tmp_path):
+    engine = _engine_returning_scalar(value="1")
+    monkeypatch.setattr(data_mod, "get_sqlalchemy_engine", lambda opts: engine)
+    monkeypatch.setattr(data_mod, "get_table_locality", lambda e, db, lg: {})
+    monkeypatch.setattr(data_mod.CatalogSnapshot, "load", lambda *a, **k: None)
+    limiters = []
+    monkeypatch.setattr(data_mod, "AdaptiveLimiter", lambda *a, **k: limiters.append(a) or MagicMock())
+    base = {"db": "d", "tables": "d.public.t", "aost": None, "region": None, "data_parallel": True,
+            "data_format": "csv", "data_split": False, "data_limit": None, "data_order": None,
+            "data_order_desc": False, "chunk_size": 10, "data_order_strict": False,
+            "retry_count": 1, "retry_delay": 0, "max_workers": 4}
+    monkeypatch.setattr(data_mod, "export_table_data", lambda *a: 0)
+    data_mod.export_data(dict(base), str(tmp_path), logging.getLogger("t"))
+    assert limiters == []
+    data_mod.export_data(dict(base, min_workers=2), str(tmp_path), logging.getLogger("t"))
+    assert [a[:2] for a in limiters] == [(2, 4)]
+
+
+def test_export_data_parallel_counts_rows_per_table(monkeypatch, tmp_path, caplog):
+    import threading
+    engine = _engine_returning_scalar(value="1")
+    monkeypatch.setattr(data_mod, "get_sqlalchemy_engine", lambda opts: engine)
+    monkeypatch.setattr(data_mod, "get_table_locality", lambda e, db, lg: {})
+    monkeypatch.setattr(data_mod.CatalogSnapshot, "load", lambda *a, **k: None)
+    small_done = threading.Event()
+
+    def export_table_data(engine, table, *a):
+        if table == "d.public.big":
+            small_done.wait(5)  # the first table finishes last
+            return 100
+        small_done.set()
+        return 1
+
+    monkeypatch.setattr(data_mod, "export_table_data", export_table_data)
+    opts = {"db": "d", "tables": "d.public.big,d.public.small", "aost": None, "region": None,
+            "data_parallel": True, "data_format": "csv", "data_split": False, "data_limit": None,
+            "data_order": None, "data_order_desc": False, "chunk_size": 10,
+            "data_order_strict": False, "retry_count": 1, "retry_delay": 0, "max_workers": 2}
+    with caplog.at_level(logging.INFO):
+        data_mod.export_data(opts, str(tmp_path), logging.getLogger("t"))
+    assert " - d.public.big: 100 rows" in caplog.messages
+    assert " - d.public.small: 1 rows" in caplog.messages
+
+
 def test_export_data_follower_unavailable_raises(monkeypatch, tmp_path):
     import click
     import pytest
@@ -99,3 +164,366 @@ def test_export_data_follower_unavailable_raises(monkeypatch, tmp_path):
             "data_parallel": False, "retry_count": 1, "retry_delay": 0}
     with pytest.raises(click.UsageError):
         data_mod.export_data(opts, str(tmp_path), logging.getLogger("t"))
+
+
+def test_export_table_data_keyset_pagination(tmp_path):
+    cols = [("id", "INT8"), ("name", "STRING")]
+    pages = {None: [(1, "a"), (2, "b")], 2: [(3, "c")], 3: []}
+    captured = {"stmts": []}
+    conn = MagicMock()
+    conn.__enter__.return_value = conn
+    conn.__exit__.return_value = False
+
+    def execute(stmt, params=None, *a, **k):
+        s = str(stmt)
+        captured["stmts"].append((s, params))
+        if "information_schema.columns" in s:
+            return iter(cols)
+        if "PRIMARY KEY" in s:
+            return iter([("id",)])
+        return MagicMock(fetchall=lambda: pages[(params or {}).get("k0")])
+
+    conn.execute.side_effect = execute
+    engine = MagicMock()
+    engine.connect.return_value = conn
+
+    total = data_mod.export_table_data(
+        engine, "cp.cpkit.tasks", str(tmp_path), "csv", False, None, False,
+        None, False, 2, False, logging.getLogger("t"), {}, 1, 0.0,
+        {"data_pagination": "keyset"})
+
+    assert total == 3
+    page_stmts = [(s, p) for s, p in captured["stmts"] if s.startswith("SELECT *")]
+    assert all("OFFSET" not in s and 'ORDER BY "id" LIMIT 2' in s for s, _ in page_stmts)
+    assert 'WHERE ("id") > (:k0)' in page_stmts[1][0]
+    manifest = json.load(open(tmp_path / "cp.cpkit.tasks.manifest.json"))
+    assert manifest["pagination"] == "keyset"
+    assert manifest["primary_key"] == ["id"]
+    assert [c["last_key"] for c in manifest["chunks"]] == [[2], [3]]
+
+
+def test_range_bounds_are_half_open():
+    bounds = data_mod.range_bounds("id", [10, 20])
+    assert bounds == [
+        ('"id" < :hi', {"hi": 10}),
+        ('"id" >= :lo AND "id" < :hi', {"lo": 10, "hi": 20}),
+        ('"id" >= :lo', {"lo": 20}),
+    ]
+
+
+def _split_conn(row_count, quantiles=(3, 3, 5)):
+    conn = MagicMock()
+    seen = []
+
+    def execute(stmt, *a, **k):
+        seen.append(str(stmt))
+        if "SHOW STATISTICS" in seen[-1]:
+            if isinstance(row_count, Exception):
+                raise row_count
+            return MagicMock(scalar=lambda: row_count)
+        return MagicMock(scalar=lambda: list(quantiles))
+
+    conn.execute.side_effect = execute
+    return conn, seen
+
+
+def test_split_points_skip_small_tables():
+    conn, seen = _split_conn(5000)
+    obj = data_mod.parse_object_name("cp.public.t", "cp")
+    assert data_mod.get_split_points(conn, obj, "id", "", 4, logging.getLogger("t"), 10000) == []
+    assert not any("percentile_disc" in s for s in seen)
+
+
+def test_split_points_sample_large_tables():
+    conn, seen = _split_conn(10 * data_mod.SPLIT_SAMPLE_ROWS)
+    obj = data_mod.parse_object_name("cp.public.t", "cp")
+    clause = " AS OF SYSTEM TIME '1'"
+    assert data_mod.get_split_points(conn, obj, "id", clause, 4, logging.getLogger("t"), 10000) == [3, 5]
+    assert seen[-1].endswith('''FROM (SELECT "id" FROM "cp"."public"."t" WHERE random() < 0.1) AS sample'''
+                             " AS OF SYSTEM TIME '1'")
+
+
+def test_split_points_without_statistics_read_every_key():
+    conn, seen = _split_conn(RuntimeError("no statistics"))
+    obj = data_mod.parse_object_name("cp.public.t", "cp")
+    assert data_mod.get_split_points(conn, obj, "id", "", 4, logging.getLogger("t"), 10000) == [3, 5]
+    conn.rollback.assert_called_once()
+    assert seen[-1].endswith('FROM "cp"."public"."t"')
+
+
+def test_export_table_data_range_split(tmp_path):
+    cols = [("id", "INT8")]
+    table_rows = [(i,) for i in range(1, 8)]
+    conn = MagicMock()
+    conn.__enter__.return_value = conn
+    conn.__exit__.return_value = False
+
+    def execute(stmt, params=None, *a, **k):
+        s = str(stmt)
+        params = params or {}
+        if "information_schema.columns" in s:
+            return iter(cols)
+        if "PRIMARY KEY" in s:
+            return iter([("id",)])
+        if "SHOW STATISTICS" in s:
+            return MagicMock(scalar=lambda: 7)
+        if "percentile_disc" in s:
+            return MagicMock(scalar=lambda: [3, 3, 5])
+        rows = [r for r in table_rows
+                if r[0] > params.get("k0", 0)
+                and r[0] >= params.get("lo", 0) and r[0] < params.get("hi", 100)]
+        return MagicMock(fetchall=lambda: rows[:2])
+
+    conn.execute.side_effect = execute
+    engine = MagicMock()
+    engine.connect.return_value = conn
+
+    total = data_mod.export_table_data(
+        engine, "cp.cpkit.tasks", str(tmp_path), "csv", False, None, False,
+        None, False, 2, False, logging.getLogger("t"), {}, 1, 0.0,
+        {"data_ranges": 4})
+
+    assert total == 7
+    manifest = json.load(open(tmp_path / "cp.cpkit.tasks.manifest.json"))
+    assert manifest["ranges"] == 3
+    assert [c["file"] for c in manifest["chunks"]] == [
+        "cp.cpkit.tasks_r001_001.csv",
+        "cp.cpkit.tasks_r002_001.csv",
+        "cp.cpkit.tasks_r003_001.csv", "cp.cpkit.tasks_r003_002.csv",
+    ]
+    assert sum(c["rows"] for c in manifest["chunks"]) == 7
+
+
+def test_export_table_data_stream(tmp_path):
+    cols = [("id", "INT8")]
+    captured = {"stmts": [], "options": []}
+    conn = MagicMock()
+    conn.__enter__.return_value = conn
+    conn.__exit__.return_value = False
+
+    def execute(stmt, params=None, *a, **k):
+        s = str(stmt)
+        captured["stmts"].append(s)
+        if "information_schema.columns" in s:
+            return iter(cols)
+        if "PRIMARY KEY" in s:
+            return iter([("id",)])
+        if s.startswith("SET TRANSACTION"):
+            return None
+        captured["options"].append(stmt.get_execution_options())
+        return MagicMock(partitions=lambda: iter([[(1,), (2,), (3,)], [(4,), (5,)]]))
+
+    conn.execute.side_effect = execute
+    conn.execution_options.return_value = conn
+    engine = MagicMock()
+    engine.connect.return_value = conn
+
+    opts = {"aost_resolved": "1750.0", "data_pagination": "stream", "fetch_size": 3}
+    total = data_mod.export_table_data(
+        engine, "cp.cpkit.tasks", str(tmp_path), "csv", False, None, False,
+        None, False, 2, False, logging.getLogger("t"), {}, 1, 0.0, opts)
+
+    assert total == 5
+    assert "SET TRANSACTION AS OF SYSTEM TIME '1750.0'" in captured["stmts"]
+    assert captured["options"][0]["yield_per"] == 3
+    manifest = json.load(open(tmp_path / "cp.cpkit.tasks.manifest.json"))
+    assert manifest["pagination"] == "stream"
+    assert [(c["rows"], c["last_key"]) for c in manifest["chunks"]] == [(2, [2]), (2, [4]), (1, [5])]
+
+
+def test_export_table_data_copy_engine(tmp_path):
+    cols = [("id", "INT8")]
+    conn = MagicMock()
+    conn.__enter__.return_value = conn
+    conn.__exit__.return_value = False
+    conn.execute.side_effect = lambda stmt, *a, **k: iter(cols)
+    conn.execution_options.return_value = conn
+    cur = MagicMock()
+    cur.__enter__.return_value = cur
+    cur.copy_expert.side_effect = lambda sql, f: [f.write(b) for b in (b"id\n", b"1\n", b"2\n")]
+    raw = MagicMock()
+    raw.cursor.return_value = cur
+    engine = MagicMock()
+    engine.connect.return_value = conn
+    engine.raw_connection.return_value = raw
+
+    opts = {"aost_resolved": "1750.0", "data_engine": "copy"}
+    total = data_mod.export_table_data(
+        engine, "cp.cpkit.tasks", str(tmp_path), "csv", False, None, False,
+        None, False, 1000, False, logging.getLogger("t"), {}, 1, 0.0, opts)
+
+    assert total == 2
+    cur.execute.assert_called_once_with("SET TRANSACTION AS OF SYSTEM TIME '1750.0'")
+    copy_sql = cur.copy_expert.call_args[0][0]
+    assert copy_sql.startswith('COPY (SELECT * FROM "cp"."cpkit"."tasks"')
+    assert copy_sql.endswith("TO STDOUT WITH CSV HEADER")
+    assert (tmp_path / "cp.cpkit.tasks_001.csv").read_bytes() == b"id\n1\n2\n"
+    raw.close.assert_called_once()
+
+
+@pytest.mark.parametrize("cols,key,copy_rows,last_keys", [
+    # Keys come from the CSV text and are bound back as untyped literals.
+    ([("id", "INT8")], ["id"], (b"id\n", b"1\n", b"2\n"), [["2"]]),
+    # Hidden rowid key: COPY output has no key column, so no last_key is recorded.
+    ([("name", "STRING")], ["rowid"], (b"name\n", b"a\n", b'"b,\nc"\n'), [None]),
+])
+def test_copy_engine_last_key_from_csv_rows(tmp_path, cols, key, copy_rows, last_keys):
+    conn = MagicMock()
+    conn.__enter__.return_value = conn
+    conn.__exit__.return_value = False
+    conn.execution_options.return_value = conn
+    cur = MagicMock()
+    cur.__enter__.return_value = cur
+    cur.copy_expert.side_effect = lambda sql, f: [f.write(b) for b in copy_rows]
+    raw = MagicMock()
+    raw.cursor.return_value = cur
+    engine = MagicMock()
+    engine.connect.return_value = conn
+    engine.raw_connection.return_value = raw
+    catalog = MagicMock()
+    catalog.table_columns.return_value = cols
+    catalog.primary_key.return_value = key
+
+    opts = {"data_engine": "copy", "data_pagination": "keyset", "catalog": catalog}
+    total = data_mod.export_table_data(
+        engine, "cp.cpkit.tasks", str(tmp_path), "csv", False, None, False,
+        None, False, 1000, False, logging.getLogger("t"), {}, 1, 0.0, opts)
+
+    assert total == 2
+    assert (tmp_path / "cp.cpkit.tasks_001.csv").read_bytes() == b"".join(copy_rows)
+    manifest = json.load(open(tmp_path / "cp.cpkit.tasks.manifest.json"))
+    assert [c.get("last_key") for c in manifest["chunks"]] == last_keys
+
+
+def _keyset_engine(table_rows, state):
+    conn = MagicMock()
+    conn.__enter__.return_value = conn
+    conn.__exit__.return_value = False
+
+    def execute(stmt, params=None, *a, **k):
+        s = str(stmt)
+        if "information_schema.columns" in s:
+            return iter([("id", "INT8")])
+        if "PRIMARY KEY" in s:
+            return iter([("id",)])
+        state["pages"] += 1
+        if state.get("fail_at") == state["pages"]:
+            raise RuntimeError("connection reset")
+        after = (params or {}).get("k0")
+        state["after"].append(after)
+        rows = [r for r in table_rows if after is None or r[0] > int(after)]
+        offset = re.search(r"OFFSET (\d+)", s)
+        if offset:
+            rows = rows[int(offset.group(1)):]
+        return MagicMock(fetchall=lambda: rows[:2])
+
+    conn.execute.side_effect = execute
+    engine = MagicMock()
+    engine.connect.return_value = conn
+    return engine
+
+
+def test_export_table_data_resumes_from_checkpoint(tmp_path):
+    rows = [(i,) for i in range(1, 6)]
+    args = ("cp.cpkit.tasks", str(tmp_path), "csv", False, None, False,
+            None, False, 2, False, logging.getLogger("t"), {}, 1, 0.0)
+    state = {"pages": 0, "after": [], "fail_at": 2}
+    assert data_mod.export_table_data(_keyset_engine(rows, state), *args,
+                                      {"data_pagination": "keyset"}) == 0
+    assert not (tmp_path / "cp.cpkit.tasks.manifest.json").exists()
+    assert (tmp_path / "cp.cpkit.tasks.checkpoint.jsonl").exists()
+
+    state = {"pages": 0, "after": []}
+    total = data_mod.export_table_data(_keyset_engine(rows, state), *args,
+                                       {"data_pagination": "keyset", "resume": True})
+    assert total == 5
+    # The resumed run seeks past the checkpointed last key instead of starting over.
+    assert str(state["after"][0]) == "2"
+    manifest = json.load(open(tmp_path / "cp.cpkit.tasks.manifest.json"))
+    assert [c["rows"] for c in manifest["chunks"]] == [2, 2, 1]
+    assert not (tmp_path / "cp.cpkit.tasks.checkpoint.jsonl").exists()
+
+    # A finished, checksum-valid table is skipped without touching the database.
+    engine = MagicMock()
+    engine.connect.side_effect = AssertionError("should not reconnect")
+    assert data_mod.export_table_data(engine, *args, {"data_pagination": "keyset", "resume": True}) == 5
+
+    # A corrupt chunk is re-exported along with everything after it.
+    (tmp_path / "cp.cpkit.tasks_002.csv").write_text("id\n99\n")
+    state = {"pages": 0, "after": []}
+    assert data_mod.export_table_data(_keyset_engine(rows, state), *args,
+                                      {"data_pagination": "keyset", "resume": True}) == 5
+    assert str(state["after"][0]) == "2"
+    assert (tmp_path / "cp.cpkit.tasks_002.csv").read_text() == "id\n3\n4\n"
+
+
+@pytest.mark.parametrize("changed", [
+    {"checksum_algo": "blake2b"},
+    {"format": "sql"},
+    {"compress": "gzip"},
+    {"compress": "gzip", "compression_level": 9},
+    {"data_pagination": "offset"},
+])
+def test_resume_reexports_finished_table_with_other_settings(tmp_path, changed):
+    rows = [(i,) for i in range(1, 4)]
+    args = ["cp.cpkit.tasks", str(tmp_path), "csv", False, None, False,
+            None, False, 2, False, logging.getLogger("t"), {}, 1, 0.0]
+    first = {"data_pagination": "keyset"}
+    if "compression_level" in changed:
+        # Same codec at another level.
+        args[5] = "gzip"
+        first["compression_level"] = 1
+    state = {"pages": 0, "after": []}
+    assert data_mod.export_table_data(_keyset_engine(rows, state), *args, first) == 3
+
+    args[2] = changed.get("format", args[2])
+    args[5] = changed.get("compress", args[5])
+    opts = {"data_pagination": "keyset", "resume": True,
+            **{k: v for k, v in changed.items() if k not in ("format", "compress")}}
+    state = {"pages": 0, "after": []}
+    assert data_mod.export_table_data(_keyset_engine(rows, state), *args, opts) == 3
+    # Exported again from the first row rather than skipped as finished.
+    assert state["pages"] > 0 and state["after"][0] is None
+    manifest = json.load(open(tmp_path / "cp.cpkit.tasks.manifest.json"))
+    assert manifest["format"] == args[2]
+    assert manifest_checksum_algo(manifest) == changed.get("checksum_algo", "sha256")
+    assert manifest["export_options"] == {
+        "compression": changed.get("compress"),
+        "compression_level": changed.get("compression_level"),
+        "data_pagination": changed.get("data_pagination", "keyset"),
+        "data_engine": "python",
+    }
+
+
+def test_resume_restarts_checkpoint_with_other_compression(tmp_path):
+    rows = [(i,) for i in range(1, 6)]
+    args = ["cp.cpkit.tasks", str(tmp_path), "csv", False, None, False,
+            None, False, 2, False, logging.getLogger("t"), {}, 1, 0.0]
+    state = {"pages": 0, "after": [], "fail_at": 2}
+    data_mod.export_table_data(_keyset_engine(rows, state), *args, {"data_pagination": "keyset"})
+    assert (tmp_path / "cp.cpkit.tasks_001.csv").exists()
+
+    args[5] = "gzip"
+    state = {"pages": 0, "after": []}
+    assert data_mod.export_table_data(_keyset_engine(rows, state), *args,
+                                      {"data_pagination": "keyset", "resume": True}) == 5
+    # The plain chunk is not reused next to gzip ones.
+    assert state["after"][0] is None
+    manifest = json.load(open(tmp_path / "cp.cpkit.tasks.manifest.json"))
+    assert [c["file"] for c in manifest["chunks"]] == [
+        "cp.cpkit.tasks_001.csv.gz", "cp.cpkit.tasks_002.csv.gz", "cp.cpkit.tasks_003.csv.gz"]
+
+
+def test_export_data_resume_reuses_pinned_aost(monkeypatch, tmp_path):
+    (tmp_path / "d.public.t.checkpoint.jsonl").write_text(
+        json.dumps({"table": "d.public.t", "as_of_system_time": "1750.0"}) + "\n")
+    engine = MagicMock()
+    monkeypatch.setattr(data_mod, "get_sqlalchemy_engine", lambda opts: engine)
+    monkeypatch.setattr(data_mod, "get_table_locality", lambda e, db, lg: {})
+    monkeypatch.setattr(data_mod, "collect_objects", lambda *a, **k: [])
+    monkeypatch.setattr(data_mod.CatalogSnapshot, "load", lambda *a, **k: None)
+    opts = {"db": "d", "tables": None, "aost": "auto", "region": None, "resume": True,
+            "data_parallel": False, "retry_count": 1, "retry_delay": 0}
+    data_mod.export_data(opts, str(tmp_path), logging.getLogger("t"))
+    assert opts["aost_resolved"] == "1750.0"
+    engine.connect.assert_not_called()
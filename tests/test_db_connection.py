@@ -22,3 +22,82 @@ def test_psycopg_prefers_env(monkeypatch):
                         lambda dsn: captured.setdefault("dsn", dsn) or "C")
     dbc.get_psycopg_connection({"host": "ignored"})
     assert captured["dsn"].startswith("postgresql://")
+
+
+def _fake_pool_connect(monkeypatch):
+    from unittest.mock import MagicMock
+    made = []
+
+    def fake_connect(*args, **kwargs):
+        conn = MagicMock(closed=0)
+        conn.info.transaction_status = dbc.psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        made.append(conn)
+        return conn
+
+    monkeypatch.delenv("CRDB_URL", raising=False)
+    monkeypatch.setattr(dbc.psycopg2, "connect", fake_connect)
+    return made
+
+
+def test_pool_reuses_connections(monkeypatch):
+    made = _fake_pool_connect(monkeypatch)
+    pool = dbc.PsycopgPool({"host": "h1", "db": "cp"}, size=2)
+    for _ in range(3):
+        with pool.connection() as conn:
+            assert conn is made[0]
+    assert len(made) == 1
+    pool.close()
+
+
+def test_pool_discards_broken_connection(monkeypatch):
+    made = _fake_pool_connect(monkeypatch)
+    pool = dbc.PsycopgPool({"host": "h1", "db": "cp"}, size=1)
+    try:
+        with pool.connection():
+            raise dbc.psycopg2.OperationalError("server closed the connection")
+    except dbc.psycopg2.OperationalError:
+        pass
+    made[0].close.assert_called()
+    with pool.connection() as conn:
+        assert conn is made[1]
+    pool.close()
+
+
+def test_engine_pool_settings(monkeypatch):
+    monkeypatch.setenv("CRDB_URL", "postgresql://root@localhost:26257/cp?sslmode=disable")
+    captured = {}
+    monkeypatch.setattr(dbc, "create_engine", lambda url, **kw: captured.update(url=url, **kw))
+    dbc.get_sqlalchemy_engine({}, pool_size=7)
+    assert captured["url"].startswith("cockroachdb://")
+    assert captured["pool_size"] == 7 and captured["max_overflow"] == dbc.POOL_OVERFLOW
+    assert captured["pool_pre_ping"] and captured["pool_recycle"] == dbc.POOL_RECYCLE
+    assert captured["connect_args"] == {"application_name": "crdb-dump"}
+
+    # A session setting in the URL wins over the default.
+    monkeypatch.setenv("CRDB_URL", "cockroachdb://root@h:26257/cp?application_name=mine")
+    captured.clear()
+    dbc.get_sqlalchemy_engine()
+    assert captured["connect_args"] == {} and "pool_size" not in captured
+
+
+def test_run_pool_size_follows_parallelism(monkeypatch):
+    monkeypatch.setattr(dbc, "default_workers", lambda: 6)
+    assert dbc.run_pool_size({}) == 2
+    assert dbc.run_pool_size({"parallel": True}) == 6
+    assert dbc.run_pool_size({"data_ranges": 4}) == 5
+    assert dbc.run_pool_size({"data_parallel": True, "data_ranges": 4}) == 30
+
+
+def test_run_engine_is_shared_and_disposed(monkeypatch):
+    from unittest.mock import MagicMock
+    engine = MagicMock()
+    sizes = []
+    monkeypatch.setattr(dbc, "get_sqlalchemy_engine", lambda opts, pool_size: sizes.append(pool_size) or engine)
+    opts = {"db": "cp"}
+    with dbc.run_engine(opts) as outer:
+        assert opts["engine"] is outer is engine
+        with dbc.run_engine(opts) as inner:
+            assert inner is engine
+        engine.dispose.assert_not_called()
+    engine.dispose.assert_called_once()
+    assert "engine" not in opts and sizes == [dbc.run_pool_size(opts)]
@@ -0,0 +1,54 @@
+import datetime
+import decimal
+import uuid
+
+import pytest
+
+from crdb_dump.utils.common import to_csv_literal, to_sql_literal
+from crdb_dump.utils.encoders import csv_encoder, sql_encoder, encode_csv_rows, encode_sql_rows
+
+# (data_type, sample values as psycopg2 returns them)
+COLUMNS = [
+    ("bigint", [1, -5, None, 2 ** 62]),
+    ("INT8", [7, None]),
+    ("numeric", [decimal.Decimal("1.50"), decimal.Decimal("1E+3"), None]),
+    ("double precision", [1.5, float("inf"), None]),
+    ("boolean", [True, False, None]),
+    ("text", ["plain", "o'brien", 'say "hi"', "a,b", "", None]),
+    ("STRING", ["x y", None]),
+    ("uuid", [uuid.UUID("6ba7b810-9dad-11d1-80b4-00c04fd430c8"), None]),
+    ("date", [datetime.date(2021, 8, 2), None]),
+    ("timestamp with time zone",
+     [datetime.datetime(2021, 8, 2, 15, 39, 18, 500000, tzinfo=datetime.timezone.utc), None]),
+    ("time without time zone", [datetime.time(15, 39, 18), None]),
+    ("bytea", [memoryview(b"\x00\xff"), b"\x01", bytearray(b"\x02"), None]),
+    ("jsonb", [{"k": "o'brien"}, ["a", "b"], "scalar", 3, True, None]),
+    ("ARRAY", [["a", "b c", 'q"', "it's", None, "{x}"], [1, 2], [], None]),
+    ("interval", [datetime.timedelta(days=1), None]),
+    ("USER-DEFINED", ["[1.5,2,3.25]", None]),
+    (None, [b"\x03", {"a": 1}, ["x"], "s", None]),
+]
+
+
+@pytest.mark.parametrize("data_type,values", COLUMNS)
+def test_column_encoders_match_generic_encoders(data_type, values):
+    enc = csv_encoder(data_type)
+    for v in values:
+        assert (v if enc is None else enc(v)) == to_csv_literal(v, data_type)
+        assert sql_encoder(data_type)(v) == to_sql_literal(v, data_type)
+
+
+def test_encode_rows_column_wise_and_drops_hidden_keys():
+    types = ["bigint", "jsonb", "bytea"]
+    rows = [(1, {"a": 1}, b"\x01", "hidden"), (None, None, None, "hidden")]
+    csv_rows = encode_csv_rows(rows, [csv_encoder(t) for t in types])
+    assert csv_rows == [tuple(to_csv_literal(v, t) for v, t in zip(row, types)) for row in rows]
+    sql_rows = encode_sql_rows(rows, [sql_encoder(t) for t in types])
+    assert sql_rows == ["(" + ", ".join(to_sql_literal(v, t) for v, t in zip(row, types)) + ")"
+                        for row in rows]
+
+
+def test_pass_through_columns_are_only_sliced():
+    rows = [(1, "a", 99), (2, "b", 98)]
+    assert encode_csv_rows(rows, [csv_encoder("bigint"), csv_encoder("text")]) == [(1, "a"), (2, "b")]
+    assert encode_csv_rows([], [None]) == []
@@ -0,0 +1,52 @@
+import json
+import threading
+
+from crdb_dump.loader.journal import ResumeJournal
+
+
+def test_records_append_one_line_per_chunk(tmp_path):
+    path = tmp_path / "resume.json"
+    journal = ResumeJournal(str(path))
+    journal.record("db_public_t", "t_001.csv")
+    journal.record("db_public_t", "t_001.csv")
+    journal.record("db_public_u", "u_001.csv")
+    journal.close()
+
+    lines = path.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"table": "db_public_t", "chunk": "t_001.csv"},
+        {"table": "db_public_u", "chunk": "u_001.csv"}]
+    reopened = ResumeJournal(str(path))
+    assert reopened.loaded("db_public_t") == {"t_001.csv"}
+    assert ("db_public_u", "u_001.csv") in reopened
+    reopened.close()
+
+
+def test_reads_and_compacts_legacy_json(tmp_path):
+    path = tmp_path / "resume.json"
+    path.write_text(json.dumps({"db_public_t": ["t_001.csv", "t_002.csv"]}, indent=2))
+    journal = ResumeJournal(str(path))
+    assert journal.loaded("db_public_t") == {"t_001.csv", "t_002.csv"}
+    journal.close()
+    assert len(path.read_text().splitlines()) == 2
+
+
+def test_compaction_drops_duplicates_and_torn_lines(tmp_path):
+    path = tmp_path / "resume.json"
+    entry = json.dumps({"table": "k", "chunk": "c1"})
+    path.write_text(f"{entry}\n{entry}\n{{\"table\": \"k\", \"chu")
+    ResumeJournal(str(path)).close()
+    assert path.read_text() == entry + "\n"
+
+
+def test_concurrent_records_are_not_lost(tmp_path):
+    path = tmp_path / "resume.json"
+    journal = ResumeJournal(str(path), fsync_every=1000)
+    threads = [threading.Thread(target=lambda n=n: [journal.record("k", f"c{n}_{i}") for i in range(50)])
+               for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    journal.close()
+    assert len(ResumeJournal(str(path)).loaded("k")) == 400
@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+from crdb_dump.loader.loader import plan_manifest
+from crdb_dump.loader.scheduler import run_load_plans
+
+
+def _plan(table, rows, chunks):
+    return {"table": table, "rows": rows, "skipped": 0,
+            "tasks": [(table, f"{table}_{i:03d}.csv", None, None, "csv") for i in range(chunks)],
+            "resume_file": None, "log_key": table}
+
+
+def test_largest_tables_start_first():
+    order = []
+    plans = [_plan("db.small", 10, 1), _plan("db.big", 1000, 2), _plan("db.mid", 100, 1)]
+    run_load_plans(plans, lambda task: order.append(task[0]) or True)
+    assert order == ["db.big", "db.big", "db.mid", "db.small"]
+
+
+def test_global_and_per_table_caps():
+    lock = threading.Lock()
+    active = {"all": 0, "peak": 0}
+    per_table = {}
+
+    def run(task):
+        with lock:
+            active["all"] += 1
+            per_table[task[0]] = per_table.get(task[0], 0) + 1
+            active["peak"] = max(active["peak"], active["all"])
+            assert per_table[task[0]] <= 2
+        time.sleep(0.01)
+        with lock:
+            active["all"] -= 1
+            per_table[task[0]] -= 1
+        return True
+
+    done = []
+    plans = [_plan(f"db.t{i}", i, 6) for i in range(4)]
+    result = run_load_plans(plans, run, on_table_done=lambda p: done.append(p["table"]),
+                            max_workers=4, table_workers=2)
+    assert active["peak"] <= 4
+    assert sorted(done) == ["db.t0", "db.t1", "db.t2", "db.t3"]
+    assert all(p["loaded"] == 6 and p["failed"] == 0 for p in result)
+
+
+def test_resume_strict_stops_only_failing_table():
+    ran = []
+
+    def run(task):
+        ran.append(task[1])
+        return task[0] != "db.bad"
+
+    plans = [_plan("db.bad", 100, 3), _plan("db.good", 10, 2)]
+    result = {p["table"]: p for p in run_load_plans(plans, run, resume_strict=True)}
+    assert result["db.bad"]["failed"] == 1 and result["db.bad"]["loaded"] == 0
+    assert result["db.good"]["loaded"] == 2
+    assert len(ran) == 3
+
+
+def test_plan_manifest_counts_rows_and_resume(tmp_path):
+    manifest = {"table": "db.public.t", "chunks": [
+        {"file": "t_001.csv", "rows": 5, "sha256": "a"},
+        {"file": "t_002.csv", "rows": 7, "sha256": "b"}]}
+    path = tmp_path / "t.manifest.json"
+    path.write_text(json.dumps(manifest))
+    resume = tmp_path / "resume.json"
+    resume.write_text(json.dumps({"db_public_t": ["t_001.csv"]}))
+
+    plan = plan_manifest(str(path), str(tmp_path), MagicMock(), resume_file=str(resume),
+                         verify_chunks=True)
+    assert plan["rows"] == 12 and plan["skipped"] == 1
+    assert plan["tasks"] == [("db.public.t", str(tmp_path / "t_002.csv"), ("sha256", "b"), None, "csv")]
+
+
+def test_resume_strict_does_not_report_successful_chunks(monkeypatch, caplog):
+    import logging
+    from crdb_dump.loader import loader as loader_mod
+
+    monkeypatch.setattr(loader_mod, "load_chunk", lambda *a, **k: True)
+    plans = [{"table": "d.public.t", "rows": 1, "skipped": 0, "journal": None, "log_key": "t",
+              "tasks": [("d.public.t", "/data/t_001.csv", None, None, "csv")]}]
+    with caplog.at_level(logging.ERROR):
+        result = loader_mod.load_plans(plans, None, logging.getLogger("t"), resume_strict=True,
+                                       opts={}, pool=MagicMock())
+    assert result == {"d.public.t": (1, 0, 0)}
+    assert "Aborting" not in caplog.text
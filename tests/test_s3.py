@@ -0,0 +1,244 @@
+import json
+import os
+import logging
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from crdb_dump.export import data as data_mod
+from crdb_dump.utils import s3 as s3_mod
+
+S3_OPTS = {"s3_bucket": "b", "s3_prefix": "dump/"}
+
+
+def _uploader(monkeypatch, upload, **kwargs):
+    client = MagicMock()
+    client.upload_file.side_effect = upload
+    monkeypatch.setattr(s3_mod, "get_s3_client", lambda **kw: client)
+    return s3_mod.S3Uploader(S3_OPTS, **kwargs), client
+
+
+def test_uploader_applies_backpressure(monkeypatch):
+    release = threading.Event()
+    uploader, client = _uploader(monkeypatch, lambda *a, **k: release.wait(), workers=1, queue_size=1)
+    uploader.submit("/tmp/a", "a")
+    uploader.submit("/tmp/b", "b")
+    blocked = threading.Thread(target=uploader.submit, args=("/tmp/c", "c"))
+    blocked.start()
+    time.sleep(0.05)
+    assert blocked.is_alive()
+    release.set()
+    blocked.join(1)
+    assert not blocked.is_alive()
+    uploader.close()
+    keys = sorted(call.args[2] for call in client.upload_file.call_args_list)
+    assert keys == ["dump/a", "dump/b", "dump/c"]
+    assert all("Config" in call.kwargs for call in client.upload_file.call_args_list)
+
+
+def test_wait_all_raises_upload_error(monkeypatch):
+    def upload(path, bucket, key, **kw):
+        if key.endswith("bad"):
+            raise OSError("connection reset")
+
+    uploader, _ = _uploader(monkeypatch, upload)
+    futures = [uploader.submit("/tmp/ok", "ok"), uploader.submit("/tmp/bad", "bad")]
+    with pytest.raises(OSError):
+        uploader.wait_all(futures)
+    uploader.close()
+
+
+def _export(tmp_path, uploader):
+    conn = MagicMock()
+    conn.__enter__.return_value = conn
+    conn.__exit__.return_value = False
+    pages = iter([[(1,)], [(2,)], []])
+
+    def execute(stmt, *a, **k):
+        if "information_schema.columns" in str(stmt):
+            return iter([("id", "INT8")])
+        rows = next(pages)
+        return MagicMock(fetchall=lambda: rows)
+
+    conn.execute.side_effect = execute
+    engine = MagicMock()
+    engine.connect.return_value = conn
+    return data_mod.export_table_data(
+        engine, "cp.cpkit.tasks", str(tmp_path), "csv", False, None, False,
+        None, False, 1, False, logging.getLogger("t"), {}, 1, 0.0, {"s3_uploader": uploader})
+
+
+def test_manifest_uploaded_after_chunks(tmp_path, monkeypatch):
+    uploader, client = _uploader(monkeypatch, None)
+    assert _export(tmp_path, uploader) == 2
+    uploader.close()
+    keys = [call.args[2] for call in client.upload_file.call_args_list]
+    assert sorted(keys[:2]) == ["dump/cp.cpkit.tasks_001.csv", "dump/cp.cpkit.tasks_002.csv"]
+    assert keys[2] == "dump/cp.cpkit.tasks.manifest.json"
+    assert json.load(open(tmp_path / "cp.cpkit.tasks.manifest.json"))["chunks"]
+
+
+def test_manifest_not_uploaded_when_a_chunk_fails(tmp_path, monkeypatch):
+    def upload(path, bucket, key, **kw):
+        if key.endswith("_002.csv"):
+            raise OSError("connection reset")
+
+    uploader, client = _uploader(monkeypatch, upload)
+    assert _export(tmp_path, uploader) == 0
+    uploader.close()
+    keys = [call.args[2] for call in client.upload_file.call_args_list]
+    assert not any(k.endswith("manifest.json") for k in keys)
+
+
+def _stream_client(monkeypatch, part_size=4):
+    client = MagicMock()
+    client.create_multipart_upload.return_value = {"UploadId": "u1"}
+    client.upload_part.side_effect = lambda **kw: {"ETag": f"e{kw['PartNumber']}"}
+    monkeypatch.setattr(s3_mod, "get_s3_client", lambda **kw: client)
+    return s3_mod.S3Uploader(S3_OPTS, workers=2, part_size=part_size), client
+
+
+def test_stream_writer_small_object_uses_put(monkeypatch):
+    uploader, client = _stream_client(monkeypatch)
+    with uploader.open_stream("t_001.csv") as stream:
+        stream.write(b"abc")
+    client.put_object.assert_called_once_with(Bucket="b", Key="dump/t_001.csv", Body=b"abc")
+    client.create_multipart_upload.assert_not_called()
+    uploader.close()
+
+
+def test_stream_writer_uploads_parts_in_order(monkeypatch):
+    uploader, client = _stream_client(monkeypatch)
+    stream = uploader.open_stream("t_001.csv")
+    stream.write(b"abcdef")
+    stream.write(b"ghij")
+    stream.close()
+    bodies = sorted((c.kwargs["PartNumber"], c.kwargs["Body"]) for c in client.upload_part.call_args_list)
+    assert bodies == [(1, b"abcd"), (2, b"efgh"), (3, b"ij")]
+    client.complete_multipart_upload.assert_called_once_with(
+        Bucket="b", Key="dump/t_001.csv", UploadId="u1",
+        MultipartUpload={"Parts": [{"PartNumber": n, "ETag": f"e{n}"} for n in (1, 2, 3)]})
+    uploader.close()
+
+
+def test_unfinished_stream_is_aborted_on_close(monkeypatch):
+    uploader, client = _stream_client(monkeypatch)
+    stream = uploader.open_stream("t_001.csv")
+    stream.write(b"abcdefgh")
+    uploader.close()
+    client.abort_multipart_upload.assert_called_once_with(Bucket="b", Key="dump/t_001.csv", UploadId="u1")
+    stream.close()
+    client.complete_multipart_upload.assert_not_called()
+    client.put_object.assert_not_called()
+
+
+def test_export_streams_chunks_without_local_files(tmp_path, monkeypatch):
+    uploader, client = _stream_client(monkeypatch, part_size=1024)
+    conn = MagicMock()
+    conn.__enter__.return_value = conn
+    conn.__exit__.return_value = False
+    pages = iter([[(1,)], []])
+
+    def execute(stmt, *a, **k):
+        if "information_schema.columns" in str(stmt):
+            return iter([("id", "INT8")])
+        rows = next(pages)
+        return MagicMock(fetchall=lambda: rows)
+
+    conn.execute.side_effect = execute
+    engine = MagicMock()
+    engine.connect.return_value = conn
+    total = data_mod.export_table_data(
+        engine, "cp.cpkit.tasks", str(tmp_path), "csv", False, None, False,
+        None, False, 1, False, logging.getLogger("t"), {}, 1, 0.0,
+        {"s3_uploader": uploader, "s3_stream": True})
+    uploader.close()
+
+    assert total == 1
+    assert not (tmp_path / "cp.cpkit.tasks_001.csv").exists()
+    client.put_object.assert_called_once_with(Bucket="b", Key="dump/cp.cpkit.tasks_001.csv", Body=b"id\n1\n")
+    manifest = json.load(open(tmp_path / "cp.cpkit.tasks.manifest.json"))
+    assert manifest["chunks"][0]["bytes"] == 5
+    assert client.upload_file.call_args.args[2] == "dump/cp.cpkit.tasks.manifest.json"
+
+
+def _prefetcher(monkeypatch, objects, order=(), delay=0, **kwargs):
+    client = MagicMock()
+
+    def download(bucket, key, local_path):
+        time.sleep(delay)
+        with open(local_path, "wb") as f:
+            f.write(objects[key])
+
+    client.download_file.side_effect = download
+    monkeypatch.setattr(s3_mod, "get_s3_client", lambda **kw: client)
+    return s3_mod.S3Prefetcher(S3_OPTS, order, **kwargs), client
+
+
+def test_prefetcher_verifies_and_removes_chunks(monkeypatch):
+    from crdb_dump.utils.hashing import new_hasher
+    digest = new_hasher("sha256")
+    digest.update(b"a,b\n")
+    objects = {"dump/t_001.csv": b"a,b\n", "dump/t_002.csv": b"c,d\n"}
+    prefetcher, client = _prefetcher(
+        monkeypatch, objects, [("/data/t_001.csv", ("sha256", digest.hexdigest())),
+                               ("/data/t_002.csv", ("sha256", "bad"))], workers=2)
+    with prefetcher.fetch("/data/t_001.csv", ("sha256", digest.hexdigest())) as (path, verified):
+        assert verified is True
+        with open(path, "rb") as f:
+            assert f.read() == b"a,b\n"
+    assert not os.path.exists(path)
+    with prefetcher.fetch("/data/t_002.csv", ("sha256", "bad")) as (_, verified):
+        assert verified is False
+    prefetcher.close()
+    assert client.download_file.call_count == 2
+    assert not os.path.exists(prefetcher._tmp_dir)
+
+
+def test_prefetcher_stops_at_disk_budget(monkeypatch):
+    objects = {f"dump/t_00{i}.csv": b"x" * 10 for i in range(1, 5)}
+    order = [(f"/data/t_00{i}.csv", None) for i in range(1, 5)]
+    prefetcher, client = _prefetcher(monkeypatch, objects, order, workers=1, max_bytes=20)
+    time.sleep(0.1)
+    assert client.download_file.call_count == 2
+    with prefetcher.fetch("/data/t_001.csv"):
+        pass
+    time.sleep(0.1)
+    assert client.download_file.call_count == 3
+    prefetcher.close()
+
+
+def test_prefetcher_skips_chunks_already_loaded(monkeypatch):
+    objects = {f"dump/t_00{i}.csv": b"x" for i in range(1, 7)}
+    order = [(f"/data/t_00{i}.csv", None) for i in range(1, 7)]
+    prefetcher, client = _prefetcher(monkeypatch, objects, order, delay=0.02, workers=1)
+    # The loader runs ahead of the single prefetch thread.
+    for path, _ in reversed(order):
+        with prefetcher.fetch(path):
+            pass
+    time.sleep(0.1)
+    assert client.download_file.call_count == 6
+    assert os.listdir(prefetcher._tmp_dir) == [] and prefetcher._on_disk == 0
+    prefetcher.close()
+
+
+def test_direct_stream_rolls_back_on_checksum_mismatch(monkeypatch):
+    import io
+    from crdb_dump.loader import loader as loader_mod
+
+    source = MagicMock()
+    source.open_object.return_value = io.BytesIO(b"id\n1\n")
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value.copy_expert.side_effect = \
+        lambda sql, f: f.read(2)
+    pool = MagicMock()
+    pool.connection.return_value.__enter__.return_value = conn
+    opts = {"use_s3": True, "s3_direct": True, "s3_source": source}
+    ok = loader_mod.load_chunk("db.public.t", "/data/t_001.csv", None, logging.getLogger("t"),
+                               opts=opts, checksum=("sha256", "bad"), pool=pool)
+    assert ok is False
+    conn.rollback.assert_called_once()
+    conn.commit.assert_not_called()
+    source.fetch.assert_not_called()
@@ -47,3 +47,122 @@ def test_dump_create_statement_uses_quoted_fq_name():
     ddl = dump_create_statement(eng, "TABLE", "cp.cpkit.tasks", logging.getLogger("t"), 1, 0.0)
     assert ddl.strip().endswith(";")
     assert any('"cp"."cpkit"."tasks"' in s for s in captured["stmts"])
+
+
+def _index_engine():
+    conn = _conn_with([
+        None,                                                       # USE db
+        iter([("public", "status", "CREATE TYPE public.status AS ENUM ('a')")]),
+        iter([
+            ("public", "orders", "table", "CREATE TABLE public.orders (id INT8 PRIMARY KEY);"),
+            ("public", "orders_v", "view", "CREATE VIEW public.orders_v AS SELECT 1"),
+            ("public", "seq", "sequence", "CREATE SEQUENCE public.seq"),
+        ]),
+    ])
+    eng = MagicMock()
+    eng.connect.return_value = conn
+    return eng
+
+
+def test_fetch_ddl_index_orders_by_kind_and_normalizes_ddl():
+    from crdb_dump.export.schema import fetch_ddl_index
+    index = fetch_ddl_index(_index_engine(), "cp", logging.getLogger("t"), 1, 0.0)
+    assert list(index) == ["cp.public.status", "cp.public.seq", "cp.public.orders", "cp.public.orders_v"]
+    assert index["cp.public.orders"] == ("TABLE", "CREATE TABLE public.orders (id INT8 PRIMARY KEY);\n")
+    assert index["cp.public.status"][1].endswith("ENUM ('a');\n")
+
+
+def test_fetch_ddl_index_returns_none_when_catalog_unreadable():
+    from crdb_dump.export.schema import fetch_ddl_index
+    eng = MagicMock()
+    eng.connect.return_value = _conn_with(Exception("permission denied"))
+    assert fetch_ddl_index(eng, "cp", logging.getLogger("t"), 1, 0.0) is None
+
+
+def _db_scoped_engine(url_db, objects):
+    """Engine whose crdb_internal tables only list objects of the current database."""
+    state = {"db": url_db}
+
+    def execute(stmt, *args):
+        sql = str(stmt)
+        if sql.startswith("USE "):
+            state["db"] = sql[len("USE "):].strip('"')
+            return None
+        rows = objects.get(state["db"], {})
+        return iter(rows.get("types" if "create_type_statements" in sql else "tables", []))
+
+    conn = _conn_with(None)
+    conn.execute.side_effect = execute
+    eng = MagicMock()
+    eng.connect.return_value = conn
+    return eng
+
+
+def test_fetch_ddl_index_reads_requested_db_not_url_db():
+    from crdb_dump.export.schema import fetch_ddl_index
+    eng = _db_scoped_engine("defaultdb", {
+        "defaultdb": {"tables": [("public", "other", "table", "CREATE TABLE public.other (id INT8)")]},
+        "cp": {"tables": [("public", "orders", "table", "CREATE TABLE public.orders (id INT8)")]},
+    })
+    index = fetch_ddl_index(eng, "cp", logging.getLogger("t"), 1, 0.0)
+    assert list(index) == ["cp.public.orders"]
+
+
+def test_fetch_ddl_index_returns_none_when_empty():
+    from crdb_dump.export.schema import fetch_ddl_index
+    eng = _db_scoped_engine("defaultdb", {"defaultdb": {
+        "tables": [("public", "other", "table", "CREATE TABLE public.other (id INT8)")]}})
+    assert fetch_ddl_index(eng, "cp", logging.getLogger("t"), 1, 0.0) is None
+
+
+def test_export_falls_back_to_per_object_when_index_empty(tmp_path, monkeypatch):
+    import json
+    from crdb_dump.export import schema as schema_mod
+    eng = _db_scoped_engine("defaultdb", {})
+    monkeypatch.setattr(schema_mod, "get_sqlalchemy_engine", lambda opts: eng)
+    monkeypatch.setattr(schema_mod, "CatalogSnapshot", MagicMock(**{"load.return_value": None}))
+    monkeypatch.setattr(schema_mod, "get_table_locality", lambda *a: {})
+    monkeypatch.setattr(schema_mod, "collect_objects",
+                        lambda e, db, kind, *a: ["cp.public.orders"] if kind == "table" else [])
+    monkeypatch.setattr(schema_mod, "dump_create_statement",
+                        lambda e, kind, name, *a: f"CREATE TABLE {name} (id INT8);\n")
+    schema_mod.export_schema({"db": "cp", "out_format": "json"}, str(tmp_path), logging.getLogger("t"))
+    with open(tmp_path / "cp_schema.json") as f:
+        assert json.load(f) == [{"name": "cp.public.orders", "type": "TABLE",
+                                 "ddl": "CREATE TABLE cp.public.orders (id INT8);"}]
+
+
+def test_per_table_export_uses_bulk_index(tmp_path, monkeypatch):
+    import json
+    from crdb_dump.export import schema as schema_mod
+    index = {"cp.public.orders": ("TABLE", "CREATE TABLE public.orders (id INT8);\n"),
+             "cp.public.seq": ("SEQUENCE", "CREATE SEQUENCE public.seq;\n")}
+    monkeypatch.setattr(schema_mod, "get_sqlalchemy_engine", lambda opts: MagicMock())
+    monkeypatch.setattr(schema_mod, "get_table_locality", lambda *a: {})
+    monkeypatch.setattr(schema_mod, "fetch_ddl_index", lambda *a: index)
+    per_object = MagicMock()
+    monkeypatch.setattr(schema_mod, "dump_create_statement", per_object)
+    schema_mod.export_schema({"db": "cp", "out_format": "json", "tables": "orders"},
+                             str(tmp_path), logging.getLogger("t"))
+    per_object.assert_not_called()
+    with open(tmp_path / "cp_schema.json") as f:
+        assert json.load(f) == [{"name": "cp.public.orders", "type": "TABLE",
+                                 "ddl": "CREATE TABLE public.orders (id INT8);"}]
+
+
+def test_bulk_index_honours_exclude_and_region(tmp_path, monkeypatch):
+    import json
+    from crdb_dump.export import schema as schema_mod
+    index = {"cp.public.orders": ("TABLE", "CREATE TABLE public.orders (id INT8);\n"),
+             "cp.public.users": ("TABLE", "CREATE TABLE public.users (id INT8);\n"),
+             "cp.public.seq": ("SEQUENCE", "CREATE SEQUENCE public.seq;\n")}
+    monkeypatch.setattr(schema_mod, "get_sqlalchemy_engine", lambda opts: MagicMock())
+    monkeypatch.setattr(schema_mod, "CatalogSnapshot", MagicMock(**{"load.return_value": None}))
+    monkeypatch.setattr(schema_mod, "get_table_locality", lambda *a: {
+        "cp.public.orders": "REGIONAL BY TABLE IN us-east1",
+        "cp.public.users": "REGIONAL BY TABLE IN us-east1"})
+    monkeypatch.setattr(schema_mod, "fetch_ddl_index", lambda *a: index)
+    schema_mod.export_schema({"db": "cp", "out_format": "json", "region": "us-east1",
+                              "exclude_tables": "users"}, str(tmp_path), logging.getLogger("t"))
+    with open(tmp_path / "cp_schema.json") as f:
+        assert [obj["name"] for obj in json.load(f)] == ["cp.public.orders"]
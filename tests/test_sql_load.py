@@ -0,0 +1,59 @@
+import io
+import logging
+from unittest.mock import MagicMock
+
+import psycopg2
+import pytest
+
+from crdb_dump.export.chunks import ChunkWriter
+from crdb_dump.loader import loader as loader_mod
+from crdb_dump.loader.loader import chunk_format, iter_sql_statements
+
+
+def test_iter_sql_statements_respects_quotes_across_blocks():
+    sql = ('INSERT INTO "a;b" ("x") VALUES (\'it\'\'s; fine\'), (\'line\n;two\');\n'
+           "INSERT INTO t (x) VALUES (1);\n")
+    for block_size in (1, 7, 1 << 20):
+        assert list(iter_sql_statements(io.StringIO(sql), block_size)) == [
+            'INSERT INTO "a;b" ("x") VALUES (\'it\'\'s; fine\'), (\'line\n;two\')',
+            "INSERT INTO t (x) VALUES (1)"]
+
+
+def test_chunk_format():
+    assert chunk_format("t_001.sql") == "sql"
+    assert chunk_format("t_001.csv.zst") == "csv"
+
+
+def test_load_chunk_executes_sql_in_batches(tmp_path, monkeypatch):
+    w = ChunkWriter(str(tmp_path), "db.public.t", "sql", False, ["id"], ["INT8"],
+                    insert_prefix='INSERT INTO "t" ("id") VALUES')
+    w.write([(i,) for i in range(5)])
+    chunks, _ = w.finish()
+
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    monkeypatch.setattr(loader_mod, "get_psycopg_connection", lambda opts=None: conn)
+
+    ok = loader_mod.load_chunk("db.public.t", str(tmp_path / chunks[0]["file"]), None,
+                               logging.getLogger("t"), opts={"sql_batch_statements": 2})
+    assert ok is True
+    batches = [c.args[0] for c in cur.execute.call_args_list]
+    assert [b.count("INSERT") for b in batches] == [2, 2, 1]
+    # One transaction per chunk, so a retry never replays committed rows.
+    assert conn.commit.call_count == 1
+
+
+def test_sql_chunk_failure_commits_nothing(tmp_path, monkeypatch):
+    w = ChunkWriter(str(tmp_path), "db.public.t", "sql", False, ["id"], ["INT8"],
+                    insert_prefix='INSERT INTO "t" ("id") VALUES')
+    w.write([(i,) for i in range(5)])
+    chunks, _ = w.finish()
+
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.execute.side_effect = [None, psycopg2.OperationalError("connection lost")]
+    monkeypatch.setattr(loader_mod, "get_psycopg_connection", lambda opts=None: conn)
+
+    with pytest.raises(psycopg2.OperationalError):
+        loader_mod._load_sql_chunk(str(tmp_path / chunks[0]["file"]), opts={"sql_batch_statements": 2})
+    conn.commit.assert_not_called()
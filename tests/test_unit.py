@@ -1,5 +1,6 @@
 import os
 import pytest
+from unittest.mock import MagicMock
 from click.testing import CliRunner
 from crdb_dump.cli import main
 from crdb_dump.utils.io import write_file, archive_output
@@ -48,6 +49,36 @@ def test_cli_missing_db():
     assert result.exit_code != 0
     assert "--db" in result.output
 
+def test_cli_load_validates_options_before_schema(tmp_path, monkeypatch):
+    import crdb_dump.cli as cli_mod
+    schema = tmp_path / "schema.sql"
+    schema.write_text("CREATE TABLE t (id INT);")
+    loaded = []
+    monkeypatch.setattr(cli_mod, "load_schema", lambda *a: loaded.append(a))
+    engines = []
+    monkeypatch.setattr(cli_mod, "run_engine", lambda opts: engines.append(opts))
+    result = CliRunner().invoke(main, ['load', '--db', 'd', '--schema', str(schema),
+                                       '--data-dir', str(tmp_path), '--max-workers', '2',
+                                       '--min-workers', '4'])
+    assert result.exit_code != 0
+    assert "--min-workers cannot exceed --max-workers" in result.output
+    assert loaded == [] and engines == []
+
+def test_cli_load_disposes_the_run_engine(tmp_path, monkeypatch):
+    import crdb_dump.cli as cli_mod
+    from crdb_dump.utils import db_connection
+    schema = tmp_path / "schema.sql"
+    schema.write_text("CREATE TABLE t (id INT);")
+    engine = MagicMock()
+    loaded = []
+    monkeypatch.setattr(db_connection, "get_sqlalchemy_engine", lambda *a, **k: engine)
+    monkeypatch.setattr(cli_mod, "load_schema", lambda path, eng, logger: loaded.append(eng))
+    result = CliRunner().invoke(main, ['load', '--db', 'd', '--schema', str(schema),
+                                       '--data-dir', str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert loaded == [engine]
+    engine.dispose.assert_called_once()
+
 def test_csv_literal_bytes():
     # bytea hex format so COPY ... WITH CSV decodes back to bytes
     assert to_csv_literal(b"\x01\x02") == r"\x0102"